@@ -0,0 +1,53 @@
+import streamlit as st
+
+from LLM_AND_UI.analytics import get_analytics
+from LLM_AND_UI.state import get_dataset
+from LLM_AND_UI.UI.search_tab import DATASETS
+
+
+def render_analytics_tab():
+    st.header("📊 Workshop & Mentor Planning")
+    st.caption("Counts the parsed Workshops, Mentors, Skills and Fields lists across challenges (spelling and "
+               "case variants are merged), shows which items appear together and the fewest items that cover "
+               "a share of the challenges. Results update as rows are added or replaced.")
+
+    available = [name for name, key in DATASETS.items()
+                 if st.session_state.get(key) is not None and not st.session_state[key].empty]
+    if not available:
+        st.info("Analyze a dataset (Scrape, Upload or Manual) to see its workshop and mentor stats.")
+        return
+
+    name = st.selectbox("Dataset", available, key="analytics_dataset")
+    store = get_dataset(DATASETS[name])
+    analytics = get_analytics(store.frame, store.version_key)
+    if not analytics.columns:
+        st.info("This dataset has no Workshops, Mentors, Skills or Fields columns yet.")
+        return
+
+    col1, col2 = st.columns(2)
+    column = col1.selectbox("Column", analytics.columns, key="analytics_column")
+    top = col2.slider("Top items", 5, 50, 15, 5, key="analytics_top")
+
+    st.subheader(f"🔢 Most requested {column}")
+    freq = analytics.frequencies(column)
+    if freq.empty:
+        st.info(f"No {column} listed in this dataset.")
+        return
+    st.bar_chart(freq.head(top).set_index(column)["Challenges"], horizontal=True)
+    with st.expander(f"All {len(freq)} {column.lower()}"):
+        st.dataframe(freq)
+
+    st.subheader("🔗 Co-occurrence")
+    other = st.selectbox("Against", analytics.columns, index=analytics.columns.index(column),
+                         key="analytics_other")
+    st.caption(f"Challenges listing both items, for the top {top} of each column.")
+    st.dataframe(analytics.cooccurrence(column, other, top))
+
+    st.subheader("🎯 Coverage")
+    target = st.slider("Share of challenges to cover", 0.1, 1.0, 0.8, 0.05, key="analytics_target")
+    cover = analytics.coverage(column, target)
+    reached = cover["Coverage"].iloc[-1] if len(cover) else 0.0
+    st.metric(f"{column} needed", len(cover), help=f"Greedy pick; covers {reached:.0%} of {analytics.rows} challenges")
+    if reached < target:
+        st.warning(f"⚠️ Only {reached:.0%} of challenges list any {column.lower()}, so {target:.0%} isn't reachable.")
+    st.dataframe(cover)
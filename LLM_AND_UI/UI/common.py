@@ -0,0 +1,146 @@
+import streamlit as st
+
+from LLM_AND_UI.export import FORMATS, export_bytes
+from LLM_AND_UI.jobs import ACTIVE, get_runner
+from LLM_AND_UI.llm import analyze_brief_with_status
+from LLM_AND_UI.metrics import get_metrics
+from LLM_AND_UI.pipeline import analyzed_row
+from LLM_AND_UI.state import get_dataset, start_session_run, upsert_dataset
+from LLM_AND_UI.UI.sidebar import format_eta, use_cache
+from LLM_AND_UI.views import PAGE_SIZES, default_columns, page_view
+
+
+def progress_text(done, total, noun="challenges", verb="Analyzed"):
+    # Progress-bar text with live throughput and ETA from the run this thread is recording into
+    snap = get_metrics().snapshot()
+    text = f"{verb} {done} of {total} {noun}..."
+    if snap["rows_per_s"]:
+        text += f" ({snap['rows_per_s']:.1f}/s, ETA {format_eta((total - done) / snap['rows_per_s'])})"
+    return text
+
+
+def analyze_one(label, row):
+    # Single-row analysis recorded as its own run in the metrics panel
+    metrics = start_session_run(label, expected=1)
+    out = analyze_brief_with_status(row, use_cache=use_cache())
+    metrics.count("rows")
+    metrics.finish()
+    return out
+
+
+def warn_failed_rows(results):
+    failed = sum(r.status == "failed" for r in results)
+    if failed:
+        st.warning(f"⚠️ {failed} challenge(s) failed after retries. See the 'Status' column and re-run to fill them in.")
+
+
+def render_job_progress(job_key, on_finished):
+    # Polls a background job in a fragment, so the rest of the page stays interactive
+    job_id = st.session_state.get(job_key)
+    if not job_id:
+        return
+    runner = get_runner()
+    job = runner.get(job_id)
+    if job is None:
+        del st.session_state[job_key]
+        return
+
+    if job["status"] not in ACTIVE:
+        del st.session_state[job_key]
+        if job["status"] == "failed":
+            st.error(f"❌ Background job {job_id} failed: {job['error']}")
+        else:
+            on_finished(job)
+        return
+
+    @st.fragment(run_every=2)
+    def poll():
+        current = runner.get(job_id)
+        if current["status"] not in ACTIVE:
+            st.rerun()
+        total = current["total"] or 0
+        st.progress(
+            min(current["done"] / total, 1.0) if total else 0.0,
+            text=f"⏳ Background job {job_id}: {current['done']} of {total or '?'} done",
+        )
+        if st.button("✖ Cancel job", key=f"{job_key}_cancel"):
+            runner.cancel(job_id)
+
+    poll()
+
+
+def render_table(df, key, version=None):
+    # Paged view of a large frame: filtering, sorting and column choice happen here and only the visible page
+    # is sent to the browser. version identifies the contents (e.g. DatasetStore.version_key); without one the
+    # frame's identity is used, so pass a frame that is reused across reruns.
+    if df is None or df.empty:
+        st.caption("No rows.")
+        return
+    with st.expander("⚙️ Columns, filter & sort", expanded=False):
+        columns = st.multiselect("Columns", list(df.columns), default=default_columns(df), key=f"{key}_columns")
+        col1, col2, col3 = st.columns([2, 2, 1])
+        query = col1.text_input("Filter rows containing", key=f"{key}_query")
+        sort_by = col2.selectbox("Sort by", [None, *df.columns], format_func=lambda c: "(sheet order)" if c is None else c,
+                                 key=f"{key}_sort")
+        ascending = col3.radio("Order", ["Asc", "Desc"], key=f"{key}_order") == "Asc"
+
+    page_size = st.session_state.get(f"{key}_page_size", PAGE_SIZES[1])
+    page = st.session_state.get(f"{key}_page", 1)
+    view = (query.strip(), sort_by, ascending, page_size)
+    if st.session_state.get(f"{key}_view", view) != view:
+        # A new filter, sort or page size starts again from the first page
+        page = st.session_state[f"{key}_page"] = 1
+    st.session_state[f"{key}_view"] = view
+    table, total = page_view(df, version, columns or default_columns(df), query, sort_by, ascending, page, page_size,
+                             search_columns=list(df.columns))
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        # The filter or page size left fewer pages than the one selected
+        page = st.session_state[f"{key}_page"] = pages
+    st.dataframe(table)
+
+    col1, col2, col3 = st.columns([1, 1, 3])
+    col1.number_input("Page", 1, pages, key=f"{key}_page")
+    col2.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    first = (page - 1) * page_size
+    col3.caption(f"Rows {first + 1 if total else 0}–{min(first + page_size, total)} of {total}"
+                 + (f" (filtered from {len(df)})" if total != len(df) else ""))
+
+
+def render_add_replace_ui(state_key, sheet_name, title_key, brief_key):
+    st.subheader(f"🧾 {sheet_name} Dataset Preview")
+    store = get_dataset(state_key)
+    render_table(store.frame, state_key, store.version_key)
+
+    st.subheader("✏️ Add or Replace Challenge")
+    title_input = st.text_input("Title", key=title_key)
+    brief_input = st.text_area("Brief", height=200, key=brief_key)
+
+    if st.button(f"➕ Add/Replace in {sheet_name} Data"):
+        if not title_input.strip() or not brief_input.strip():
+            st.warning("Both title and brief are required.")
+        else:
+            with st.spinner("Analyzing new entry..."):
+                row = {"Title": title_input.strip(), "Brief": brief_input.strip()}
+                out = analyze_one(f"{sheet_name} add/replace", row)
+                upsert_dataset(state_key, analyzed_row(title_input.strip(), out))
+                st.success("✅ Challenge added or replaced.")
+                st.rerun()
+
+    render_download(state_key, sheet_name)
+
+
+def render_download(state_key, sheet_name, file_stem=None):
+    # The file is only built when asked for, and reused until the dataset changes
+    store = get_dataset(state_key)
+    file_stem = file_stem or f"{sheet_name.lower()}_challenges"
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Format", list(FORMATS), key=f"{state_key}_export_format", label_visibility="collapsed")
+
+    requested = st.session_state.get(f"{state_key}_export")
+    if col2.button(f"📦 Prepare {sheet_name} Data for download", key=f"{state_key}_export_btn"):
+        requested = st.session_state[f"{state_key}_export"] = store.version_key
+
+    if requested == store.version_key:
+        data = export_bytes(store.frame, fmt, sheet_name=sheet_name, version=store.version_key)
+        st.download_button(f"📁 Download {sheet_name} Data", data, f"{file_stem}.{fmt}", mime=FORMATS[fmt])
@@ -0,0 +1,59 @@
+import streamlit as st
+
+from LLM_AND_UI.merge import merge_datasets
+from LLM_AND_UI.state import freeze_ui_for_others, get_dataset, lock_section, set_dataset, start_session_run, unlock_ui
+from LLM_AND_UI.UI.common import render_download, render_table
+from LLM_AND_UI.UI.sidebar import use_cache
+
+DATASETS = {"Scraped": "scrape_df", "Uploaded": "upload_df", "Manual": "manual_df"}
+
+
+def render_merge_tab():
+    SECTION = "Merge"
+    freeze_ui_for_others(SECTION)
+    st.header("🔀 Merge Datasets")
+    st.caption("Matches challenges by title (tolerating small spelling differences), fills gaps and resolves "
+               "identical or newer-only changes locally. Only real conflicts are sent to the model.")
+
+    available = [name for name, key in DATASETS.items()
+                 if st.session_state.get(key) is not None and not st.session_state[key].empty]
+    if len(available) < 2 and "merged_df" not in st.session_state:
+        st.info("Analyze at least two datasets (Scrape, Upload or Manual) to merge them.")
+        return
+
+    if len(available) >= 2:
+        col1, col2 = st.columns(2)
+        base = col1.selectbox("Base dataset", available, key="merge_base")
+        incoming = col2.selectbox("Merge in", [name for name in available if name != base], key="merge_incoming")
+        threshold = st.slider("Title similarity threshold", 0.5, 1.0, 0.8, 0.05, key="merge_threshold")
+        strategy = st.radio(
+            "Conflicting fields", ["Ask the model", "Newer wins"], horizontal=True, key="merge_strategy"
+        )
+
+        if st.button("🔀 Merge") and lock_section(SECTION):
+            try:
+                metrics = start_session_run("merge")
+                with st.spinner("Merging..."):
+                    merged, counts = merge_datasets(
+                        st.session_state[DATASETS[base]],
+                        st.session_state[DATASETS[incoming]],
+                        threshold=threshold,
+                        strategy="newer" if strategy == "Newer wins" else "llm",
+                        use_cache=use_cache(),
+                    )
+                metrics.finish()
+                set_dataset("merged_df", merged)
+                st.session_state.merge_counts = counts
+            finally:
+                unlock_ui()
+
+    if "merged_df" in st.session_state:
+        counts = st.session_state.get("merge_counts", {})
+        st.success(
+            f"Merged: {counts.get('identical', 0)} identical, {counts.get('filled', 0)} gap-filled, "
+            f"{counts.get('newer', 0)} newer-wins, {counts.get('llm', 0)} resolved by the model, "
+            f"{counts.get('added', 0)} added."
+        )
+        store = get_dataset("merged_df")
+        render_table(store.frame, "merged_df", store.version_key)
+        render_download("merged_df", "Merged")
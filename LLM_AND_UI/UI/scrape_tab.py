@@ -1,12 +1,17 @@
 import streamlit as st
 import pandas as pd
 import time
-from io import BytesIO
 
-from LLM_AND_UI.llm import analyze_brief
-from LLM_AND_UI.parser import parse_output
-from LLM_AND_UI.utils import get_latest_challenge_excel, run_scraper
-from LLM_AND_UI.state import freeze_ui_for_others, unlock_ui
+from LLM_AND_UI.config import CONTENT_HASH_COLUMN
+from LLM_AND_UI.llm import analyze_briefs
+from LLM_AND_UI.pipeline import analyzed_row, scrape_and_analyze
+from LLM_AND_UI.jobs import analyze_job_frame, get_runner, scrape_job_sheets
+from LLM_AND_UI.UI.common import progress_text, render_add_replace_ui, render_job_progress, render_table, warn_failed_rows
+from LLM_AND_UI.UI.sidebar import format_eta, use_cache
+from LLM_AND_UI.utils import (
+    finish_scrape_run, load_scrape_run, recent_scrape_runs, run_scraper, save_scraper_excel, start_scrape_run,
+)
+from LLM_AND_UI.state import freeze_ui_for_others, lock_section, set_dataset, start_session_run, unlock_ui
 
 
 def render_scrape_tab():
@@ -15,26 +20,46 @@ def render_scrape_tab():
     st.header("🌐 Scrape NASA Challenges")
 
     url = st.text_input("Enter NASA Challenge Page URL")
+    save_copy = st.checkbox("Also save an Excel copy to scraping_challenges_info/Excel-Files", key="scrape_save_excel")
+    background = st.checkbox("Run in background (keeps going across reruns)", value=True, key="scrape_background")
     if st.button("🔍 Scrape Now"):
-        st.session_state.active_section = SECTION
-        with st.spinner("Scraping and analyzing..."):
-            result = run_scraper(url)
-            if result.returncode == 0:
-                file = get_latest_challenge_excel()
-                if file:
-                    st.session_state["scraped_excel_file"] = file
-                    st.success("Scraping complete! Preview and analyze below.")
-                else:
-                    st.error("Excel not found.")
-            else:
-                st.error(result.stderr)
-        unlock_ui()
+        if background:
+            st.session_state.scrape_job = get_runner().submit_scrape(url, target="scraped_sheets", export_excel=save_copy)
+        elif lock_section(SECTION):
+            progress = st.progress(0, text="Fetching challenge list...")
+            metrics = start_session_run("scrape")
+
+            def on_progress(done, total, title):
+                progress.progress(done / total, text=f"{progress_text(done, total, verb='Scraped')} {title or 'failed'}")
+
+            try:
+                run_id = start_scrape_run(url)
+                df_basic, df_detailed, path = run_scraper(url, on_progress=on_progress, export_excel=save_copy,
+                                                          run_id=run_id)
+                st.session_state["scraped_sheets"] = {"Basic Info": df_basic, "Challenge Details": df_detailed}
+                st.session_state["scrape_run_id"] = run_id
+                st.success(f"Scraping complete (run {run_id})! Preview and analyze below."
+                           + (f" Saved to {path}" if path else ""))
+            except Exception as e:
+                st.error(f"Scraping failed: {e}")
+            finally:
+                metrics.finish()
+                progress.empty()
+                unlock_ui()
+
+    render_job_progress("scrape_job", _load_scrape_job)
+    _render_earlier_runs()
+
+    if st.button("⚡ Scrape & Analyze (streaming)") and lock_section(SECTION):
+        try:
+            _scrape_and_analyze(url, save_copy)
+        finally:
+            unlock_ui()
 
-    if "scraped_excel_file" in st.session_state:
-        st.subheader("📄 Raw Excel Preview (Before AI Processing)")
-        file = st.session_state["scraped_excel_file"]
-        excel_data = pd.ExcelFile(file)
-        sheet_names = excel_data.sheet_names
+    if "scraped_sheets" in st.session_state:
+        st.subheader("📄 Raw Scrape Preview (Before AI Processing)")
+        sheets = st.session_state["scraped_sheets"]
+        sheet_names = list(sheets)
 
         if "scrape_selected_sheet" not in st.session_state:
             st.session_state.scrape_selected_sheet = sheet_names[0]
@@ -46,69 +71,183 @@ def render_scrape_tab():
             st.session_state.scrape_df = None  # Reset on sheet change
 
         try:
-            df = excel_data.parse(st.session_state.scrape_selected_sheet)
-            df.columns = df.columns.astype(str).str.strip()
-            st.session_state.scrape_raw_df = df
-            st.dataframe(df)
+            # Cleaned once per scraped sheet and reused across reruns, so the paged view stays cached
+            source = sheets[st.session_state.scrape_selected_sheet]
+            df = st.session_state.get("scrape_raw_df")
+            if df is None or st.session_state.get("scrape_raw_source") is not source:
+                df = source.copy()
+                df.columns = df.columns.astype(str).str.strip()
+                st.session_state.scrape_raw_df = df
+                st.session_state.scrape_raw_source = source
+            render_table(df, "scrape_raw")
+
+            only_changed = "Changed" in df.columns and st.checkbox(
+                "Only re-analyze new or changed challenges", value=True, key="scrape_only_changed"
+            )
 
             if st.button("🤖 Analyze Previewed Sheet with AI"):
-                st.session_state.active_section = SECTION
                 if "Title" in df.columns:
-                    parsed = []
-                    total = len(df)
-                    progress = st.progress(0, text="Analyzing challenges...")
-                    for i, (_, row) in enumerate(df.iterrows()):
-                        out = analyze_brief(row)
-                        result = parse_output(out)
-                        result["Title"] = row["Title"]
-                        parsed.append(result)
-                        progress.progress((i + 1) / total, text=f"Analyzing challenge {i + 1} of {total}")
-                        time.sleep(0.2)
-                    st.session_state.scrape_df = pd.DataFrame(parsed)
-                    st.success("Analysis complete!")
+                    previous = st.session_state.get("scrape_df")
+                    to_analyze = df
+                    if only_changed and previous is not None and not previous.empty:
+                        analyzed_from = _analyzed_hashes(previous)
+                        to_analyze = df[[_needs_analysis(row, analyzed_from) for row in df.to_dict("records")]]
+
+                    if background:
+                        st.session_state.scrape_analyze_job = get_runner().submit_analyze(
+                            to_analyze, target="scrape_df", use_cache=use_cache()
+                        )
+                    elif lock_section(SECTION):
+                        # Released even if the analysis raises, so other sessions and tabs aren't locked out
+                        try:
+                            progress = st.progress(0, text="Analyzing challenges...")
+                            metrics = start_session_run("scrape analyze")
+                            results = analyze_briefs(
+                                to_analyze,
+                                use_cache=use_cache(),
+                                on_progress=lambda done, total: progress.progress(done / total, text=progress_text(done, total)),
+                            )
+                            metrics.finish()
+                            parsed = [analyzed_row(row["Title"], out, row)
+                                      for row, out in zip(to_analyze.to_dict("records"), results)]
+                            analyzed = pd.DataFrame(parsed)
+                            if len(to_analyze) < len(df):
+                                analyzed = _keep_unchanged(df, previous, analyzed)
+                            set_dataset("scrape_df", analyzed)
+                            warn_failed_rows(results)
+                            st.success(f"Analysis complete! ({len(to_analyze)} of {len(df)} challenges sent to the model)")
+                        finally:
+                            unlock_ui()
                 else:
                     st.error("Missing 'Title' column in scraped data.")
-                unlock_ui()
 
         except Exception as e:
             st.error(f"Failed to load sheet: {e}")
 
-    if st.session_state.get("scrape_df") is not None and not st.session_state.scrape_df.empty:
-        _render_add_replace_ui("scrape_df", "Scraped", "scrape_title_input", "scrape_brief_input")
-
+    render_job_progress("scrape_analyze_job", _load_analyze_job)
 
-def _render_add_replace_ui(state_key, sheet_name, title_key, brief_key):
-    st.subheader(f"🧾 {sheet_name} Dataset Preview")
-    st.dataframe(st.session_state[state_key])
-
-    st.subheader("✏️ Add or Replace Challenge")
-    title_input = st.text_input("Title", key=title_key)
-    brief_input = st.text_area("Brief", height=200, key=brief_key)
-
-    if st.button(f"➕ Add/Replace in {sheet_name} Data"):
-        if not title_input.strip() or not brief_input.strip():
-            st.warning("Both title and brief are required.")
-        else:
-            with st.spinner("Analyzing new entry..."):
-                row = {"Title": title_input.strip(), "Brief": brief_input.strip()}
-                out = analyze_brief(row)
-                result = parse_output(out)
-                result["Title"] = title_input.strip()
-
-                df = st.session_state[state_key].copy()
-                df["Title"] = df["Title"].astype(str)
-
-                idx = df[df["Title"].str.lower() == title_input.strip().lower()].index
-                if not idx.empty:
-                    df.loc[idx[0]] = result
-                else:
-                    df = pd.concat([df, pd.DataFrame([result])], ignore_index=True)
-
-                st.session_state[state_key] = df
-                st.success("Challenge added or replaced.")
-                st.rerun()
-
-    out = BytesIO()
-    st.session_state[state_key].to_excel(out, index=False, sheet_name=sheet_name)
-    out.seek(0)
-    st.download_button(f"📁 Download {sheet_name} Data", out, f"{sheet_name.lower()}_challenges.xlsx")
+    if st.session_state.get("scrape_df") is not None and not st.session_state.scrape_df.empty:
+        render_add_replace_ui("scrape_df", "Scraped", "scrape_title_input", "scrape_brief_input")
+
+
+def _render_earlier_runs():
+    runs = [run for run in recent_scrape_runs() if run["status"] in ("done", "interrupted")]
+    if not runs:
+        return
+    with st.expander("📂 Earlier scrape runs"):
+        labels = {run["id"]: f"{run['id']} · {run['rows']} challenges · {run['status']} · {run['url'] or ''}"
+                  for run in runs}
+        run_id = st.selectbox("Run", list(labels), format_func=labels.get, key="scrape_run_choice")
+        if st.button("📥 Load run", key="scrape_run_load"):
+            st.session_state["scraped_sheets"] = load_scrape_run(run_id)
+            st.session_state["scrape_run_id"] = run_id
+            st.rerun()
+
+
+def _load_scrape_job(job):
+    if job["status"] != "done":
+        st.warning(f"Scrape job {job['status']}.")
+        return
+    st.session_state["scraped_sheets"] = scrape_job_sheets(job)
+    st.session_state["scrape_run_id"] = (job["result"] or {}).get("run_id")
+    st.success("Scraping complete! Preview and analyze below.")
+
+
+def _load_analyze_job(job):
+    analyzed, results = analyze_job_frame(job, get_runner().store)
+    df = st.session_state.get("scrape_raw_df")
+    previous = st.session_state.get("scrape_df")
+    if df is not None and previous is not None and not previous.empty and len(analyzed) < len(df):
+        analyzed = _keep_unchanged(df, previous, analyzed)
+    set_dataset("scrape_df", analyzed)
+    warn_failed_rows(results)
+    st.success("Analysis complete!" if job["status"] == "done" else f"Job {job['status']}: kept the finished rows.")
+
+
+def _scrape_and_analyze(url, save_copy):
+    # Each challenge is analyzed as soon as it is scraped; results show up in the table as they complete
+    previous = st.session_state.get("scrape_df")
+    analyzed_from = _analyzed_hashes(previous)
+    status = st.empty()
+    table = st.empty()
+    rows = []
+    last_draw = [0.0]
+    metrics = start_session_run("scrape & analyze")
+    # Records go to the run as they are scraped, so a crash mid-run keeps them
+    run_id = start_scrape_run(url)
+
+    def on_result(record, row, done):
+        if row is not None:
+            rows.append(row)
+        if time.monotonic() - last_draw[0] > 0.5:
+            last_draw[0] = time.monotonic()
+            snap = metrics.snapshot()
+            eta = f", ETA {format_eta(snap['eta_s'])}" if snap["eta_s"] else ""
+            status.info(f"Scraped and analyzed {done} challenges ({len(rows)} sent to the model, "
+                        f"{snap['rows_per_s']:.1f}/s{eta})...")
+            table.dataframe(pd.DataFrame(rows))
+
+    try:
+        df_basic, df_detailed, analyzed = scrape_and_analyze(
+            url,
+            use_cache=use_cache(),
+            should_analyze=lambda record: _needs_analysis(record, analyzed_from),
+            on_result=on_result,
+            run_id=run_id,
+        )
+    except Exception as e:
+        status.empty()
+        st.error(f"Scraping failed: {e}")
+        return
+    finally:
+        metrics.finish()
+
+    path = None
+    try:
+        path = save_scraper_excel(df_basic, df_detailed, name=run_id) if save_copy else None
+    finally:
+        # The run is done either way; it keeps the index page's order rather than the order records arrived in
+        finish_scrape_run(run_id, df_basic, df_detailed, excel_path=path)
+    st.session_state["scrape_run_id"] = run_id
+
+    st.session_state["scraped_sheets"] = {"Basic Info": df_basic, "Challenge Details": df_detailed}
+    # Preview the sheet that was analyzed; changing the selection would otherwise reset scrape_df
+    st.session_state.scrape_selected_sheet = "Challenge Details"
+    st.session_state.scrape_sheet_selector = "Challenge Details"
+    result = pd.DataFrame([row for _, row in analyzed if row is not None])
+    if len(result) < len(df_detailed):
+        result = _keep_unchanged(df_detailed, previous, result)
+    set_dataset("scrape_df", result)
+    status.empty()
+    table.empty()
+    st.success(f"Scraped and analyzed {len(df_detailed)} challenges." + (f" Saved to {path}" if path else ""))
+
+
+def _analyzed_hashes(previous):
+    # Title -> content hash of the scraped record its current analysis was made from (None when unknown)
+    if previous is None or previous.empty:
+        return {}
+    hashes = previous[CONTENT_HASH_COLUMN] if CONTENT_HASH_COLUMN in previous.columns else [None] * len(previous)
+    return {str(title): digest if isinstance(digest, str) else None for title, digest in zip(previous["Title"], hashes)}
+
+
+def _needs_analysis(record, analyzed_from):
+    # New challenges, and ones whose content differs from what their analysis was made from. That is independent
+    # of Changed, which only compares with the last scrape (by any session); rows analyzed without a hash (manual
+    # edits, older datasets) fall back to it.
+    title = str(record["Title"])
+    if title not in analyzed_from:
+        return True
+    if analyzed_from[title] is None:
+        return bool(record.get("Changed", True))
+    return record.get(CONTENT_HASH_COLUMN) != analyzed_from[title]
+
+
+def _keep_unchanged(df, previous, analyzed):
+    # Reuse earlier results for unchanged challenges and keep the sheet's row order
+    titles = df["Title"].astype(str)
+    fresh = set(analyzed["Title"].astype(str)) if not analyzed.empty else set()
+    kept = previous[previous["Title"].astype(str).isin(set(titles) - fresh)]
+    merged = pd.concat([kept, analyzed], ignore_index=True)
+    order = {title: i for i, title in enumerate(titles)}
+    return merged.iloc[merged["Title"].astype(str).map(order).argsort()].reset_index(drop=True)
@@ -0,0 +1,78 @@
+import streamlit as st
+
+from LLM_AND_UI.metrics import timer
+from LLM_AND_UI.search import FACET_COLUMNS
+from LLM_AND_UI.state import get_dataset, get_search_index
+
+DATASETS = {"Scraped": "scrape_df", "Uploaded": "upload_df", "Manual": "manual_df", "Merged": "merged_df"}
+
+
+def _results_frame(frame, hits):
+    # Matching rows in rank order, with the similarity score up front
+    rows = frame.iloc[[pos for pos, _ in hits]].copy()
+    rows.insert(0, "Score", [round(score, 3) for _, score in hits])
+    return rows.reset_index(drop=True)
+
+
+def render_search_tab():
+    st.header("🔎 Search Challenges")
+    st.caption("Ranks challenges by text similarity to your query (title, summary, fields, skills...) and "
+               "filters them by exact field, skill and category tags.")
+
+    available = [name for name, key in DATASETS.items()
+                 if st.session_state.get(key) is not None and not st.session_state[key].empty]
+    if not available:
+        st.info("Analyze a dataset (Scrape, Upload or Manual) to search it.")
+        return
+
+    name = st.selectbox("Dataset", available, key="search_dataset")
+    state_key = DATASETS[name]
+    frame = get_dataset(state_key).frame
+    with st.spinner("Indexing..."):
+        index = get_search_index(state_key)
+
+    query = st.text_input("Search", placeholder="e.g. wildfire satellite imagery", key="search_query")
+    facet_cols = [col for col in FACET_COLUMNS if any(index.facets[col].values())]
+    facets = {}
+    if facet_cols:
+        cols = st.columns(len(facet_cols))
+        for col, column in zip(cols, facet_cols):
+            facets[column] = col.multiselect(column, index.facet_values(column), key=f"search_facet_{column}")
+    col1, col2 = st.columns(2)
+    k = col1.slider("Results", 5, 100, 20, 5, key="search_k")
+    match_all = col2.radio("Tags", ["Match all", "Match any"], horizontal=True, key="search_match") == "Match all"
+
+    if query.strip() or any(facets.values()):
+        with timer("search_query"):
+            hits = index.search(query, k=k, facets=facets, match_all=match_all)
+        if hits:
+            st.dataframe(_results_frame(frame, hits))
+        else:
+            st.info("No matching challenges.")
+
+    st.subheader("🧭 Similar Challenges")
+    titles = index.titles
+    # Only the titles matching what was typed go to the browser, not every title in the dataset
+    typed = st.text_input("Similar to", placeholder="Type part of a challenge title", key="search_similar_title")
+    matches = index.find_titles(typed)
+    if typed.strip() and not matches:
+        st.info("No challenge title contains that text.")
+    elif matches:
+        choice = st.selectbox("Challenge", matches, format_func=lambda i: titles[i], key="search_similar")
+        if choice is not None and choice < len(titles):
+            hits = index.similar(choice, k=k, facets=facets, match_all=match_all)
+            if hits:
+                st.dataframe(_results_frame(frame, hits))
+
+    with st.expander("🪞 Near-duplicate challenges"):
+        threshold = st.slider("Similarity threshold", 0.5, 1.0, 0.9, 0.01, key="search_dup_threshold")
+        # Compares every pair of rows, so it only runs on request; the result is kept until the dataset changes
+        pairs = index.cached_near_duplicates(threshold)
+        if pairs is None and st.button("🔍 Find near-duplicates", key="search_dup_run"):
+            with st.spinner("Comparing challenges..."), timer("near_duplicates", rows=len(index)):
+                pairs = index.near_duplicates(threshold)
+        if pairs:
+            st.dataframe([{"Title": titles[i], "Duplicate of": titles[j], "Score": round(score, 3)}
+                          for i, j, score in pairs[:500]])
+        elif pairs is not None:
+            st.caption("No pairs above the threshold.")
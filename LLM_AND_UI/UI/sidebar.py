@@ -0,0 +1,115 @@
+import json
+
+import streamlit as st
+
+from LLM_AND_UI.cache import get_cache
+from LLM_AND_UI.config import LLM_BACKEND, MERGE_MODEL, TAG_MODEL
+from LLM_AND_UI.jobs import get_runner
+from LLM_AND_UI.ratelimit import get_limiter
+from LLM_AND_UI.state import session_metrics
+
+
+def use_cache():
+    return not st.session_state.get("bypass_cache", False)
+
+
+# Session key each tab polls for a job, by the dataset the job fills
+JOB_KEYS = {"upload_df": "upload_job", "scrape_df": "scrape_analyze_job", "scraped_sheets": "scrape_job"}
+
+
+def render_sidebar():
+    with st.sidebar:
+        _render_jobs()
+        _render_metrics()
+
+        models = TAG_MODEL if TAG_MODEL == MERGE_MODEL else f"{TAG_MODEL} (tagging) · {MERGE_MODEL} (merge)"
+        st.caption(f"🤖 {models}" + (f" · {LLM_BACKEND} backend" if LLM_BACKEND != "gemini" else ""))
+
+        rpm = get_limiter().current_rpm
+        if rpm is not None:
+            st.caption(f"⏱️ Model request rate: {rpm:.0f}/min")
+
+        st.header("🗄️ Response Cache")
+        cache = get_cache()
+        if cache is None:
+            st.caption("Cache disabled (CACHE_ENABLED=0).")
+            return
+
+        st.checkbox("Bypass cache (always call the model)", key="bypass_cache")
+        stats = cache.stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Hits", stats["hits"])
+        col2.metric("Misses", stats["misses"])
+        st.caption(f"{stats['entries']} cached responses · {stats['bytes'] / 1024:.0f} KB")
+
+        if st.button("🧹 Clear cache"):
+            cache.clear()
+            st.success("Cache cleared.")
+
+
+def _render_jobs():
+    jobs = get_runner().store.recent(5)
+    if not jobs:
+        return
+    st.header("🧵 Background Jobs")
+    for job in jobs:
+        st.caption(f"`{job['id']}` {job['kind']} · {job['status']} · {job['done']}/{job['total'] or '?'}")
+        key = JOB_KEYS.get(job["target"])
+        # After a restart the session no longer knows about its jobs; this re-attaches one to its tab
+        if key and job["status"] != "failed" and st.session_state.get(key) != job["id"]:
+            if st.button("📥 Load into tab", key=f"load_job_{job['id']}"):
+                st.session_state[key] = job["id"]
+                st.rerun()
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "—"
+    return f"{seconds / 60:.1f} min" if seconds >= 90 else f"{seconds:.0f} s"
+
+
+@st.fragment(run_every=2)
+def _render_metrics():
+    # This session's latest run; background jobs save their own traces
+    metrics = session_metrics()
+    if metrics is None:
+        return
+    snap = metrics.snapshot()
+    if not snap["stages"]:
+        return
+    st.header("📈 Run Metrics")
+    state = "done" if snap["finished"] else "running"
+    st.caption(f"{snap['label']} · {state} · {snap['elapsed_s']:.0f} s · {snap['rows']}/{snap['expected'] or '?'} rows")
+
+    counters = snap["counters"]
+    model = snap["stages"].get("model_call", {})
+    col1, col2 = st.columns(2)
+    col1.metric("Rows/s", f"{snap['rows_per_s']:.2f}")
+    col2.metric("ETA", format_eta(snap["eta_s"]) if not snap["finished"] else "—")
+    col1.metric("p50 model call", f"{model.get('p50_ms', 0) / 1000:.1f} s")
+    col2.metric("p95 model call", f"{model.get('p95_ms', 0) / 1000:.1f} s")
+    col1.metric("Tokens", f"{counters.get('prompt_tokens', 0) + counters.get('output_tokens', 0):,}")
+    col2.metric("Est. cost", f"${snap['cost_usd']:.3f}")
+
+    details = [
+        f"{counters.get('model_calls', 0)} model calls",
+        f"{counters.get('retries', 0)} retries",
+        f"{counters.get('cache_hits', 0)} cache hits",
+    ]
+    if counters.get("coalesced"):
+        details.append(f"🤝 {counters['coalesced']} replies shared by other sessions")
+    if "page_fetch" in snap["stages"]:
+        fetch = snap["stages"]["page_fetch"]
+        details.append(f"{fetch['calls']} pages (p50 {fetch['p50_ms']:.0f} ms)")
+    if counters.get("prompts_trimmed"):
+        details.append(f"✂️ {counters['prompts_trimmed']} prompts trimmed, ~{counters['prompt_tokens_saved']:,} tokens saved")
+    if counters.get("estimated_token_calls"):
+        details.append("tokens estimated")
+    st.caption(" · ".join(details))
+    st.download_button(
+        "📥 Download trace (JSON)",
+        lambda: json.dumps(metrics.trace()),
+        f"trace_{snap['run_id']}.json",
+        mime="application/json",
+        key="metrics_trace",
+    )
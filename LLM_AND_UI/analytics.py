@@ -0,0 +1,229 @@
+import argparse
+import heapq
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .metrics import timer
+from .parser import split_list
+
+# List columns produced by parse_output that the planning views aggregate
+LIST_COLUMNS = ["Workshops", "Mentors", "Skills", "Fields"]
+
+_EDGE_PUNCT = re.compile(r"^[\W_]+|[\W_]+$")
+_SPACES = re.compile(r"\s+")
+_TRAILING_NOTE = re.compile(r"\s*\([^()]*\)$")
+_EMPTY = frozenset({"", "none", "n/a", "na", "nan", "null", "-", "tbd"})
+
+
+def canonical(item):
+    # Matching key for a list item: case, spacing, edge punctuation, a trailing "(e.g. ...)" note and "&"/"and"
+    # differences are ignored
+    key = _TRAILING_NOTE.sub("", str(item).casefold().replace("&", " and "))
+    key = _EDGE_PUNCT.sub("", _SPACES.sub(" ", key)).strip()
+    return "" if key in _EMPTY else key
+
+
+def cell_items(cell):
+    # (key, spelling) pairs for one list cell, first occurrence of each key kept
+    items = {}
+    for raw in split_list(cell):
+        key = canonical(raw)
+        if key and key not in items:
+            items[key] = raw
+    return tuple(items.items())
+
+
+def long_form(df, columns=LIST_COLUMNS, memo=None):
+    # One row per (challenge, column, item). "row" is the challenge's position in df and "value" is a categorical
+    # of canonical items, labelled with the most common spelling seen for each. memo maps cell text to its
+    # items; passing the same dict across dataset versions means only new or edited cells are split again.
+    memo = {} if memo is None else memo
+    rows, cols, keys, raws = [], [], [], []
+    for col in columns:
+        if col not in df.columns:
+            continue
+        for pos, cell in enumerate(df[col].tolist()):
+            if not isinstance(cell, str):
+                if cell is None or cell != cell:
+                    continue
+                cell = ", ".join(map(str, cell)) if isinstance(cell, (list, tuple)) else str(cell)
+            items = memo.get(cell)
+            if items is None:
+                items = memo[cell] = cell_items(cell)
+            for key, raw in items:
+                rows.append(pos)
+                cols.append(col)
+                keys.append(key)
+                raws.append(raw)
+
+    long = pd.DataFrame({"row": np.array(rows, dtype=np.int64), "column": cols, "key": keys, "raw": raws})
+    labels = (long.groupby(["column", "key", "raw"], sort=False).size()
+              .sort_values(ascending=False, kind="stable").reset_index()
+              .drop_duplicates(["column", "key"]).set_index(["column", "key"])["raw"])
+    values = labels.reindex(pd.MultiIndex.from_frame(long[["column", "key"]])).to_numpy() if len(long) else []
+    return pd.DataFrame({
+        "row": long["row"].to_numpy(),
+        "column": pd.Categorical(cols, categories=[c for c in columns if c in df.columns]),
+        "value": pd.Categorical(values),
+    })
+
+
+class Analytics:
+    # Frequencies, co-occurrence and coverage for one dataset version. The long-form table is built once and
+    # every result is memoized, so reruns of an unchanged dataset cost nothing.
+    def __init__(self, df, columns=LIST_COLUMNS, memo=None):
+        self.rows = len(df)
+        with timer("analytics_long_form", rows=self.rows):
+            self.long = long_form(df, columns, memo)
+        self.columns = list(self.long["column"].cat.categories)
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _memo(self, key, build):
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = build()
+            return self._results[key]
+
+    def _items(self, column):
+        # (row positions, category codes, labels) for one column, with codes renumbered to the labels present
+        items = self.long[self.long["column"] == column]
+        values = items["value"].cat.remove_unused_categories()
+        return items["row"].to_numpy(), values.cat.codes.to_numpy(), list(values.cat.categories)
+
+    def _matrix(self, column, top):
+        # Boolean challenges x items incidence matrix for the column's top items, most common first
+        rows, codes, labels = self._items(column)
+        keep = np.argsort(-np.bincount(codes, minlength=len(labels)), kind="stable")[:top]
+        slot = np.full(len(labels), -1)
+        slot[keep] = np.arange(len(keep))
+        matrix = np.zeros((self.rows, len(keep)), dtype=bool)
+        kept = slot[codes] >= 0
+        matrix[rows[kept], slot[codes[kept]]] = True
+        return matrix, [labels[i] for i in keep]
+
+    def frequencies(self, column):
+        def build():
+            rows, codes, labels = self._items(column)
+            counts = np.bincount(codes, minlength=len(labels))
+            result = pd.DataFrame({column: labels, "Challenges": counts})
+            result["Share"] = (result["Challenges"] / max(self.rows, 1)).round(3)
+            return result.sort_values(["Challenges", column], ascending=[False, True], ignore_index=True)
+
+        return self._memo(("frequencies", column), build)
+
+    def cooccurrence(self, column, other=None, top=15):
+        # Challenges sharing each pair of the top items (of one column, or across two columns)
+        other = other or column
+
+        def build():
+            left, left_labels = self._matrix(column, top)
+            right, right_labels = (left, left_labels) if other == column else self._matrix(other, top)
+            counts = left.T.astype(np.int32) @ right.astype(np.int32)
+            return pd.DataFrame(counts, index=left_labels, columns=right_labels)
+
+        return self._memo(("cooccurrence", column, other, top), build)
+
+    def coverage(self, column, target=0.8):
+        # Greedy set cover: the fewest items (e.g. mentor specializations) such that at least target of the
+        # challenges list one of them. Greedy is within a log factor of optimal. Each item's gain is kept up to
+        # date as challenges get covered, so the whole run touches every (challenge, item) pair once, and the
+        # best item comes off a lazy max-heap: gains only shrink, so a popped entry whose gain is stale is pushed
+        # back with its current gain, and one that is current is the argmax (ties to the lower item, as argmax).
+        def build():
+            rows, codes, labels = self._items(column)
+            gains = np.bincount(codes, minlength=len(labels))
+            by_item = np.argsort(codes, kind="stable")
+            item_start = np.searchsorted(codes[by_item], np.arange(len(labels) + 1))
+            by_row = np.argsort(rows, kind="stable")
+            row_start = np.searchsorted(rows[by_row], np.arange(self.rows + 1))
+            covered = np.zeros(self.rows, dtype=bool)
+            needed = int(np.ceil(target * self.rows))
+            done = 0
+            steps = []
+            heap = [(-int(gain), item) for item, gain in enumerate(gains)]
+            heapq.heapify(heap)
+            while done < needed and heap:
+                gain, best = heapq.heappop(heap)
+                if -gain != gains[best]:
+                    if gains[best]:
+                        heapq.heappush(heap, (-int(gains[best]), best))
+                    continue
+                if gain == 0:
+                    break
+                new = rows[by_item[item_start[best]:item_start[best + 1]]]
+                new = new[~covered[new]]
+                covered[new] = True
+                done += len(new)
+                # Newly covered challenges stop counting towards every item they list
+                starts, lengths = row_start[new], row_start[new + 1] - row_start[new]
+                offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+                np.subtract.at(gains, codes[by_row[offsets]], 1)
+                steps.append({column: labels[best], "New challenges": len(new),
+                              "Coverage": round(done / self.rows, 3)})
+            return pd.DataFrame(steps, columns=[column, "New challenges", "Coverage"])
+
+        return self._memo(("coverage", column, target), build)
+
+
+class AnalyticsCache:
+    # Analytics keyed by dataset version (DatasetStore.version_key); a changed dataset gets a fresh instance,
+    # rebuilt from the cells memo so an add/replace only re-splits the cells that changed
+    def __init__(self, max_items=8, max_cells=200000):
+        self.max_items = max_items
+        self.max_cells = max_cells
+        self._items = OrderedDict()
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def get(self, df, version):
+        with self._lock:
+            if version in self._items:
+                self._items.move_to_end(version)
+                return self._items[version]
+        if len(self._cells) > self.max_cells:
+            self._cells = {}
+        analytics = Analytics(df, memo=self._cells)
+        with self._lock:
+            self._items[version] = analytics
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return analytics
+
+
+_cache = AnalyticsCache()
+
+
+def get_analytics(df, version=None):
+    # version None skips the cache
+    return Analytics(df) if version is None else _cache.get(df, version)
+
+
+def main(argv=None):
+    from .ingest import read_table
+
+    parser = argparse.ArgumentParser(description="Print workshop/mentor/skill planning stats for an analyzed dataset.")
+    parser.add_argument("input")
+    parser.add_argument("--column", choices=LIST_COLUMNS, default="Mentors")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target", type=float, default=0.8, help="Share of challenges to cover")
+    parser.add_argument("--sheet", help="Input sheet (xlsx only)")
+    args = parser.parse_args(argv)
+
+    with open(args.input, "rb") as f:
+        analytics = Analytics(read_table(f.read(), args.input, args.sheet))
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(analytics.frequencies(args.column).head(args.top).to_string(index=False))
+        cover = analytics.coverage(args.column, args.target)
+        reached = cover["Coverage"].iloc[-1] if len(cover) else 0.0
+        print(f"\n{len(cover)} {args.column.lower()} cover {reached:.0%} of {analytics.rows} challenges "
+              f"(target {args.target:.0%}):")
+        print(cover.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
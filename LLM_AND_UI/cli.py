@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+# Flags override the matching .env settings, so they are applied before config is imported
+ENV_FLAGS = {
+    "rpm": "LLM_RPM",
+    "tpm": "LLM_TPM",
+    "max_retries": "LLM_MAX_RETRIES",
+    "output_mode": "OUTPUT_MODE",
+}
+
+
+def progress_path(output):
+    return f"{output}.progress.jsonl"
+
+
+def load_progress(path, digest):
+    # ({row index: AnalysisResult fields}, byte length of the complete lines) from an earlier run of the same
+    # input; ({}, 0) if there is none. Only newline-terminated lines count: an interrupted write leaves a torn
+    # last line, which the caller cuts off before appending more.
+    done = {}
+    if not os.path.exists(path):
+        return done, 0
+    with open(path, "rb") as f:
+        header = f.readline()
+        if not header.endswith(b"\n"):
+            return done, 0  # interrupted before the header was written
+        if json.loads(header).get("input") != digest:
+            raise SystemExit(f"❌ {path} belongs to a different input file; use --restart to start over")
+        end = len(header)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            done[entry.pop("i")] = entry
+            end += len(line)
+    return done, end
+
+
+def print_stats(results, elapsed, total, resumed, metrics=None, out=sys.stdout):
+    from .metrics import percentile
+
+    statuses = Counter(r.status for r in results)
+    latencies = [r.latency for r in results if r.latency is not None and r.status != "cached"]
+    rate = len(results) / elapsed if elapsed else 0.0
+    print(f"Analyzed {len(results)} rows in {elapsed:.1f}s ({rate:.2f} rows/s); "
+          f"{resumed} resumed from an earlier run, {total} total", file=out)
+    print("Status: " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items())), file=out)
+    if latencies:
+        print(f"Model latency (s): p50={percentile(latencies, 50):.2f} p95={percentile(latencies, 95):.2f} "
+              f"p99={percentile(latencies, 99):.2f} max={max(latencies):.2f}", file=out)
+    if metrics is not None:
+        counters = metrics.counters
+        estimated = " (estimated)" if counters["estimated_token_calls"] else ""
+        print(f"Tokens{estimated}: {counters['prompt_tokens']} in, {counters['output_tokens']} out; "
+              f"≈ ${metrics.cost():.4f}", file=out)
+        if counters["prompts_trimmed"]:
+            print(f"Prompt budget: trimmed {counters['prompts_trimmed']} prompts, "
+                  f"~{counters['prompt_tokens_saved']} tokens saved", file=out)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m LLM_AND_UI",
+        description="Analyze a file of challenge briefs without the Streamlit app.",
+    )
+    parser.add_argument("input", help="xlsx/csv/parquet/jsonl file with a Title column")
+    parser.add_argument("output", help="Result file; the format follows the extension unless --format is given")
+    parser.add_argument("--sheet", help="Input sheet (xlsx only, defaults to the first)")
+    parser.add_argument("--format", choices=["xlsx", "csv", "jsonl", "parquet"])
+    parser.add_argument("--concurrency", type=int, help="Parallel model calls (MAX_CONCURRENCY)")
+    parser.add_argument("--chunk-rows", type=int, default=200, help="Rows analyzed and checkpointed per chunk")
+    parser.add_argument("--pack-tokens", type=int, help="Pack several briefs per request (PACK_TOKEN_BUDGET)")
+    parser.add_argument("--rpm", type=int, help="Requests per minute (LLM_RPM, 0 = unlimited)")
+    parser.add_argument("--tpm", type=int, help="Tokens per minute (LLM_TPM, 0 = unlimited)")
+    parser.add_argument("--max-retries", type=int, help="Retries per call (LLM_MAX_RETRIES)")
+    parser.add_argument("--output-mode", choices=["json", "text"], help="OUTPUT_MODE")
+    parser.add_argument("--no-cache", action="store_true", help="Skip the response cache")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run rows that failed in an earlier run")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start from the first row")
+    parser.add_argument("--trace", help="Write a JSON trace of per-stage timings and counters to this path")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+    for flag, env in ENV_FLAGS.items():
+        if getattr(args, flag) is not None:
+            os.environ[env] = str(getattr(args, flag))
+
+    from .export import FORMATS, write_export
+    from .ingest import file_digest, read_table
+    from .llm import AnalysisResult, analyze_briefs
+    from .metrics import start_run
+    from .parser import OUTPUT_COLUMNS
+    from .pipeline import analyzed_row
+    from .prompt import CONTENT_FIELDS
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise SystemExit(f"❌ Unsupported output format: {fmt or args.output}")
+
+    with open(args.input, "rb") as f:
+        data = f.read()
+    df = read_table(data, args.input, args.sheet, columns=CONTENT_FIELDS)
+    if "Title" not in df.columns:
+        raise SystemExit("❌ Input must have a 'Title' column")
+    rows = df.to_dict("records")
+    digest = file_digest(data)
+
+    path = progress_path(args.output)
+    if args.restart and os.path.exists(path):
+        os.remove(path)
+    done, end = load_progress(path, digest)
+    if os.path.exists(path) and os.path.getsize(path) > end:
+        # Appending after a torn line would glue the next record onto it and lose everything written after
+        os.truncate(path, end)
+    if args.retry_failed:
+        done = {i: r for i, r in done.items() if r["status"] != "failed"}
+    resumed = len(done)
+    pending = [i for i in range(len(rows)) if i not in done]
+    if resumed:
+        print(f"Resuming: {resumed} of {len(rows)} rows already done")
+
+    results = []
+    metrics = start_run(f"cli {os.path.basename(args.input)}")
+    started = time.perf_counter()
+    try:
+        with open(path, "a", encoding="utf-8") as progress:
+            if progress.tell() == 0:
+                progress.write(json.dumps({"input": digest, "rows": len(rows)}) + "\n")
+            # Each chunk is checkpointed once it finishes, so an interrupted run loses at most one chunk
+            for start in range(0, len(pending), args.chunk_rows):
+                chunk = pending[start:start + args.chunk_rows]
+
+                def on_result(j, result, chunk=chunk):
+                    done[chunk[j]] = result._asdict()
+                    results.append(result)
+                    progress.write(json.dumps({"i": chunk[j], **result._asdict()}, ensure_ascii=False) + "\n")
+
+                analyze_briefs(
+                    [rows[i] for i in chunk],
+                    max_concurrency=args.concurrency,
+                    use_cache=not args.no_cache,
+                    pack_tokens=args.pack_tokens,
+                    on_result=on_result,
+                )
+                progress.flush()
+                os.fsync(progress.fileno())
+                print(f"  {len(rows) - len(pending) + start + len(chunk)}/{len(rows)} rows", flush=True)
+    except KeyboardInterrupt:
+        print(f"\n⏸️ Interrupted; progress is saved in {path}, run the same command again to resume")
+        return 130
+    elapsed = time.perf_counter() - started
+
+    def frames():
+        import pandas as pd
+
+        # Every chunk gets the same columns so csv headers and parquet schemas line up
+        columns = OUTPUT_COLUMNS + ["Status", "Unparsed"]
+        for start in range(0, len(rows), args.chunk_rows):
+            yield pd.DataFrame([
+                analyzed_row(rows[i]["Title"], AnalysisResult(**done[i]))
+                for i in range(start, min(start + args.chunk_rows, len(rows)))
+            ], columns=columns)
+
+    write_export(frames(), args.output, fmt, sheet_name="Analyzed")
+    os.remove(path)
+    metrics.finish()
+    print(f"✅ Wrote {len(rows)} rows to {args.output}")
+    print_stats(results, elapsed, len(rows), resumed, metrics)
+    if args.trace:
+        print(f"Trace saved to {metrics.save_trace(args.trace)}")
+    return 0 if all(r["status"] != "failed" for r in done.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
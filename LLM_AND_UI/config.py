@@ -1,20 +1,92 @@
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 # Load .env variables
 load_dotenv()
 
-# Setup Gemini
-api_key = os.getenv("GEMINI_API_KEY")
-model_name = os.getenv("MODEL_NAME", "gemini-2.5-pro")
-if not api_key:
-    raise ValueError("Missing GEMINI_API_KEY in .env file")
+# Model clients are built on first use (see models.py), so importing this module never needs a key or the SDK
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" or "stub" (offline, canned replies)
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+MODEL_NAME = os.getenv("MODEL_NAME", "gemini-2.5-pro")
+# Per-task models, e.g. a cheaper one for tagging and a stronger one for merges
+TAG_MODEL = os.getenv("TAG_MODEL", MODEL_NAME)
+MERGE_MODEL = os.getenv("MERGE_MODEL", MODEL_NAME)
 
-genai.configure(api_key=api_key)
-model = genai.GenerativeModel(model_name="gemini-2.5-pro")
+# Batch analysis
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "4"))
+
+# "json" asks the model for schema-constrained JSON, "text" for the labelled free-text format
+OUTPUT_MODE = os.getenv("OUTPUT_MODE", "json")
+
+# Challenge sections are trimmed to fit this many (estimated) tokens per prompt, lowest priority first
+# (0 = send everything verbatim); a trimmed section keeps at least PROMPT_SECTION_MIN_TOKENS
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "0"))
+PROMPT_SECTION_MIN_TOKENS = int(os.getenv("PROMPT_SECTION_MIN_TOKENS", "64"))
+
+# Packed mode: several challenges per request, sized to fit this token budget (0 = one challenge per request)
+PACK_TOKEN_BUDGET = int(os.getenv("PACK_TOKEN_BUDGET", "0"))
+PACK_MAX_SIZE = int(os.getenv("PACK_MAX_SIZE", "10"))
+PACK_OUTPUT_TOKENS = int(os.getenv("PACK_OUTPUT_TOKENS", "300"))
+
+# Background jobs run at most this many at a time. A running job is leased to one app process and the lease
+# renewed every JOB_LEASE_TTL / 3 seconds; another process resumes the job only once its lease has expired.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_TTL = float(os.getenv("JOB_LEASE_TTL", "60"))
+
+# Rate limits and retries (0 disables a limit)
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_TPM = int(os.getenv("LLM_TPM", "1000000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
 
 # Directory Configs
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 SCRAPER_DIR = os.path.join(BASE_DIR, "scraping_challenges_info")
 CHALLENGE_OUTPUT_PREFIX = "nasa_challenges_"
+# Scraped records and the rows analyzed from them carry a hash of the record's contents, so a later scrape can
+# tell whether an analysis is stale
+CONTENT_HASH_COLUMN = "Content Hash"
+
+# Parsed input files kept in memory across reruns
+INGEST_CACHE_MB = int(os.getenv("INGEST_CACHE_MB", "256"))
+# Prepared downloads kept in memory until the dataset changes
+EXPORT_CACHE_MB = int(os.getenv("EXPORT_CACHE_MB", "128"))
+
+# Response cache
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "20000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+CACHE_MAX_AGE_DAYS = float(os.getenv("CACHE_MAX_AGE_DAYS", "30"))
+
+# Record/replay backends (LLM_BACKEND=record / replay): "record" wraps RECORD_BACKEND and saves every reply,
+# "replay" answers from the recording with simulated latency (seconds, or "recorded") and error rate
+REPLAY_PATH = os.getenv("REPLAY_PATH", os.path.join(CACHE_DIR, "replay.jsonl"))
+RECORD_BACKEND = os.getenv("RECORD_BACKEND", "gemini")
+REPLAY_LATENCY = os.getenv("REPLAY_LATENCY", "0")
+REPLAY_JITTER = float(os.getenv("REPLAY_JITTER", "0"))
+REPLAY_ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+REPLAY_MISSING = os.getenv("REPLAY_MISSING", "stub")  # prompts not in the recording: "stub" reply or "error"
+REPLAY_SEED = os.getenv("REPLAY_SEED")
+
+# OpenAI-compatible HTTP backend (LLM_BACKEND=openai), e.g. a local vLLM / llama.cpp / Ollama server
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "http://localhost:8000/v1")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "120"))
+
+# Metrics: USD per million tokens for the cost estimate, and where run traces are saved
+PRICE_INPUT_PER_M = float(os.getenv("PRICE_INPUT_PER_M", "1.25"))
+PRICE_OUTPUT_PER_M = float(os.getenv("PRICE_OUTPUT_PER_M", "10.0"))
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(CACHE_DIR, "traces"))
+
+# Search index: hashed TF-IDF vector width (memory is 4 bytes x SEARCH_DIM per row)
+SEARCH_DIM = int(os.getenv("SEARCH_DIM", "1024"))
+
+# Shared state (SHARED_STATE=0 keeps every session to itself): datasets, section locks and in-flight prompts in
+# CACHE_DIR/shared.sqlite3, so several organizers on one deployment see the same data and never pay twice for
+# the same prompt. Locks expire after LOCK_TTL seconds; a session waits up to COALESCE_TIMEOUT seconds for another
+# one's identical prompt before sending it itself.
+SHARED_STATE = os.getenv("SHARED_STATE", "1") != "0"
+LOCK_TTL = float(os.getenv("LOCK_TTL", "900"))
+COALESCE_TIMEOUT = float(os.getenv("COALESCE_TIMEOUT", "300"))
@@ -0,0 +1,171 @@
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+_store_ids = itertools.count(1)
+
+
+def normalize_title(title):
+    return " ".join(str(title).split()).casefold()
+
+
+def _is_missing(value):
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value))
+
+
+def _fits(array, value):
+    # Whether value can be stored in array as is; numpy would otherwise coerce it (e.g. "3" into a float column)
+    kind = array.dtype.kind
+    if kind == "O":
+        return True
+    if kind == "b":
+        return isinstance(value, (bool, np.bool_))
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if kind in "iu":
+        return isinstance(value, (int, np.integer))
+    return isinstance(value, (int, float, np.integer, np.floating)) or _is_missing(value)
+
+
+def _same(old, new):
+    # Whether writing new over old would leave the cell as it reads now
+    if old is new or (_is_missing(old) and _is_missing(new)):
+        return True
+    try:
+        return type(old) is type(new) and bool(old == new)
+    except (TypeError, ValueError):
+        return False
+
+
+class DatasetStore:
+    # An analyzed dataset keyed by normalized title.
+    # Rows live in one numpy array per column with spare capacity (doubled when full), so an insert writes one
+    # slot per column and reading the frame afterwards wraps the first len(self) slots without copying them:
+    # an insert followed by .frame costs the same at 1k rows as at 50k. Text and other non-numeric columns are
+    # object arrays; numeric and bool columns keep their dtype until a value that doesn't fit is written.
+    # Frames stay as they were read: replacing a row a frame can see first copies each column whose value
+    # changes (copy-on-write), so only replacements after a frame read pay for a copy.
+    def __init__(self, df=None):
+        df = pd.DataFrame() if df is None else df.reset_index(drop=True)
+        self._len = len(df)
+        self._capacity = max(16, self._len * 2)
+        self._columns = {}
+        for col in df.columns:
+            values = df[col].to_numpy()
+            if values.dtype.kind not in "biuf":
+                # Timestamps, pandas strings and categories become plain Python objects
+                values = df[col].astype(object).to_numpy()
+            array = np.empty(self._capacity, dtype=values.dtype)
+            array[:self._len] = values
+            self._columns[col] = array
+        self._frame = None
+        # Columns whose arrays are wrapped by a frame handed out, and how many rows that frame sees
+        self._shared = set()
+        self._shared_len = 0
+        self._index = {}
+        if "Title" in self._columns:
+            keys = [normalize_title(t) for t in self._columns["Title"][:self._len]]
+            # The first row with a given title is the one that gets replaced
+            for pos in range(len(keys) - 1, -1, -1):
+                self._index[keys[pos]] = pos
+        self.uid = next(_store_ids)
+        self.version = 0
+        self._listeners = []
+
+    @property
+    def version_key(self):
+        # Changes whenever the contents change, and differs between stores
+        return (self.uid, self.version)
+
+    def on_change(self, callback):
+        # callback(changes) runs after every upsert with [(position, row), ...] for the rows written
+        self._listeners.append(callback)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, title):
+        return normalize_title(title) in self._index
+
+    def position(self, title):
+        return self._index.get(normalize_title(title))
+
+    @property
+    def frame(self):
+        # Rebuilt only when rows or columns were added or a shared column was copied
+        if self._frame is None:
+            if self._columns:
+                self._frame = pd.concat(
+                    [pd.Series(array[:self._len], dtype=array.dtype, name=col, copy=False)
+                     for col, array in self._columns.items()],
+                    axis=1,
+                )
+            else:
+                self._frame = pd.DataFrame(index=pd.RangeIndex(self._len))
+            self._shared = set(self._columns)
+            self._shared_len = self._len
+        # A shallow copy shares the arrays but not the object, so pandas copy-on-write keeps writes to it out of
+        # the store
+        return self._frame.copy(deep=False)
+
+    def upsert(self, rows):
+        # Insert or replace rows by title; returns (inserted, replaced)
+        if isinstance(rows, pd.DataFrame):
+            rows = rows.to_dict("records")
+        elif isinstance(rows, (dict, pd.Series)):
+            rows = [rows]
+
+        changes = []
+        inserted = 0
+        for row in rows:
+            row = row.to_dict() if hasattr(row, "to_dict") else dict(row)
+            key = normalize_title(row.get("Title", ""))
+            pos = self._index.get(key)
+            if pos is None:
+                pos = self._index[key] = self._append_slot()
+                inserted += 1
+            self._write(pos, row)
+            changes.append((pos, row))
+
+        self.version += 1
+        for callback in self._listeners:
+            callback(changes)
+        return inserted, len(rows) - inserted
+
+    def _append_slot(self):
+        if self._len == self._capacity:
+            self._capacity *= 2
+            for col, array in self._columns.items():
+                grown = np.empty(self._capacity, dtype=array.dtype)
+                grown[:self._len] = array[:self._len]
+                self._columns[col] = grown
+            self._shared.clear()
+        self._len += 1
+        self._frame = None
+        return self._len - 1
+
+    def _write(self, pos, row):
+        # Replacing a row clears columns the new row doesn't have, like assigning the whole row did
+        for col, value in row.items():
+            if col not in self._columns:
+                # Earlier rows get missing values, so a new numeric column is float
+                numeric = isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+                array = np.empty(self._capacity, dtype=float if numeric else object)
+                array[:self._len] = np.nan
+                self._columns[col] = array
+                self._frame = None
+        for col, array in self._columns.items():
+            value = row.get(col, np.nan)
+            if not _fits(array, value):
+                # e.g. text written into a numeric column, or a missing value into an int one
+                numeric = array.dtype.kind in "iu" and (isinstance(value, (float, np.floating)) or _is_missing(value))
+                array = self._columns[col] = array.astype(float if numeric else object)
+                self._shared.discard(col)
+                self._frame = None
+            elif col in self._shared and pos < self._shared_len and not _same(array[pos], value):
+                array = self._columns[col] = array.copy()
+                self._shared.discard(col)
+                self._frame = None
+            array[pos] = value
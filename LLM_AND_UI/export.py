@@ -0,0 +1,169 @@
+import argparse
+import importlib.util
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .config import EXPORT_CACHE_MB
+from .metrics import get_metrics
+
+FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+CHUNK_ROWS = 5000
+
+
+def _chunks(data, size=CHUNK_ROWS):
+    # A DataFrame is sliced into row chunks; any other iterable is assumed to already yield DataFrames
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), size):
+            yield data.iloc[start:start + size]
+    else:
+        yield from data
+
+
+def _cell(value):
+    # openpyxl can't write NaN/NA or arbitrary objects
+    if value is None or (not isinstance(value, (list, tuple, dict)) and pd.isna(value)):
+        return None
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def write_export(data, target, fmt, sheet_name="Sheet1"):
+    # Streams a DataFrame (or an iterable of DataFrame chunks) to a path or binary file object,
+    # so only one chunk at a time is converted.
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    metrics = get_metrics()
+    with metrics.timer("export", fmt=fmt):
+        _write_chunks(_counted(_chunks(data), metrics), target, fmt, sheet_name)
+
+
+def _counted(chunks, metrics):
+    for chunk in chunks:
+        metrics.count("export_rows", len(chunk))
+        yield chunk
+
+
+def _write_chunks(chunks, target, fmt, sheet_name):
+    if fmt == "xlsx":
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+        header = None
+        for chunk in chunks:
+            if header is None:
+                header = list(chunk.columns)
+                sheet.append(header)
+            for row in chunk.itertuples(index=False, name=None):
+                sheet.append([_cell(v) for v in row])
+        workbook.save(target)
+        return
+
+    if fmt == "parquet":
+        _write_parquet(chunks, target)
+        return
+
+    handle = open(target, "wb") if isinstance(target, (str, os.PathLike)) else target
+    try:
+        for i, chunk in enumerate(chunks):
+            if fmt == "csv":
+                text = chunk.to_csv(index=False, header=i == 0)
+            else:
+                text = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+                text = text if not text or text.endswith("\n") else text + "\n"
+            handle.write(text.encode("utf-8"))
+    finally:
+        if handle is not target:
+            handle.close()
+
+
+def _write_parquet(chunks, target):
+    if not importlib.util.find_spec("pyarrow"):
+        pd.concat(list(chunks), ignore_index=True).to_parquet(target, index=False)
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            # Mixed-type object columns are written as text so every chunk shares one schema
+            text_cols = [c for c in chunk.columns if chunk[c].dtype == object]
+            if text_cols:
+                chunk = chunk.copy()
+                chunk[text_cols] = chunk[text_cols].astype(str).where(chunk[text_cols].notna(), None)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+class ExportCache:
+    # Rendered exports keyed by (dataset version, format); rebuilt only when the dataset changes. An LRU bounded
+    # by the total size of the files it holds.
+    def __init__(self, max_bytes=EXPORT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        data = build()
+        with self._lock:
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+        return data
+
+
+_cache = ExportCache()
+
+
+def export_bytes(df, fmt, sheet_name="Sheet1", version=None):
+    # version identifies the dataset contents (e.g. DatasetStore.version_key); None disables caching
+    def build():
+        out = io.BytesIO()
+        write_export(df, out, fmt, sheet_name)
+        return out.getvalue()
+
+    return build() if version is None else _cache.get_or_build((version, fmt, sheet_name), build)
+
+
+def main(argv=None):
+    from .ingest import read_table
+
+    parser = argparse.ArgumentParser(description="Convert an analyzed dataset between xlsx/csv/jsonl/parquet.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=list(FORMATS), help="Defaults to the output file extension")
+    parser.add_argument("--sheet", help="Input sheet (xlsx only)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    with open(args.input, "rb") as f:
+        df = read_table(f.read(), args.input, args.sheet)
+    write_export(df, args.output, fmt, sheet_name=args.sheet or "Sheet1")
+    print(f"Wrote {len(df)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .config import INGEST_CACHE_MB
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+SUPPORTED_SUFFIXES = EXCEL_SUFFIXES + (".csv", ".parquet", ".jsonl", ".ndjson")
+
+# calamine (Rust) parses xlsx many times faster than openpyxl; pandas >= 2.2 can use it when installed
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+
+def file_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _suffix(name):
+    return os.path.splitext(name.lower())[1]
+
+
+class TableCache:
+    # LRU of parsed DataFrames bounded by their in-memory size
+    def __init__(self, max_bytes=INGEST_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, value):
+        size = int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) else 0
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+
+
+_cache = TableCache()
+
+
+def _wanted(columns):
+    wanted = {c.strip() for c in columns}
+    return lambda col: str(col).strip() in wanted
+
+
+def list_sheets(data, name):
+    if _suffix(name) not in EXCEL_SUFFIXES:
+        return [os.path.basename(name)]
+    key = (file_digest(data), "__sheets__")
+    sheets = _cache.get(key)
+    if sheets is None:
+        with pd.ExcelFile(io.BytesIO(data), engine=EXCEL_ENGINE) as excel:
+            sheets = list(excel.sheet_names)
+        _cache.put(key, sheets)
+    return sheets
+
+
+def read_table(data, name, sheet=None, columns=None):
+    # Parses (file contents, sheet, columns) once; later calls with the same inputs return the cached DataFrame.
+    # columns limits parsing to the named columns where the format allows it. Treat the result as read-only.
+    suffix = _suffix(name)
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported file type: {name}")
+
+    key = (file_digest(data), sheet, tuple(columns) if columns else None)
+    df = _cache.get(key)
+    if df is not None:
+        return df
+
+    usecols = _wanted(columns) if columns else None
+    buffer = io.BytesIO(data)
+    if suffix in EXCEL_SUFFIXES:
+        df = pd.read_excel(buffer, sheet_name=sheet or 0, usecols=usecols, engine=EXCEL_ENGINE)
+    elif suffix == ".csv":
+        df = pd.read_csv(buffer, usecols=usecols)
+    elif suffix == ".parquet":
+        df = _read_parquet(buffer, columns)
+    else:
+        df = pd.read_json(buffer, lines=True)
+        if columns:
+            df = df[[c for c in df.columns if usecols(c)]]
+
+    df.columns = df.columns.astype(str).str.strip()
+    _cache.put(key, df)
+    return df
+
+
+def _read_parquet(buffer, columns):
+    if columns and importlib.util.find_spec("pyarrow"):
+        import pyarrow.parquet as pq
+
+        # Only the requested column chunks are read from disk
+        names = pq.read_schema(buffer).names
+        buffer.seek(0)
+        wanted = _wanted(columns)
+        return pd.read_parquet(buffer, columns=[n for n in names if wanted(n)])
+    df = pd.read_parquet(buffer)
+    return df[[c for c in df.columns if _wanted(columns)(c)]] if columns else df
@@ -0,0 +1,344 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .config import CACHE_DIR, CONTENT_HASH_COLUMN, JOB_LEASE_TTL, JOB_WORKERS
+from .llm import AnalysisResult, analyze_briefs
+from .metrics import start_run
+from .pipeline import analyzed_row
+from .prompt import CONTENT_FIELDS
+
+ACTIVE = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobStore:
+    # Jobs and their per-row checkpoints, so a restart can pick up where a run stopped
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                target TEXT,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                total INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner TEXT,
+                lease_until REAL,
+                cancel_requested INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL"),
+                             ("cancel_requested", "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                # Job databases from before leases and shared cancellation
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_rows (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (job_id, idx)
+            )"""
+        )
+
+    @contextmanager
+    def _write(self):
+        # BEGIN IMMEDIATE takes the database write lock up front, so the check and the write can't interleave
+        # with another process; nothing is committed if the block raises
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def create(self, kind, params, target=None):
+        # Returns (job_id, created); an identical job that is still queued or running is reused instead,
+        # so sessions that ask for the same scrape or analysis share one run
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        params = json.dumps(params, default=str, sort_keys=True)
+        with self._write() as conn:
+            found = conn.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND target IS ? AND params = ? AND status IN ('queued', 'running') "
+                "AND NOT cancel_requested",
+                (kind, target, params),
+            ).fetchone()
+            if found is None:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, target, status, params, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                    (job_id, kind, target, params, now, now),
+                )
+        return (job_id, True) if found is None else (found[0], False)
+
+    def claim(self, job_id, owner, ttl=JOB_LEASE_TTL):
+        # Leases an unfinished job to owner and marks it running; False if another owner's lease is still valid
+        now = time.time()
+        with self._write() as conn:
+            claimed = conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running') "
+                "AND (owner IS NULL OR owner = ? OR lease_until < ?)",
+                (owner, now + ttl, now, job_id, owner, now),
+            ).rowcount
+        return claimed == 1
+
+    def renew(self, owner, ttl=JOB_LEASE_TTL):
+        # Extends the leases of every job owner is running
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = 'running'", (time.time() + ttl, owner)
+            )
+
+    def request_cancel(self, job_id):
+        # Seen by whichever process runs the job at its next progress check; a job nobody has started yet is
+        # cancelled right away
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ?, "
+                "status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+
+    def cancel_requested(self, job_id):
+        with self._lock:
+            found = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(found and found[0])
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def checkpoint(self, job_id, idx, result):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_rows VALUES (?, ?, ?)", (job_id, idx, json.dumps(result, default=str))
+            )
+            self._conn.execute(
+                "UPDATE jobs SET done = (SELECT COUNT(*) FROM job_rows WHERE job_id = ?), updated_at = ? WHERE id = ?",
+                (job_id, time.time(), job_id),
+            )
+
+    def rows(self, job_id):
+        with self._lock:
+            found = self._conn.execute("SELECT idx, result FROM job_rows WHERE job_id = ?", (job_id,)).fetchall()
+        return {idx: json.loads(result) for idx, result in found}
+
+    def get(self, job_id):
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            names = [d[0] for d in cursor.description]
+        if row is None:
+            return None
+        job = dict(zip(names, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def recent(self, limit=10):
+        with self._lock:
+            ids = self._conn.execute("SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self.get(job_id) for (job_id,) in ids]
+
+    def unfinished(self, orphaned_after=JOB_LEASE_TTL):
+        # Jobs no live process is running: a running job whose lease expired, or one that has been queued for
+        # longer than a lease without anyone claiming it (its process stopped before starting it)
+        now = time.time()
+        with self._lock:
+            ids = self._conn.execute(
+                "SELECT id FROM jobs WHERE (status = 'running' AND (lease_until IS NULL OR lease_until < ?)) "
+                "OR (status = 'queued' AND owner IS NULL AND created_at < ?) ORDER BY created_at",
+                (now, now - orphaned_after),
+            ).fetchall()
+        return [job_id for (job_id,) in ids]
+
+
+class JobRunner:
+    # Runs jobs on worker threads that outlive Streamlit reruns; sessions poll the store for progress.
+    # Several app processes can share one job database: a job runs in whichever process claims its lease, and
+    # the others only pick it up (from its last checkpoint) once that lease has expired.
+    def __init__(self, store, workers=JOB_WORKERS, lease_ttl=JOB_LEASE_TTL):
+        self.store = store
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_ttl = lease_ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._submitted = set()
+        self._submitted_lock = threading.Lock()
+        self._resume_orphans()
+        threading.Thread(target=self._heartbeat, daemon=True, name="job-lease").start()
+
+    def _resume_orphans(self):
+        # Jobs interrupted by a crash or restart resume from their last checkpoint
+        for job_id in self.store.unfinished(orphaned_after=self.lease_ttl):
+            self._enqueue(job_id)
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.lease_ttl / 3)
+            self.store.renew(self.owner, self.lease_ttl)
+            self._resume_orphans()
+
+    def _enqueue(self, job_id):
+        with self._submitted_lock:
+            if job_id in self._submitted:
+                return
+            self._submitted.add(job_id)
+        self._pool.submit(self._run, job_id)
+
+    def submit(self, kind, params, target=None):
+        job_id, created = self.store.create(kind, params, target)
+        if created:
+            self._enqueue(job_id)
+        return job_id
+
+    def submit_analyze(self, rows, target=None, use_cache=True):
+        if hasattr(rows, "to_dict"):
+            rows = rows.to_dict("records")
+        # Only the prompt inputs (and the content hash the analysis keeps) are stored with the job
+        keys = (*CONTENT_FIELDS, CONTENT_HASH_COLUMN)
+        rows = [{key: row[key] for key in keys if key in row} for row in rows]
+        return self.submit("analyze", {"rows": rows, "use_cache": use_cache}, target)
+
+    def submit_scrape(self, url, target=None, export_excel=False):
+        return self.submit("scrape", {"url": url, "export_excel": export_excel}, target)
+
+    def cancel(self, job_id):
+        # Stored with the job, so it also stops a job another process is running
+        self.store.request_cancel(job_id)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _check(self, job_id):
+        if self.store.cancel_requested(job_id):
+            raise JobCancelled()
+
+    def _run(self, job_id):
+        try:
+            self._run_claimed(job_id)
+        finally:
+            with self._submitted_lock:
+                self._submitted.discard(job_id)
+
+    def _run_claimed(self, job_id):
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in ACTIVE:
+            return
+        if not self.store.claim(job_id, self.owner, self.lease_ttl):
+            return  # another process is running it
+        metrics = start_run(f"{job['kind']} job {job_id[:8]}")
+        try:
+            # e.g. an orphaned job that was cancelled after its process died
+            self._check(job_id)
+            if job["kind"] == "analyze":
+                self._run_analyze(job)
+            elif job["kind"] == "scrape":
+                self._run_scrape(job)
+            else:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            self.store.update(job_id, status="done")
+        except JobCancelled:
+            self.store.update(job_id, status="cancelled")
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e))
+        finally:
+            metrics.finish()
+            metrics.save_trace()
+
+    def _run_analyze(self, job):
+        job_id = job["id"]
+        rows = job["params"]["rows"]
+        pending = [i for i in range(len(rows)) if i not in self.store.rows(job_id)]
+        self.store.update(job_id, total=len(rows))
+
+        def on_result(i, result):
+            self.store.checkpoint(job_id, pending[i], result._asdict())
+            self._check(job_id)
+
+        analyze_briefs([rows[i] for i in pending], use_cache=job["params"].get("use_cache", True), on_result=on_result)
+
+    def _run_scrape(self, job):
+        # The page store makes a resumed scrape cheap, so scrapes simply restart (as a new run).
+        # The records go to the job's own scrape run; the job only keeps the run ID.
+        from scraping_challenges_info.run_store import get_run_store
+        from scraping_challenges_info.scraper import scrape_challenges
+
+        job_id = job["id"]
+        run_id = get_run_store().start(job["params"]["url"])
+        self.store.update(job_id, result={"run_id": run_id})
+
+        def on_progress(done, total, title):
+            self.store.update(job_id, done=done, total=total)
+            self._check(job_id)
+
+        scrape_challenges(
+            job["params"]["url"], on_progress=on_progress, export_excel=job["params"].get("export_excel", False),
+            run_id=run_id,
+        )
+
+
+def analyze_job_results(job, store):
+    # AnalysisResult per input row, in order; rows without a checkpoint come back as None
+    rows = store.rows(job["id"])
+    return [AnalysisResult(**rows[i]) if i in rows else None for i in range(len(job["params"]["rows"]))]
+
+
+def analyze_job_frame(job, store):
+    # (analyzed DataFrame, results) for the rows a job has finished so far
+    results = [
+        (row, result)
+        for row, result in zip(job["params"]["rows"], analyze_job_results(job, store))
+        if result is not None
+    ]
+    return pd.DataFrame([analyzed_row(row["Title"], result, row) for row, result in results]), [r for _, r in results]
+
+
+def scrape_job_sheets(job):
+    from scraping_challenges_info.run_store import get_run_store
+
+    result = job["result"] or {}
+    if "run_id" in result:
+        return get_run_store().load(result["run_id"])
+    # Jobs from before scrape runs kept the records inline
+    return {name: pd.DataFrame(records) for name, records in result.items()}
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(JobStore(os.path.join(CACHE_DIR, "jobs.sqlite3")))
+        return _runner
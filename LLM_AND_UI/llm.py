@@ -1,25 +1,187 @@
 import json
-from .config import model
-from .prompt import build_prompt
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def analyze_brief(row):
-   # print(f"Row data: {row}")
-    prompt = build_prompt(row)
-   # print(f"Prompt built: {prompt}")
+from .cache import cache_key, get_cache
+from .config import MAX_CONCURRENCY, OUTPUT_MODE, PACK_MAX_SIZE, PACK_OUTPUT_TOKENS, PACK_TOKEN_BUDGET
+from .metrics import get_metrics, in_run
+from .models import get_model
+from .parser import RESPONSE_SCHEMA, parse_packed_output
+from .prompt import build_content, build_packed_prompt, build_prompt
+from .ratelimit import call_with_retry, estimate_tokens, get_limiter
+from .shared import coalesce
+
+# Per-row status: "ok", "cached", "retried" (succeeded after retries), "failed" or "skipped".
+# latency is the wall time in seconds of the call that produced the row (shared by every row of a pack).
+AnalysisResult = namedtuple("AnalysisResult", ["text", "status", "latency"], defaults=[None])
+
+logger = logging.getLogger(__name__)
+
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+
+
+def _generate_with_status(prompt, use_cache=True, generation_config=None, task="tag"):
+    # Identical prompts for the same model are served from the on-disk cache
+    model = get_model(task)
+    metrics = get_metrics()
+    cache = get_cache() if use_cache else None
+    model_name = getattr(model, "model_name", "")
+    key = cache_key(prompt, model_name)
+    if cache is None:
+        return _call_model(model, prompt, generation_config, task)
+
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.count("cache_hits")
+        return cached, "cached"
+    # Only one session or process sends a given prompt at a time; the others pick up its reply from the cache
+    with coalesce(key) as waited:
+        cached = cache.get(key) if waited else None
+        if cached is not None:
+            metrics.count("coalesced")
+            return cached, "cached"
+        metrics.count("cache_misses")
+        text, status = _call_model(model, prompt, generation_config, task)
+        cache.set(key, model_name, text)
+        return text, status
+
+
+def _call_model(model, prompt, generation_config, task):
+    metrics = get_metrics()
+
+    def call():
+        with metrics.timer("model_call", task=task):
+            return model.generate_content(prompt, generation_config=generation_config)
+
+    response, attempts = call_with_retry(call, limiter=get_limiter(), tokens=estimate_tokens(prompt))
+    text = response.text
+    metrics.count("model_calls")
+    metrics.count("retries", attempts - 1)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None and getattr(usage, "prompt_token_count", None) is not None:
+        metrics.add_tokens(usage.prompt_token_count, getattr(usage, "candidates_token_count", 0))
+    else:
+        metrics.add_tokens(estimate_tokens(prompt), estimate_tokens(text), estimated=True)
+    return text, "ok" if attempts == 1 else "retried"
+
+
+def _generate(prompt, use_cache=True, generation_config=None, task="tag"):
+    return _generate_with_status(prompt, use_cache, generation_config, task)[0]
+
+
+def analyze_brief_with_status(row, use_cache=True):
+    with get_metrics().timer("build_prompt"):
+        prompt = build_prompt(row, output_mode=OUTPUT_MODE)
     if not prompt:
-        return "Missing mandatory Title field"
+        return AnalysisResult("Missing mandatory Title field", "skipped")
+    generation_config = JSON_GENERATION_CONFIG if OUTPUT_MODE == "json" else None
+    started = time.perf_counter()
     try:
-        #print(f"Response received: here")
-        response = model.generate_content(prompt)
-       # print(f"Response received: {response.text}")
-        return response.text
+        text, status = _generate_with_status(prompt, use_cache=use_cache, generation_config=generation_config)
+        return AnalysisResult(text, status, time.perf_counter() - started)
     except Exception as e:
-        return f"Error: {str(e)}"
-    
+        return AnalysisResult(f"Error: {str(e)}", "failed", time.perf_counter() - started)
 
 
+def analyze_brief(row, use_cache=True):
+    return analyze_brief_with_status(row, use_cache).text
+
+
+def plan_packs(rows, token_budget, max_size=PACK_MAX_SIZE):
+    # Greedily group rows into packs whose estimated prompt + expected output fits the token budget.
+    # Returns a list of [(row_index, content), ...]; rows without a title are left out.
+    header = estimate_tokens(build_packed_prompt([]))
+    packs, current, used = [], [], header
+    for i, row in enumerate(rows):
+        content = build_content(row)
+        if content is None:
+            continue
+        cost = estimate_tokens(content) + PACK_OUTPUT_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_size):
+            packs.append(current)
+            current, used = [], header
+        current.append((i, content))
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _analyze_pack(rows, pack, use_cache=True):
+    if len(pack) == 1:
+        i = pack[0][0]
+        return [(i, analyze_brief_with_status(rows[i], use_cache))]
+
+    prompt = build_packed_prompt([(f"C{i}", content) for i, content in pack])
+    started = time.perf_counter()
+    try:
+        text, status = _generate_with_status(prompt, use_cache=use_cache)
+        records = parse_packed_output(text)
+    except Exception:
+        records, status = {}, None
+    latency = time.perf_counter() - started
+
+    # Records missing from (or malformed in) the packed response fall back to a single-row call
+    results = []
+    for i, _ in pack:
+        record = records.get(f"C{i}")
+        if record is None:
+            results.append((i, analyze_brief_with_status(rows[i], use_cache)))
+        else:
+            results.append((i, AnalysisResult(record, status, latency)))
+    return results
+
+
+def analyze_briefs(rows, max_concurrency=None, on_progress=None, use_cache=True, pack_tokens=None, on_result=None):
+    # Returns one AnalysisResult per row, in input order.
+    # on_result(index, result) and on_progress(done, total) run on the calling thread as rows complete;
+    # an exception raised from either cancels the rows that have not started yet.
+    # Accept a DataFrame or any iterable of dict-like rows
+    if hasattr(rows, "to_dict"):
+        rows = rows.to_dict("records")
+    rows = list(rows)
+    total = len(rows)
+    results = [None] * total
+    if not total:
+        return results
+    metrics = get_metrics()
+    metrics.expect(total)
+
+    pack_tokens = PACK_TOKEN_BUDGET if pack_tokens is None else pack_tokens
+    if pack_tokens:
+        packs = plan_packs(rows, pack_tokens)
+        packed = {i for pack in packs for i, _ in pack}
+        packs += [[(i, None)] for i in range(total) if i not in packed]
+    else:
+        packs = [[(i, None)] for i in range(total)]
+
+    workers = max(1, min(max_concurrency or MAX_CONCURRENCY, len(packs)))
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        analyze_pack = in_run(_analyze_pack, metrics)
+        futures = [pool.submit(analyze_pack, rows, pack, use_cache) for pack in packs]
+        # Progress is reported from the calling thread so Streamlit widgets can be updated safely
+        for future in as_completed(futures):
+            for i, result in future.result():
+                results[i] = result
+                done += 1
+                metrics.count("rows")
+                metrics.count(f"status_{result.status}")
+                if on_result:
+                    on_result(i, result)
+            if on_progress:
+                on_progress(done, total)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return results
+
 
-def smart_merge_rows(old_row, new_row):
+def smart_merge_rows(old_row, new_row, use_cache=True):
     # Normalize: convert Series to dict if needed
     if hasattr(old_row, "to_dict"):
         old_row = old_row.to_dict()
@@ -40,12 +202,14 @@ New:
 Return the merged result as a valid JSON object.
 """
     try:
-        response = model.generate_content(prompt)
+        text = _generate(
+            prompt, use_cache=use_cache, generation_config={"response_mime_type": "application/json"}, task="merge"
+        )
 
         # Try to find the start of the JSON block
-        json_start = response.text.find("{")
-        json_str = response.text[json_start:]
+        json_start = text.find("{")
+        json_str = text[json_start:]
         return json.loads(json_str)
     except Exception as e:
-        print("⚠️ Failed to parse merged response:", e)
+        logger.warning("Failed to parse merged response: %s", e)
         return new_row  # fallback
@@ -0,0 +1,165 @@
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .config import CONTENT_HASH_COLUMN, MAX_CONCURRENCY
+from .dataset import normalize_title
+from .llm import smart_merge_rows
+
+# Columns that describe how a row was produced rather than the challenge itself; newer values always win
+META_COLUMNS = {"Status", "Changed", "Unparsed", CONTENT_HASH_COLUMN}
+
+_NUM_PERM = 64
+_BANDS = 16
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 2**63, _NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, _NUM_PERM, dtype=np.uint64)
+
+_APOSTROPHES = re.compile(r"['’]")
+_PUNCT = re.compile(r"[\W_]+")
+_PLURAL = re.compile(r"\b(\w{3,}?)s\b")
+# Words that end in a single "s" without being plurals; "ss", "is" and "us" endings are kept as well
+_SINGULAR_S = {"mars", "gas", "atlas", "lens", "news", "series", "species", "physics", "mathematics", "always"}
+
+
+def _singular(match):
+    word = match.group(0)
+    if word in _SINGULAR_S or word.endswith(("ss", "is", "us")):
+        return word
+    return match.group(1)
+
+
+def match_key(title):
+    # Title as compared when matching: on top of normalize_title, punctuation, "&"/"and" and a plural "s" are
+    # ignored, so "Ocean Heat!" and "Lunar Dusts" match "Ocean Heat" and "Lunar Dust" exactly. Singular words
+    # that happen to end in "s" ("Mars", "Analysis", "Class") keep it
+    key = _APOSTROPHES.sub("", normalize_title(title).replace("&", " and "))
+    return _PLURAL.sub(_singular, " ".join(_PUNCT.sub(" ", key).split()))
+
+
+def _shingles(text, n=3):
+    text = f" {text} "
+    return {text[i:i + n] for i in range(max(1, len(text) - n + 1))}
+
+
+def _minhash(shingles):
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # Multiply-shift hashing, (a * x + b) mod 2**64 >> 32, for every permutation at once
+    return ((np.outer(hashes, _A) + _B) >> np.uint64(32)).min(axis=0)
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def match_titles(old_titles, new_titles, threshold=0.8):
+    # {new_position: old_position}. Titles with the same match_key match first; the rest are blocked with
+    # MinHash LSH over character 3-grams of the keys and confirmed with the exact Jaccard similarity.
+    old_keys = [match_key(t) for t in old_titles]
+    new_keys = [match_key(t) for t in new_titles]
+    exact = {}
+    for pos, key in enumerate(old_keys):
+        exact.setdefault(key, pos)
+
+    matches = {}
+    unmatched = []
+    for pos, key in enumerate(new_keys):
+        if key in exact:
+            matches[pos] = exact[key]
+        else:
+            unmatched.append(pos)
+    if not unmatched:
+        return matches
+
+    rows_per_band = _NUM_PERM // _BANDS
+    old_shingles = [_shingles(k) for k in old_keys]
+    buckets = {}
+    for pos, shingles in enumerate(old_shingles):
+        signature = _minhash(shingles)
+        for band in range(_BANDS):
+            buckets.setdefault((band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes()), []).append(pos)
+
+    taken = set(matches.values())
+    for pos in unmatched:
+        shingles = _shingles(new_keys[pos])
+        signature = _minhash(shingles)
+        candidates = set()
+        for band in range(_BANDS):
+            candidates.update(buckets.get((band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes()), ()))
+        scored = [(_jaccard(shingles, old_shingles[c]), c) for c in candidates if c not in taken]
+        best = max(scored, default=(0.0, None))
+        if best[1] is not None and best[0] >= threshold:
+            matches[pos] = best[1]
+            taken.add(best[1])
+    return matches
+
+
+def _empty(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or not str(value).strip()
+
+
+def _norm(value):
+    return "" if _empty(value) else " ".join(str(value).split())
+
+
+def resolve_pair(old_row, new_row, strategy="llm"):
+    # Returns (merged_row, resolution) or (None, "conflict") when only the model can decide
+    merged = {}
+    conflict = False
+    for col in dict.fromkeys([*old_row, *new_row]):
+        old, new = old_row.get(col), new_row.get(col)
+        # Rows were matched on the title, so the existing spelling is kept
+        if _norm(old) == _norm(new) or _empty(new) or (col == "Title" and not _empty(old)):
+            merged[col] = old
+        elif _empty(old) or col in META_COLUMNS:
+            merged[col] = new
+        else:
+            conflict = True
+            merged[col] = new
+
+    if not conflict:
+        differs = any(_norm(old_row.get(c)) != _norm(merged.get(c)) for c in merged if c not in META_COLUMNS)
+        return merged, "filled" if differs else "identical"
+    if strategy == "newer":
+        return merged, "newer"
+    return None, "conflict"
+
+
+def merge_datasets(old_df, new_df, threshold=0.8, strategy="llm", use_cache=True, max_concurrency=None):
+    # Returns (merged_df, counts of each resolution). Only real conflicts reach smart_merge_rows.
+    old_records = old_df.to_dict("records") if old_df is not None else []
+    new_records = new_df.to_dict("records")
+    old_titles = [r.get("Title", "") for r in old_records]
+    matches = match_titles(old_titles, [r.get("Title", "") for r in new_records], threshold)
+
+    merged = list(old_records)
+    counts = {"identical": 0, "filled": 0, "newer": 0, "llm": 0, "added": 0}
+    conflicts = []
+    for new_pos, record in enumerate(new_records):
+        old_pos = matches.get(new_pos)
+        if old_pos is None:
+            merged.append(record)
+            counts["added"] += 1
+            continue
+        row, resolution = resolve_pair(old_records[old_pos], record, strategy)
+        if row is None:
+            conflicts.append((old_pos, record))
+        else:
+            merged[old_pos] = row
+            counts[resolution] += 1
+
+    if conflicts:
+        def llm_merge(item):
+            old_pos, record = item
+            clean = lambda r: {k: (None if _empty(v) else v) for k, v in r.items()}
+            return old_pos, smart_merge_rows(clean(old_records[old_pos]), clean(record), use_cache=use_cache)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency or MAX_CONCURRENCY, len(conflicts)))) as pool:
+            for old_pos, row in pool.map(llm_merge, conflicts):
+                merged[old_pos] = row
+                counts["llm"] += 1
+
+    return pd.DataFrame(merged), counts
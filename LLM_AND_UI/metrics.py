@@ -0,0 +1,170 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from .config import PRICE_INPUT_PER_M, PRICE_OUTPUT_PER_M, TRACE_DIR
+
+# Per-stage samples kept for percentiles, and events kept for the JSON trace; totals are always exact
+MAX_SAMPLES = 10000
+MAX_TRACE_EVENTS = 50000
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+class Metrics:
+    # Timers, counters and token usage for one run (a batch, a scrape, a job). Safe to use from worker threads.
+    def __init__(self, label=""):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self.finished = None
+        self.expected = 0
+        self.counters = Counter()
+        self.samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+        self.totals = defaultdict(float)
+        self.calls = Counter()
+        self.events = []
+        self.dropped_events = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, name, **attrs):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, start=start, **attrs)
+
+    def record(self, name, seconds, start=None, **attrs):
+        with self._lock:
+            self.samples[name].append(seconds)
+            self.totals[name] += seconds
+            self.calls[name] += 1
+            if len(self.events) < MAX_TRACE_EVENTS:
+                offset = (start if start is not None else time.perf_counter() - seconds) - self.started
+                self.events.append({"name": name, "t": round(offset, 4), "s": round(seconds, 5), **attrs})
+            else:
+                self.dropped_events += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def add_tokens(self, prompt_tokens, output_tokens, estimated=False):
+        with self._lock:
+            self.counters["prompt_tokens"] += prompt_tokens or 0
+            self.counters["output_tokens"] += output_tokens or 0
+            if estimated:
+                self.counters["estimated_token_calls"] += 1
+
+    def expect(self, rows):
+        # Rows this run is going to produce, for the ETA
+        with self._lock:
+            self.expected += rows
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def cost(self):
+        return (self.counters["prompt_tokens"] * PRICE_INPUT_PER_M
+                + self.counters["output_tokens"] * PRICE_OUTPUT_PER_M) / 1e6
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": self.calls[name],
+                    "total_s": round(self.totals[name], 4),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                    "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                }
+                for name, samples in self.samples.items()
+            }
+            counters = dict(self.counters)
+        done = counters.get("rows", 0)
+        elapsed = self.elapsed
+        rate = done / elapsed if elapsed else 0.0
+        remaining = max(self.expected - done, 0)
+        return {
+            "run_id": self.run_id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "elapsed_s": round(elapsed, 2),
+            "finished": self.finished is not None,
+            "rows": done,
+            "expected": self.expected,
+            "rows_per_s": round(rate, 3),
+            "eta_s": round(remaining / rate, 1) if rate and remaining else None,
+            "cost_usd": round(self.cost(), 4),
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def trace(self):
+        with self._lock:
+            events = list(self.events)
+        return {**self.snapshot(), "events": events, "dropped_events": self.dropped_events}
+
+    def save_trace(self, path=None):
+        path = path or os.path.join(TRACE_DIR, f"{self.run_id}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f)
+        return path
+
+
+# The run code on this thread (or task) records into. Each session, job and CLI run starts its own, so concurrent
+# runs never mix; worker threads don't inherit it, so work handed to them goes through in_run().
+_current = contextvars.ContextVar("metrics_run", default=None)
+# Where timings recorded outside any run go
+_idle = Metrics("idle")
+
+
+def get_metrics():
+    return _current.get() or _idle
+
+
+def start_run(label, expected=0):
+    # A fresh run, current for the calling thread from here on
+    metrics = Metrics(label)
+    metrics.expect(expected)
+    _current.set(metrics)
+    return metrics
+
+
+def in_run(fn, metrics=None):
+    # fn wrapped to record into metrics (default: the calling thread's current run) on whichever thread calls it
+    metrics = metrics or get_metrics()
+
+    def run(*args, **kwargs):
+        token = _current.set(metrics)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+def timer(name, **attrs):
+    return get_metrics().timer(name, **attrs)
+
+
+def count(name, n=1):
+    get_metrics().count(name, n)
@@ -0,0 +1,232 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from .cache import cache_key
+from .config import (
+    GEMINI_API_KEY, HTTP_TIMEOUT, LLM_BACKEND, MERGE_MODEL, OPENAI_API_KEY, OPENAI_BASE_URL, RECORD_BACKEND,
+    REPLAY_ERROR_RATE, REPLAY_JITTER, REPLAY_LATENCY, REPLAY_MISSING, REPLAY_PATH, REPLAY_SEED, TAG_MODEL,
+)
+
+# A model client has a model_name and generate_content(prompt, generation_config=None) returning an object
+# with .text, the same surface as genai.GenerativeModel, so the SDK model plugs in unchanged.
+TASK_MODELS = {"tag": TAG_MODEL, "merge": MERGE_MODEL}
+
+
+def _gemini(model_name):
+    if not GEMINI_API_KEY:
+        raise ValueError("Missing GEMINI_API_KEY in .env file")
+    # Imported here so startup doesn't pay for the SDK
+    import google.generativeai as genai
+
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(model_name=model_name)
+
+
+_PACKED_RECORD = re.compile(r"^### RECORD (\S+)\n(.*?)\n### END \1$", re.M | re.S)
+_TITLE = re.compile(r"^Title:\n(.+)$", re.M)
+_BRIEF = re.compile(r"^Brief:\n(.+)$", re.M)
+
+
+class StubModel:
+    # Offline backend: deterministic replies built from the prompt itself, for tests and runs without a key
+    def __init__(self, model_name=""):
+        # Prefixed so stub replies never share cache entries with the real model
+        self.model_name = f"stub:{model_name}"
+
+    def _record(self, content):
+        title = _TITLE.search(content)
+        brief = _BRIEF.search(content)
+        return {
+            "title": title.group(1).strip() if title else "",
+            "summary": brief.group(1).strip()[:200] if brief else "",
+            "fields": ["Software Engineering"],
+            "skills": ["Python"],
+            "workshops": [],
+            "mentors": [],
+            "category": "Space",
+        }
+
+    def _text_record(self, content):
+        record = self._record(content)
+        return "\n".join(
+            f"{key.capitalize()}: {', '.join(value) if isinstance(value, list) else value}"
+            for key, value in record.items()
+        )
+
+    def generate_content(self, prompt, generation_config=None):
+        config = generation_config or {}
+        packed = _PACKED_RECORD.findall(prompt)
+        if packed:
+            text = "\n\n".join(
+                f"### RECORD {record_id}\n{self._text_record(content)}\n### END {record_id}"
+                for record_id, content in packed
+                if record_id != "<id>"
+            )
+        elif "response_schema" in config:
+            text = json.dumps(self._record(prompt))
+        elif config.get("response_mime_type") == "application/json":
+            # Merge prompts: keep the new row as-is
+            start = prompt.find("{", prompt.rfind("New:"))
+            text = json.dumps(json.JSONDecoder().raw_decode(prompt[start:])[0]) if start >= 0 else "{}"
+        else:
+            text = self._text_record(prompt)
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+
+def _usage(prompt_tokens=None, output_tokens=None):
+    # Token counts under the names Gemini's usage_metadata uses
+    if prompt_tokens is None and output_tokens is None:
+        return None
+    return SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens)
+
+
+class RecordingModel:
+    # Passes calls through to another client and appends each prompt -> reply pair to a JSONL recording
+    def __init__(self, inner, path=REPLAY_PATH):
+        self.inner = inner
+        self.model_name = inner.model_name
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def generate_content(self, prompt, generation_config=None):
+        started = time.perf_counter()
+        response = self.inner.generate_content(prompt, generation_config=generation_config)
+        entry = {
+            "key": cache_key(prompt, ""),
+            "model": self.model_name,
+            "text": response.text,
+            "latency": round(time.perf_counter() - started, 4),
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return response
+
+
+class SimulatedError(Exception):
+    # Carries an HTTP-style code so the retry/backoff path treats it like a real throttle or outage
+    def __init__(self, code):
+        super().__init__(f"{code} simulated {'rate limit' if code == 429 else 'server error'}")
+        self.code = code
+
+
+class ReplayModel:
+    # Answers from a recording, with simulated latency and error rate, so the concurrency, cache and
+    # rate-limit paths can be load-tested offline. The same seed replays the same errors and delays.
+    def __init__(self, model_name="", path=REPLAY_PATH, latency=REPLAY_LATENCY, jitter=REPLAY_JITTER,
+                 error_rate=REPLAY_ERROR_RATE, missing=REPLAY_MISSING, seed=REPLAY_SEED):
+        self.model_name = f"replay:{model_name}"
+        self.latency = latency if latency == "recorded" else float(latency)
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.missing = missing
+        self._stub = StubModel(model_name)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.replies = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.replies[entry["key"]] = entry
+
+    def _delay(self, entry):
+        base = (entry or {}).get("latency", 0.0) if self.latency == "recorded" else self.latency
+        with self._lock:
+            roll = self._random.random()
+            code = self._random.choice((429, 503))
+            jitter = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, base + jitter), code if roll < self.error_rate else None
+
+    def generate_content(self, prompt, generation_config=None):
+        entry = self.replies.get(cache_key(prompt, ""))
+        if entry is None and self.missing == "error":
+            raise LookupError("Prompt not found in the replay recording")
+        delay, error = self._delay(entry)
+        time.sleep(delay)
+        if error:
+            raise SimulatedError(error)
+        if entry is None:
+            return self._stub.generate_content(prompt, generation_config)
+        return SimpleNamespace(text=entry["text"], usage_metadata=None)
+
+
+class OpenAICompatModel:
+    # Chat-completions client for OpenAI-compatible servers; HTTP errors keep their response so retries
+    # see the status code and Retry-After header
+    def __init__(self, model_name, base_url=OPENAI_BASE_URL, api_key=OPENAI_API_KEY, timeout=HTTP_TIMEOUT):
+        import requests
+
+        self.model_name = model_name
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.timeout = timeout
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def generate_content(self, prompt, generation_config=None):
+        config = generation_config or {}
+        body = {"model": self.model_name, "messages": [{"role": "user", "content": prompt}]}
+        if "response_schema" in config:
+            body["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "challenge", "schema": config["response_schema"]},
+            }
+        elif config.get("response_mime_type") == "application/json":
+            body["response_format"] = {"type": "json_object"}
+        response = self.session.post(self.url, json=body, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get("usage") or {}
+        return SimpleNamespace(
+            text=data["choices"][0]["message"]["content"] or "",
+            usage_metadata=_usage(usage.get("prompt_tokens"), usage.get("completion_tokens")),
+        )
+
+
+def _record(model_name):
+    return RecordingModel(BACKENDS[RECORD_BACKEND](model_name))
+
+
+BACKENDS = {}
+_models = {}
+_models_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    # factory(model_name) -> model client, used when LLM_BACKEND is name
+    BACKENDS[name] = factory
+
+
+register_backend("gemini", _gemini)
+register_backend("stub", StubModel)
+register_backend("record", _record)
+register_backend("replay", ReplayModel)
+register_backend("openai", OpenAICompatModel)
+
+
+def get_model(task="tag"):
+    # Clients are built once per (backend, model) and shared; tasks that use the same model share a client
+    model_name = TASK_MODELS.get(task, TASK_MODELS["tag"])
+    key = (LLM_BACKEND, model_name)
+    with _models_lock:
+        if ("override", task) in _models:
+            return _models[("override", task)]
+        if key not in _models:
+            if LLM_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
+            _models[key] = BACKENDS[LLM_BACKEND](model_name)
+        return _models[key]
+
+
+def set_model(client, task=None):
+    # Use client for one task (or every task when task is None) instead of the configured backend
+    with _models_lock:
+        for name in [task] if task else list(TASK_MODELS):
+            _models[("override", name)] = client
@@ -1,18 +1,142 @@
-import pandas as pd
+import json
 import re
+from typing import NamedTuple, Tuple
+
+import pandas as pd
+
+OUTPUT_COLUMNS = ["Title", "Summary", "Fields", "Skills", "Workshops", "Mentors", "Category"]
+LIST_COLUMNS = ["Fields", "Skills", "Workshops", "Mentors"]
+
+# Schema handed to the model in JSON mode; keys mirror ChallengeRecord
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "fields": {"type": "array", "items": {"type": "string"}},
+        "skills": {"type": "array", "items": {"type": "string"}},
+        "workshops": {"type": "array", "items": {"type": "string"}},
+        "mentors": {"type": "array", "items": {"type": "string"}},
+        "category": {"type": "string"},
+    },
+    "required": ["title", "summary", "fields", "skills", "workshops", "mentors", "category"],
+}
+
+
+class ChallengeRecord(NamedTuple):
+    title: str = ""
+    summary: str = ""
+    fields: Tuple[str, ...] = ()
+    skills: Tuple[str, ...] = ()
+    workshops: Tuple[str, ...] = ()
+    mentors: Tuple[str, ...] = ()
+    category: str = ""
+    # Anything in the response that did not map onto a field, kept so nothing is silently lost
+    unparsed: str = ""
+
+    def to_series(self):
+        data = {col: getattr(self, col.lower()) for col in OUTPUT_COLUMNS}
+        for col in LIST_COLUMNS:
+            data[col] = ", ".join(data[col])
+        if self.unparsed:
+            data["Unparsed"] = self.unparsed
+        return pd.Series(data)
+
+
+# Only the known labels start a new field, so lines like "Note: ..." stay inside the current value
+_LABEL = re.compile(
+    r"^[ \t]*(?:[-*][ \t]+)?\**(" + "|".join(OUTPUT_COLUMNS) + r")\**[ \t]*:\**[ \t]*",
+    re.MULTILINE,
+)
+# Commas inside parentheses, e.g. "Python (NumPy, Pandas)", do not split list items
+_LIST_SEP = re.compile(r",(?![^()]*\))|;|\n")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def split_list(value):
+    if isinstance(value, (list, tuple)):
+        items = (str(v) for v in value)
+    else:
+        items = _LIST_SEP.split(str(value or ""))
+    return tuple(item for item in (_BULLET.sub("", i).strip() for i in items) if item)
+
+
+def parse_text_record(output):
+    # Single pass over the label positions; the first occurrence of each label wins
+    output = output or ""
+    values = {}
+    leftovers = []
+    matches = list(_LABEL.finditer(output))
+    preamble = output[:matches[0].start()] if matches else output
+    if preamble.strip():
+        leftovers.append(preamble.strip())
+
+    for match, following in zip(matches, matches[1:] + [None]):
+        label = match.group(1)
+        value = output[match.end():following.start() if following else len(output)].strip()
+        if label in values:
+            if value:
+                leftovers.append(f"{label}: {value}")
+        else:
+            values[label] = value
+
+    return ChallengeRecord(
+        title=values.get("Title", ""),
+        summary=values.get("Summary", ""),
+        fields=split_list(values.get("Fields")),
+        skills=split_list(values.get("Skills")),
+        workshops=split_list(values.get("Workshops")),
+        mentors=split_list(values.get("Mentors")),
+        category=values.get("Category", ""),
+        unparsed="\n".join(leftovers),
+    )
+
+
+def parse_json_record(output):
+    # Raises ValueError if the response is not a JSON object
+    data = json.loads(_CODE_FENCE.sub("", output.strip()))
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+
+    data = {str(k).lower(): v for k, v in data.items()}
+    known = set(ChallengeRecord._fields) - {"unparsed"}
+    extra = {k: v for k, v in data.items() if k not in known}
+    return ChallengeRecord(
+        title=str(data.get("title") or "").strip(),
+        summary=str(data.get("summary") or "").strip(),
+        fields=split_list(data.get("fields")),
+        skills=split_list(data.get("skills")),
+        workshops=split_list(data.get("workshops")),
+        mentors=split_list(data.get("mentors")),
+        category=str(data.get("category") or "").strip(),
+        unparsed=json.dumps(extra) if extra else "",
+    )
+
+
+def parse_record(output):
+    output = output or ""
+    if output.lstrip().startswith(("{", "```")):
+        try:
+            return parse_json_record(output)
+        except ValueError:
+            pass
+    return parse_text_record(output)
+
 
 def parse_output(output):
-    def extract(field):
-        pattern = rf"{field}:\s*(.*?)(?=\n[A-Z][a-z]+:|$)"
-        match = re.search(pattern, output, re.DOTALL)
-        return match.group(1).strip() if match else ""
-
-    return pd.Series({
-        "Title": extract("Title"),
-        "Summary": extract("Summary"),
-        "Fields": extract("Fields"),
-        "Skills": extract("Skills"),
-        "Workshops": extract("Workshops"),
-        "Mentors": extract("Mentors"),
-        "Category": extract("Category")
-    })
+    return parse_record(output).to_series()
+
+
+_PACKED_RECORD = re.compile(r"^###\s*RECORD\s+(\S+)\s*$(.*?)^###\s*END\s+\1\s*$", re.MULTILINE | re.DOTALL)
+_REQUIRED_FIELDS = re.compile(r"^\s*(Title|Summary):", re.MULTILINE)
+
+
+def parse_packed_output(output):
+    # Split a packed response into {record_id: record_text}; malformed records are left out
+    records = {}
+    for match in _PACKED_RECORD.finditer(output or ""):
+        record_id, body = match.group(1), match.group(2).strip()
+        if len({m.group(1) for m in _REQUIRED_FIELDS.finditer(body)}) == 2:
+            records[record_id] = body
+    return records
@@ -0,0 +1,135 @@
+import queue
+import threading
+
+import pandas as pd
+
+from .config import CONTENT_HASH_COLUMN, MAX_CONCURRENCY
+from .llm import analyze_brief_with_status
+from .metrics import get_metrics, in_run
+from .parser import parse_output
+
+_DONE = object()
+
+
+def analyzed_row(title, result, source=None):
+    # source is the record that was analyzed; its content hash (if scraped) is kept with the analysis
+    with get_metrics().timer("parse_output"):
+        row = parse_output(result.text)
+    row["Title"] = title
+    row["Status"] = result.status
+    digest = source.get(CONTENT_HASH_COLUMN) if source is not None else None
+    if isinstance(digest, str):
+        row[CONTENT_HASH_COLUMN] = digest
+    return row
+
+
+def scrape_and_analyze(url, max_concurrency=None, queue_size=None, use_cache=True,
+                       should_analyze=None, on_result=None, run_id=None, **scrape_kwargs):
+    # Producer/consumer pipeline: the scraper pushes each challenge into a bounded queue as soon as it is
+    # parsed and LLM workers analyze it right away, so page fetches and model calls overlap.
+    # on_result(record, row, done) runs on the calling thread; row is None when should_analyze(record) is False.
+    # Returns (df_basic, df_detailed, analyzed) where analyzed lists (record, row) pairs in scrape order.
+    # If analyzing a record or on_result raises, scraping stops and the exception is re-raised here once every
+    # thread is done.
+    # With a run_id from the run store, each record is appended to that run as it is scraped and the run is marked
+    # failed on error; on success the caller finishes it (utils.finish_scrape_run).
+    from scraping_challenges_info.run_store import get_run_store
+    from scraping_challenges_info.scraper import scrape
+
+    workers = max(1, max_concurrency or MAX_CONCURRENCY)
+    work = queue.Queue(maxsize=queue_size or workers * 2)
+    results = queue.Queue()
+    scraped = {}
+    analysis = {}
+    failed = threading.Event()
+    metrics = get_metrics()
+    runs = get_run_store() if run_id else None
+
+    def on_record(entry, done, total):
+        if failed.is_set():
+            raise RuntimeError("Scrape stopped: analyzing a challenge failed")
+        if done == 1:
+            metrics.expect(total)
+        if entry is not None:
+            if runs is not None:
+                runs.append(run_id, "Challenge Details", [entry])
+            work.put(entry)
+
+    def produce():
+        try:
+            scraped["basic"], scraped["detailed"] = scrape(
+                url,
+                on_record=on_record,
+                **scrape_kwargs,
+            )
+        except Exception as e:
+            scraped["error"] = e
+        finally:
+            for _ in range(workers):
+                work.put(_DONE)
+
+    def consume():
+        try:
+            while True:
+                record = work.get()
+                if record is _DONE:
+                    return
+                if failed.is_set():
+                    continue  # keep draining so the producer never blocks on a full queue
+                try:
+                    row = None
+                    if should_analyze is None or should_analyze(record):
+                        row = analyzed_row(record["Title"], analyze_brief_with_status(record, use_cache), record)
+                except Exception as e:
+                    analysis.setdefault("error", e)
+                    failed.set()
+                    continue
+                results.put((record, row))
+        finally:
+            results.put(_DONE)
+
+    # The threads record into the caller's run
+    threads = [threading.Thread(target=in_run(produce, metrics), daemon=True)]
+    threads += [threading.Thread(target=in_run(consume, metrics), daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    def collect():
+        # Drains results on the calling thread until every worker is done
+        analyzed = []
+        finished = 0
+        try:
+            while finished < workers:
+                item = results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                analyzed.append(item)
+                metrics.count("rows")
+                if on_result:
+                    on_result(item[0], item[1], len(analyzed))
+        finally:
+            if finished < workers:
+                # on_result raised (or the caller was interrupted): the scrape stops at its next record, pages not
+                # fetched yet are cancelled, and the workers drain the queue without analyzing, so every thread
+                # exits
+                failed.set()
+            for thread in threads:
+                thread.join()
+        return analyzed
+
+    try:
+        analyzed = collect()
+        if "error" in analysis:
+            raise analysis["error"]
+        if "error" in scraped:
+            raise scraped["error"]
+    except BaseException as e:
+        if runs is not None:
+            runs.finish(run_id, status="failed", error=str(e) or type(e).__name__)
+        raise
+
+    order = {entry["URL"]: i for i, entry in enumerate(scraped["detailed"])}
+    analyzed.sort(key=lambda item: order.get(item[0]["URL"], len(order)))
+    return pd.DataFrame(scraped["basic"]), pd.DataFrame(scraped["detailed"]), analyzed
+
@@ -1,19 +1,16 @@
-def build_prompt(row):
-    if "Title" not in row or not str(row["Title"]).strip():
-        return None
+import re
 
-    content_parts = []
-    fields = ["Title", "Brief", "Objectives", "Subjects", "Potential Considerations", "Background", "Difficulty"]
-    for key in fields:
-        val = row.get(key)
-        if isinstance(val, str) and val.strip():
-            content_parts.append(f"{key}:\n{val.strip()}")
+from .config import PROMPT_SECTION_MIN_TOKENS, PROMPT_TOKEN_BUDGET
+from .metrics import get_metrics
+from .ratelimit import estimate_tokens
 
-    joined_content = "\n\n".join(content_parts)
+CONTENT_FIELDS = ["Title", "Brief", "Objectives", "Subjects", "Potential Considerations", "Background", "Difficulty"]
 
-    return f"""
-You will be given a NASA Space Apps hackathon challenge description with some or all of the following sections.
+# When a challenge's sections exceed the token budget, these are trimmed first (Title is never trimmed)
+TRIM_ORDER = ["Background", "Potential Considerations", "Objectives", "Subjects", "Difficulty", "Brief"]
+TRIM_MARKER = " [...]"
 
+INSTRUCTIONS = """
 Extract and fill the following structured fields based on the information:
 
 1. Challenge Title: The full challenge title as it appears
@@ -35,11 +32,9 @@ Extract and fill the following structured fields based on the information:
 5. Potential Workshop/Session Topics (relevant training or crash courses)
 6. Recommended Mentor Specializations
 7. Overall Category (e.g., Earth, Space, Health, Humans, Climate, Oceans, etc.)
+""".strip()
 
-{joined_content}
-
-Respond ONLY in the following format:
-
+OUTPUT_FORMAT = """
 Title: ...
 Summary: ...
 Fields: ...
@@ -48,3 +43,132 @@ Workshops: ...
 Mentors: ...
 Category: ...
 """.strip()
+
+JSON_OUTPUT_FORMAT = """
+A single JSON object with these keys:
+{"title": string, "summary": string, "fields": [string], "skills": [string], "workshops": [string], "mentors": [string], "category": string}
+""".strip()
+
+# Packed prompts wrap each record in these markers so the parser can split them back apart
+RECORD_START = "### RECORD {id}"
+RECORD_END = "### END {id}"
+
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z]{4,}")
+
+
+def _summarize(text, budget, keywords):
+    # Extractive trim: keep the first sentence, then the sentences sharing the most words with the
+    # title/brief, in their original order, until the budget is used up. A first sentence that doesn't fit on
+    # its own is cut at the budget.
+    sentences = [s.strip() for s in _SENTENCE.split(text) if s.strip()]
+    if not sentences:
+        return ""
+    used = estimate_tokens(TRIM_MARKER) + estimate_tokens(sentences[0]) + 1
+    if used > budget:
+        return sentences[0][:max(0, budget - 2) * 4].rstrip() + TRIM_MARKER
+    ranked = sorted(
+        range(1, len(sentences)),
+        key=lambda i: (-len(keywords & set(_WORD.findall(sentences[i].lower()))), i),
+    )
+    keep = {0}
+    for i in ranked:
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost <= budget:
+            keep.add(i)
+            used += cost
+    return " ".join(sentences[i] for i in sorted(keep)) + TRIM_MARKER
+
+
+def fit_sections(sections, budget=PROMPT_TOKEN_BUDGET):
+    # sections: {field: text}. Returns (sections, tokens_saved) with the total brought under budget by trimming
+    # low-priority sections first, each down to PROMPT_SECTION_MIN_TOKENS before dropping to the next one
+    tokens = {key: estimate_tokens(val) for key, val in sections.items()}
+    labels = sum(estimate_tokens(f"{key}:\n\n\n") for key in sections)
+    overflow = sum(tokens.values()) + labels - budget
+    if not budget or overflow <= 0:
+        return sections, 0
+
+    head = " ".join(sections.get(key, "") for key in ("Title", "Brief"))
+    keywords = set(_WORD.findall(head.lower()))
+    fitted = dict(sections)
+    saved = 0
+    for key in TRIM_ORDER:
+        if overflow <= 0:
+            break
+        if key not in fitted or tokens[key] <= PROMPT_SECTION_MIN_TOKENS:
+            continue
+        target = max(PROMPT_SECTION_MIN_TOKENS, tokens[key] - overflow)
+        fitted[key] = _summarize(fitted[key], target, keywords)
+        reduction = tokens[key] - estimate_tokens(fitted[key])
+        overflow -= reduction
+        saved += reduction
+    return fitted, saved
+
+
+def build_content(row, budget=PROMPT_TOKEN_BUDGET):
+    if "Title" not in row or not str(row["Title"]).strip():
+        return None
+
+    sections = {}
+    for key in CONTENT_FIELDS:
+        val = row.get(key)
+        if isinstance(val, str) and val.strip():
+            sections[key] = val.strip()
+
+    sections, saved = fit_sections(sections, budget)
+    if saved:
+        metrics = get_metrics()
+        metrics.count("prompt_tokens_saved", saved)
+        metrics.count("prompts_trimmed")
+
+    return "\n\n".join(f"{key}:\n{val}" for key, val in sections.items())
+
+
+# The static parts of the single-challenge prompt, built once per output mode
+_PROMPT_HEAD = f"""You will be given a NASA Space Apps hackathon challenge description with some or all of the following sections.
+
+{INSTRUCTIONS}
+
+"""
+_PROMPT_TAIL = {
+    mode: f"""
+
+Respond ONLY in the following format:
+
+{output_format}"""
+    for mode, output_format in (("text", OUTPUT_FORMAT), ("json", JSON_OUTPUT_FORMAT))
+}
+
+
+def build_prompt(row, output_mode="text"):
+    joined_content = build_content(row)
+    if joined_content is None:
+        return None
+
+    return _PROMPT_HEAD + joined_content + _PROMPT_TAIL["json" if output_mode == "json" else "text"]
+
+
+def build_packed_prompt(contents):
+    # contents: list of (record_id, joined_content) pairs, one per challenge
+    challenges = "\n\n".join(
+        f"{RECORD_START.format(id=record_id)}\n{content}\n{RECORD_END.format(id=record_id)}"
+        for record_id, content in contents
+    )
+    return f"""
+You will be given {len(contents)} NASA Space Apps hackathon challenge descriptions, each with some or all of the following sections.
+Each challenge is wrapped between "### RECORD <id>" and "### END <id>" lines.
+
+For EACH challenge, independently:
+
+{INSTRUCTIONS}
+
+{challenges}
+
+Respond ONLY with one block per challenge, in the same order, using the same ids, in the following format:
+
+{RECORD_START.format(id="<id>")}
+{OUTPUT_FORMAT}
+{RECORD_END.format(id="<id>")}
+""".strip()
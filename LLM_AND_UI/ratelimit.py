@@ -0,0 +1,175 @@
+import random
+import re
+import threading
+import time
+
+from .config import LLM_MAX_RETRIES, LLM_RPM, LLM_TPM, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+# "Please retry in 12.5s" in the message text
+_RETRY_HINT = re.compile(r"retry(?:_delay)?[^0-9]{0,40}?(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+# The RetryInfo detail as printed in Gemini 429s: "retry_delay {\n  seconds: 26\n  nanos: 500000000\n}"
+_RETRY_DELAY = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)(?:\s*nanos:\s*(\d+))?")
+
+
+def estimate_tokens(text):
+    # Rough but cheap: ~4 characters per token for English prose
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    # Requests-per-minute and tokens-per-minute buckets shared by every worker thread.
+    # The request rate backs off multiplicatively on throttling and recovers additively on success.
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM, min_rpm=1):
+        self.max_rpm = rpm
+        self.min_rpm = min_rpm
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if wait <= 0:
+                    wait = max(
+                        self.requests.wait_time(1, now) if self.requests else 0.0,
+                        self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+                    )
+                if wait <= 0:
+                    if self.requests:
+                        self.requests.take(1)
+                    if self.tokens:
+                        self.tokens.take(tokens)
+                    return
+            time.sleep(wait)
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            if self.requests:
+                self.requests.rate = max(self.min_rpm / 60.0, self.requests.rate * 0.7)
+
+    def on_success(self):
+        if not self.requests:
+            return
+        with self._lock:
+            self.requests.rate = min(self.max_rpm / 60.0, self.requests.rate + self.max_rpm / 60.0 * 0.05)
+
+    @property
+    def current_rpm(self):
+        return self.requests.rate * 60 if self.requests else None
+
+
+def error_status(exc):
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if callable(code):
+        code = code()
+    response = getattr(exc, "response", None)
+    if code is None and response is not None:
+        code = getattr(response, "status_code", None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc):
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_CODES
+    name = type(exc).__name__
+    return name in {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "DeadlineExceeded", "Timeout", "TimeoutError", "ConnectionError"}
+
+
+def _retry_info(exc):
+    # RetryInfo from google.api_core exception details (a list of protobuf messages; grpc errors have a
+    # details() method instead, which only returns text)
+    details = getattr(exc, "details", None)
+    if not details or callable(details) or isinstance(details, str):
+        return None
+    for detail in details:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None and hasattr(delay, "seconds"):
+            return delay.seconds + getattr(delay, "nanos", 0) / 1e9
+    return None
+
+
+def retry_hint(exc):
+    # Honor Retry-After headers, RetryInfo details and the retry_delay / "retry in Ns" hints Gemini puts in 429s
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    delay = _retry_info(exc)
+    if delay is not None:
+        return delay
+    text = str(exc)
+    match = _RETRY_DELAY.search(text)
+    if match:
+        return int(match.group(1)) + int(match.group(2) or 0) / 1e9
+    match = _RETRY_HINT.search(text)
+    return float(match.group(1)) if match else None
+
+
+def call_with_retry(fn, limiter=None, tokens=1, max_retries=LLM_MAX_RETRIES):
+    # Returns (result, attempts); re-raises the last error once retries are exhausted
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter:
+            limiter.acquire(tokens)
+        try:
+            result = fn()
+        except Exception as e:
+            if attempt > max_retries or not is_retryable(e):
+                raise
+            hint = retry_hint(e)
+            if limiter and (error_status(e) == 429 or hint):
+                limiter.on_throttle(hint)
+            backoff = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** (attempt - 1))
+            time.sleep(max(hint or 0.0, random.uniform(0, backoff)))
+            continue
+        if limiter:
+            limiter.on_success()
+        return result, attempt
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
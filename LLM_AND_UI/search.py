@@ -0,0 +1,240 @@
+import math
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from .config import SEARCH_DIM
+from .parser import split_list
+
+# Columns embedded into the text vector, and list columns indexed as exact facets
+TEXT_COLUMNS = ["Title", "Summary", "Fields", "Skills", "Category", "Workshops", "Mentors", "Brief"]
+FACET_COLUMNS = ["Fields", "Skills", "Category"]
+
+# Rows changed since the IDF weights were last computed, as a share of all rows, before they are recomputed for
+# every row; changed rows in between are re-weighted with the existing IDF
+REWEIGHT_FRACTION = 0.1
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to with will your their they we"
+    " can using use challenge challenges".split()
+)
+
+
+def tokenize(text):
+    words = [w for w in _TOKEN.findall(str(text).lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def facet_token(value):
+    return " ".join(str(value).lower().split())
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class SearchIndex:
+    # Hashed TF-IDF vectors in a dense float32 matrix plus an inverted index of facet tokens -> row positions.
+    # Row positions match the DatasetStore frame, so results can be looked up with frame.iloc.
+    def __init__(self, dim=SEARCH_DIM):
+        self.dim = dim
+        self._tf = np.zeros((0, dim), dtype=np.float32)
+        self._buckets = []  # per row: hashed buckets present, for document-frequency bookkeeping
+        self._df = np.zeros(dim, dtype=np.int32)
+        self.titles = []
+        self.facets = {col: defaultdict(set) for col in FACET_COLUMNS}
+        self._row_facets = []
+        self._weighted = None  # idf-weighted, L2-normalized rows (with spare capacity); None until first needed
+        self._idf_used = None  # the IDF _weighted was computed with
+        self._dirty = set()  # rows changed since they were last weighted
+        self._reweight_at = 0
+        self._duplicates = {}  # threshold -> near_duplicates result, until rows change
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def from_frame(cls, df, dim=SEARCH_DIM):
+        index = cls(dim)
+        if df is not None and len(df):
+            index.update(enumerate(df.to_dict("records")))
+        return index
+
+    def _vectorize(self, text):
+        counts = Counter()
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            # The sign bit keeps colliding tokens from always adding up
+            counts[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if counts:
+            buckets = np.fromiter(counts, dtype=np.int64, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            vector[buckets] = np.sign(values) * np.log1p(np.abs(values))
+        return vector
+
+    def _row_text(self, row):
+        return " ".join(str(row[col]) for col in TEXT_COLUMNS if col in row and not _is_blank(row[col]))
+
+    def update(self, changes):
+        # changes: iterable of (position, row dict); positions past the end append rows
+        with self._lock:
+            for pos, row in changes:
+                vector = self._vectorize(self._row_text(row))
+                buckets = np.flatnonzero(vector)
+                if pos >= len(self.titles):
+                    self._grow(pos + 1)
+                else:
+                    self._df[self._buckets[pos]] -= 1
+                    for col, tokens in self._row_facets[pos].items():
+                        for token in tokens:
+                            self.facets[col][token].discard(pos)
+                self._tf[pos] = vector
+                self._buckets[pos] = buckets
+                self._df[buckets] += 1
+                self.titles[pos] = str(row.get("Title", ""))
+                row_facets = {
+                    col: {facet_token(v) for v in split_list(row[col])}
+                    for col in FACET_COLUMNS if col in row and not _is_blank(row[col])
+                }
+                for col, tokens in row_facets.items():
+                    for token in tokens:
+                        self.facets[col][token].add(pos)
+                self._row_facets[pos] = row_facets
+                self._dirty.add(pos)
+            self._duplicates.clear()
+
+    def _grow(self, size):
+        if size > len(self._tf):
+            # Capacity doubles so appending rows one at a time stays cheap
+            grown = np.zeros((max(size, 2 * len(self._tf), 64), self.dim), dtype=np.float32)
+            grown[:len(self.titles)] = self._tf[:len(self.titles)]
+            self._tf = grown
+        extra = size - len(self.titles)
+        self._buckets += [np.zeros(0, dtype=np.int64)] * extra
+        self.titles += [""] * extra
+        self._row_facets += [{}] * extra
+
+    def _idf(self):
+        return (np.log((1 + len(self.titles)) / (1 + self._df)) + 1).astype(np.float32)
+
+    def _weigh(self, tf, idf):
+        weighted = tf * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        return weighted / np.where(norms == 0, 1, norms)
+
+    def _matrix(self):
+        # A single add/replace re-weights just that row; all rows are re-weighted with a fresh IDF once
+        # REWEIGHT_FRACTION of them changed since the last time
+        with self._lock:
+            n = len(self.titles)
+            if self._weighted is None or len(self._dirty) > self._reweight_at:
+                self._idf_used = self._idf()
+                self._weighted = self._weigh(self._tf[:len(self._tf)], self._idf_used)
+                self._reweight_at = max(16, int(n * REWEIGHT_FRACTION))
+                self._dirty.clear()
+            elif self._dirty:
+                if len(self._weighted) < len(self._tf):
+                    grown = np.zeros_like(self._tf)
+                    grown[:len(self._weighted)] = self._weighted
+                    self._weighted = grown
+                rows = np.fromiter(self._dirty, dtype=np.int64, count=len(self._dirty))
+                self._weighted[rows] = self._weigh(self._tf[rows], self._idf_used)
+                self._dirty.clear()
+            return self._weighted[:n]
+
+    def _query_vector(self, text):
+        # Weighted with the same IDF as the rows it is compared against
+        self._matrix()
+        vector = self._vectorize(text) * self._idf_used
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def facet_values(self, col):
+        # Facet tokens with at least one row, most common first
+        return sorted((t for t, rows in self.facets[col].items() if rows), key=lambda t: (-len(self.facets[col][t]), t))
+
+    def filter(self, facets, match_all=True):
+        # facets: {column: [tokens]}; returns the sorted row positions matching all (or any) of the tokens
+        sets = [self.facets[col].get(facet_token(t), set()) for col, tokens in facets.items() for t in tokens]
+        if not sets:
+            return None
+        rows = set.intersection(*sets) if match_all else set.union(*sets)
+        return np.array(sorted(rows), dtype=np.int64)
+
+    def search(self, query="", k=10, facets=None, match_all=True, exclude=None):
+        # Top-k (position, score) by cosine similarity to the query text, within the facet filter if any.
+        # With no query text, facet matches come back in row order with a score of 1.
+        candidates = self.filter(facets or {}, match_all)
+        matrix = self._matrix()
+        if not str(query).strip():
+            rows = candidates if candidates is not None else np.arange(len(self.titles))
+            rows = [int(r) for r in rows if r != exclude][:k]
+            return [(r, 1.0) for r in rows]
+
+        scores = matrix @ self._query_vector(query)
+        return self._top(scores, k, candidates, exclude)
+
+    def similar(self, position, k=10, facets=None, match_all=True):
+        # Rows most similar to an existing row (the row itself excluded)
+        matrix = self._matrix()
+        scores = matrix @ matrix[position]
+        return self._top(scores, k, self.filter(facets or {}, match_all), exclude=position)
+
+    def _top(self, scores, k, candidates=None, exclude=None):
+        if candidates is not None:
+            masked = np.full_like(scores, -np.inf)
+            masked[candidates] = scores[candidates]
+            scores = masked
+        if exclude is not None:
+            scores = scores.copy()
+            scores[exclude] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0 or candidates is not None]
+
+    def find_titles(self, text, limit=20):
+        # Positions of rows whose title contains text (case-insensitive), in row order
+        text = str(text).strip().casefold()
+        if not text:
+            return []
+        found = []
+        for pos, title in enumerate(self.titles):
+            if text in title.casefold():
+                found.append(pos)
+                if len(found) == limit:
+                    break
+        return found
+
+    def cached_near_duplicates(self, threshold):
+        # near_duplicates(threshold) if it was computed since the rows last changed, else None
+        return self._duplicates.get(threshold)
+
+    def near_duplicates(self, threshold=0.9, block=1024):
+        # Pairs (i, j, score) with i < j whose vectors are at least threshold-similar, highest first.
+        # Scored in row blocks so memory stays at block x rows; kept until the rows change.
+        cached = self._duplicates.get(threshold)
+        if cached is not None:
+            return cached
+        matrix = self._matrix()
+        pairs = []
+        for start in range(0, len(matrix), block):
+            scores = matrix[start:start + block] @ matrix.T
+            rows, cols = np.nonzero(scores >= threshold)
+            for r, c in zip(rows, cols):
+                i = start + int(r)
+                if i < c:
+                    pairs.append((i, int(c), float(scores[r, c])))
+        pairs.sort(key=lambda p: -p[2])
+        if len(self._duplicates) >= 8:
+            self._duplicates.clear()
+        self._duplicates[threshold] = pairs
+        return pairs
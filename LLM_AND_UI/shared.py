@@ -0,0 +1,263 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .config import CACHE_DIR, COALESCE_TIMEOUT, LOCK_TTL, SHARED_STATE
+from .dataset import normalize_title
+
+
+def _json_cell(value):
+    # NaN/NaT become null and numpy scalars plain Python values, so rows round-trip through JSON
+    if value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item") and not isinstance(value, (list, tuple, dict)):
+        return value.item()
+    return value
+
+
+def _dump_row(row):
+    return json.dumps({key: _json_cell(value) for key, value in row.items()}, ensure_ascii=False, default=str)
+
+
+class SharedStore:
+    # State shared by every session and process of the app, in one SQLite file in WAL mode:
+    # - datasets: each named dataset has a generation (bumped when it is replaced wholesale) and a version
+    #   (bumped on every write); rows carry the version that last wrote them, so a session that is behind
+    #   fetches only the rows that changed since its version
+    # - locks: leases on a section (Scrape, Upload, ...) held by one session, expiring after a TTL
+    # - inflight: prompts some process is currently sending to the model, so others wait for its reply
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS datasets (
+                name TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                columns TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                updated_by TEXT
+            );
+            CREATE TABLE IF NOT EXISTS dataset_rows (
+                name TEXT NOT NULL,
+                pos INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                PRIMARY KEY (name, pos)
+            );
+            CREATE INDEX IF NOT EXISTS dataset_rows_key ON dataset_rows(name, key);
+            CREATE INDEX IF NOT EXISTS dataset_rows_version ON dataset_rows(name, version);
+            CREATE TABLE IF NOT EXISTS locks (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                acquired_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS inflight (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );"""
+        )
+
+    @contextmanager
+    def _write(self):
+        # BEGIN IMMEDIATE takes the database write lock up front, so read-modify-write steps don't interleave
+        # with another process
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # Datasets
+
+    def head(self, name):
+        # (generation, version) of the shared copy, or None if it was never published
+        with self._lock:
+            return self._conn.execute(
+                "SELECT generation, version FROM datasets WHERE name = ?", (name,)
+            ).fetchone()
+
+    def publish(self, name, df, owner=None):
+        # Replace the dataset wholesale; returns the new (generation, version)
+        df = df if df is not None else pd.DataFrame()
+        titles = df["Title"] if "Title" in df.columns else [""] * len(df)
+        with self._write() as conn:
+            found = conn.execute("SELECT generation FROM datasets WHERE name = ?", (name,)).fetchone()
+            generation = (found[0] if found else 0) + 1
+            conn.execute("DELETE FROM dataset_rows WHERE name = ?", (name,))
+            conn.executemany(
+                "INSERT INTO dataset_rows VALUES (?, ?, ?, ?, 1)",
+                ((name, pos, normalize_title(title), _dump_row(row))
+                 for pos, (title, row) in enumerate(zip(titles, df.to_dict("records")))),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, 1, ?, ?, ?)",
+                (name, generation, json.dumps([str(c) for c in df.columns]), time.time(), owner),
+            )
+        return generation, 1
+
+    def publish_rows(self, name, rows, owner=None):
+        # Upsert rows by normalized title (the first row with a title is replaced, as in DatasetStore);
+        # returns the new (generation, version)
+        with self._write() as conn:
+            found = conn.execute("SELECT generation, version, columns FROM datasets WHERE name = ?", (name,)).fetchone()
+            generation, version, columns = found if found else (1, 0, "[]")
+            version += 1
+            columns = json.loads(columns)
+            next_pos = conn.execute(
+                "SELECT COALESCE(MAX(pos) + 1, 0) FROM dataset_rows WHERE name = ?", (name,)
+            ).fetchone()[0]
+            for row in rows:
+                row = row.to_dict() if hasattr(row, "to_dict") else dict(row)
+                columns += [str(c) for c in row if str(c) not in columns]
+                key = normalize_title(row.get("Title", ""))
+                pos = conn.execute(
+                    "SELECT MIN(pos) FROM dataset_rows WHERE name = ? AND key = ?", (name, key)
+                ).fetchone()[0]
+                if pos is None:
+                    pos, next_pos = next_pos, next_pos + 1
+                conn.execute("INSERT OR REPLACE INTO dataset_rows VALUES (?, ?, ?, ?, ?)",
+                             (name, pos, key, _dump_row(row), version))
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?)",
+                (name, generation, version, json.dumps(columns), time.time(), owner),
+            )
+        return generation, version
+
+    def load(self, name, since=None):
+        # (generation, version, frame, rows): with since=(generation, version) of the same generation, only the
+        # rows written after that version come back (as dicts, frame None); otherwise the whole dataset as a frame
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT generation, version, columns FROM datasets WHERE name = ?", (name,)
+            ).fetchone()
+            if found is None:
+                return None
+            generation, version, columns = found
+            incremental = since is not None and since[0] == generation
+            found = self._conn.execute(
+                "SELECT data FROM dataset_rows WHERE name = ? AND version > ? ORDER BY pos",
+                (name, since[1] if incremental else 0),
+            ).fetchall()
+        rows = [json.loads(data) for (data,) in found]
+        if incremental:
+            return generation, version, None, rows
+        return generation, version, pd.DataFrame(rows, columns=json.loads(columns)), None
+
+    # Locks
+
+    def acquire(self, name, owner, ttl=LOCK_TTL):
+        # Returns None once owner holds the lock (re-acquiring extends the lease), else the current holder
+        now = time.time()
+        with self._write() as conn:
+            found = conn.execute("SELECT owner, acquired_at, expires_at FROM locks WHERE name = ?", (name,)).fetchone()
+            if found and found[0] != owner and found[2] > now:
+                return {"owner": found[0], "acquired_at": found[1], "expires_at": found[2]}
+            acquired_at = found[1] if found and found[0] == owner else now
+            conn.execute("INSERT OR REPLACE INTO locks VALUES (?, ?, ?, ?)", (name, owner, acquired_at, now + ttl))
+        return None
+
+    def release(self, name, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def release_all(self, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM locks WHERE owner = ?", (owner,))
+
+    def holder(self, name):
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT owner, acquired_at, expires_at FROM locks WHERE name = ? AND expires_at > ?", (name, time.time())
+            ).fetchone()
+        return dict(zip(("owner", "acquired_at", "expires_at"), found)) if found else None
+
+    # In-flight prompts
+
+    def claim(self, key, owner, ttl=COALESCE_TIMEOUT):
+        now = time.time()
+        with self._write() as conn:
+            found = conn.execute("SELECT owner, expires_at FROM inflight WHERE key = ?", (key,)).fetchone()
+            if found and found[0] != owner and found[1] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO inflight VALUES (?, ?, ?)", (key, owner, now + ttl))
+            if found is None:
+                # Claims left behind by crashed processes
+                conn.execute("DELETE FROM inflight WHERE expires_at < ?", (now,))
+        return True
+
+    def unclaim(self, key, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, owner))
+
+    def claimed(self, key):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM inflight WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone() is not None
+
+
+_store = None
+_store_lock = threading.Lock()
+_process_owner = f"{os.getpid()}-{os.urandom(4).hex()}"
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def get_shared():
+    global _store
+    if not SHARED_STATE:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SharedStore(os.path.join(CACHE_DIR, "shared.sqlite3"))
+        return _store
+
+
+@contextmanager
+def coalesce(key, timeout=COALESCE_TIMEOUT, poll=0.25):
+    # One caller per prompt key generates while the rest wait: threads of this process (every Streamlit session
+    # is one) wait on an Event, other processes poll the shared claim. Yields True if this caller waited for
+    # someone else, in which case it should look in the response cache before calling the model itself.
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+    if not leader:
+        event.wait(timeout)
+        yield True
+        return
+
+    shared = get_shared()
+    waited = False
+    try:
+        if shared is not None:
+            deadline = time.monotonic() + timeout
+            while not shared.claim(key, _process_owner, ttl=timeout) and time.monotonic() < deadline:
+                waited = True
+                time.sleep(poll)
+        try:
+            yield waited
+        finally:
+            if shared is not None:
+                shared.unclaim(key, _process_owner)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
@@ -1,5 +1,17 @@
+import time
+import uuid
+
+import pandas as pd
 import streamlit as st
 
+from .dataset import DatasetStore
+from .metrics import start_run
+from .search import SearchIndex
+from .shared import get_shared
+
+# Datasets kept in the shared store, so every session of the app sees the same ones
+SHARED_DATASETS = ["scrape_df", "upload_df", "manual_df", "merged_df"]
+
 def init_session_state():
     defaults = {
         "scrape_df": None,
@@ -10,8 +22,42 @@ def init_session_state():
     for k, v in defaults.items():
         if k not in st.session_state:
             st.session_state[k] = v if v is not None else __empty_df()
+    sync_shared()
+
+def session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:12]
+    return st.session_state.session_id
+
+
+def sync_shared():
+    # Pull datasets other sessions changed since this session last saw them: only the changed rows when the
+    # dataset was edited, the whole frame when it was replaced
+    shared = get_shared()
+    if shared is None:
+        return
+    for state_key in SHARED_DATASETS:
+        seen = st.session_state.get(f"{state_key}_shared")
+        if shared.head(state_key) in (None, seen):
+            continue
+        generation, version, frame, rows = shared.load(state_key, since=seen)
+        if frame is not None:
+            st.session_state[state_key] = frame
+        elif rows:
+            store = get_dataset(state_key)
+            store.upsert(rows)
+            st.session_state[state_key] = store.frame
+            st.session_state[f"{state_key}_store"] = (store, store.frame)
+        st.session_state[f"{state_key}_shared"] = (generation, version)
+
+
+def set_dataset(state_key, df):
+    # Replace a dataset, in this session and for everyone else
+    st.session_state[state_key] = df
+    shared = get_shared()
+    if shared is not None and state_key in SHARED_DATASETS:
+        st.session_state[f"{state_key}_shared"] = shared.publish(state_key, df, owner=session_id())
 
-import streamlit as st
 
 def freeze_ui_for_others(current):
     active = st.session_state.get("active_section", None)
@@ -21,10 +67,88 @@ def freeze_ui_for_others(current):
         st.info(f"🔒 '{active}' is currently processing. Please wait...")
         st.stop()
 
+    holder = _other_holder(current)
+    if holder:
+        st.info(f"🔒 {current} is running in another session (for {time.time() - holder['acquired_at']:.0f} s). "
+                "Its results show up here when it finishes.")
+
+def lock_section(section):
+    # Claims the section for this session (and across sessions); False, with a message, if another session has it
+    shared = get_shared()
+    if shared is not None:
+        holder = shared.acquire(section, session_id())
+        if holder:
+            st.warning(f"🔒 {section} is already running in another session, started "
+                       f"{time.time() - holder['acquired_at']:.0f} s ago. Try again when it finishes.")
+            return False
+    st.session_state.active_section = section
+    return True
+
 def unlock_ui():
+    section = st.session_state.get("active_section")
+    shared = get_shared()
+    if shared is not None and isinstance(section, str):
+        shared.release(section, session_id())
     st.session_state.active_section = None
 
+def _other_holder(section):
+    shared = get_shared()
+    holder = shared.holder(section) if shared is not None else None
+    return holder if holder and holder["owner"] != session_id() else None
+
+
+def get_dataset(state_key):
+    # DatasetStore behind st.session_state[state_key], rebuilt only when the DataFrame was replaced wholesale
+    store, frame = st.session_state.get(f"{state_key}_store", (None, None))
+    df = st.session_state.get(state_key)
+    if store is None or frame is not df:
+        store = DatasetStore(df)
+        st.session_state[f"{state_key}_store"] = (store, df)
+    return store
+
+def upsert_dataset(state_key, rows):
+    store = get_dataset(state_key)
+    result = store.upsert(rows)
+    frame = store.frame
+    st.session_state[state_key] = frame
+    st.session_state[f"{state_key}_store"] = (store, frame)
+    shared = get_shared()
+    if shared is not None and state_key in SHARED_DATASETS:
+        seen = st.session_state.get(f"{state_key}_shared")
+        if seen is None:
+            # Never shared yet: publish the whole dataset rather than just these rows
+            st.session_state[f"{state_key}_shared"] = shared.publish(state_key, frame, owner=session_id())
+        else:
+            if isinstance(rows, pd.DataFrame):
+                rows = rows.to_dict("records")
+            elif isinstance(rows, (dict, pd.Series)):
+                rows = [rows]
+            head = shared.publish_rows(state_key, rows, owner=session_id())
+            # If someone else wrote in between, keep the old marker so the next sync pulls their rows too
+            if head == (seen[0], seen[1] + 1):
+                st.session_state[f"{state_key}_shared"] = head
+    return result
+
+def start_session_run(label, expected=0):
+    # A metrics run current on this thread and shown in this session's metrics panel (other sessions and
+    # background jobs keep their own)
+    metrics = start_run(label, expected)
+    st.session_state.metrics_run = metrics
+    return metrics
+
+def session_metrics():
+    return st.session_state.get("metrics_run")
+
+def get_search_index(state_key):
+    # SearchIndex over the dataset, built once per store and kept current by the store's upserts
+    store = get_dataset(state_key)
+    uid, index = st.session_state.get(f"{state_key}_search", (None, None))
+    if uid != store.uid:
+        index = SearchIndex.from_frame(store.frame)
+        store.on_change(index.update)
+        st.session_state[f"{state_key}_search"] = (store.uid, index)
+    return index
+
 
 def __empty_df():
-    import pandas as pd
     return pd.DataFrame()
@@ -1,16 +1,29 @@
-import os
-import subprocess
-import glob
-from .config import SCRAPER_DIR, CHALLENGE_OUTPUT_PREFIX
+def start_scrape_run(url):
+    # Each scrape writes to its own run (scraping_challenges_info/runs/<run_id>/), so concurrent scrapes never
+    # read each other's output
+    from scraping_challenges_info.run_store import get_run_store
+    return get_run_store().start(url)
 
-def get_latest_challenge_excel():
-    files = glob.glob(os.path.join(f"{SCRAPER_DIR}/Excel-Files", f"{CHALLENGE_OUTPUT_PREFIX}*.xlsx"))
-    return max(files, key=os.path.getmtime) if files else None
+def load_scrape_run(run_id):
+    # {sheet name: DataFrame} for one scrape run, looked up by ID in the run manifest
+    from scraping_challenges_info.run_store import get_run_store
+    return get_run_store().load(run_id)
 
-def run_scraper(url):
-    return subprocess.run(
-        ["python", "web-scraping.py", url],
-        cwd=SCRAPER_DIR,
-        capture_output=True,
-        text=True
-    )
+def recent_scrape_runs(limit=10):
+    from scraping_challenges_info.run_store import get_run_store
+    return get_run_store().recent(limit)
+
+def finish_scrape_run(run_id, df_basic, df_detailed, excel_path=None):
+    # Stores the final, index-ordered sheets of a run whose records were appended as they arrived
+    from scraping_challenges_info.run_store import get_run_store
+    sheets = {"Basic Info": df_basic.to_dict("records"), "Challenge Details": df_detailed.to_dict("records")}
+    get_run_store().complete(run_id, sheets, excel_path)
+
+def run_scraper(url, on_progress=None, export_excel=False, run_id=None):
+    # Runs in-process and returns (df_basic, df_detailed, excel_path); the scraper stack is imported on first use
+    from scraping_challenges_info.scraper import scrape_challenges
+    return scrape_challenges(url, on_progress=on_progress, export_excel=export_excel, run_id=run_id)
+
+def save_scraper_excel(df_basic, df_detailed, name=None):
+    from scraping_challenges_info.scraper import save_excel
+    return save_excel(df_basic, df_detailed, name=name)
@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .metrics import timer
+
+# Free-text columns hidden from table views unless picked; other text columns are hidden when their typical
+# cell is longer than LONG_TEXT_CHARS
+LONG_TEXT_COLUMNS = ["Brief", "Background", "Objectives", "Potential Considerations", "Unparsed"]
+LONG_TEXT_CHARS = 200
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def default_columns(df, sample=200):
+    head = df.head(sample)
+    shown = []
+    for col in df.columns:
+        if col in LONG_TEXT_COLUMNS:
+            continue
+        if pd.api.types.is_string_dtype(head[col].dtype) and head[col].dropna().astype(str).str.len().median() > LONG_TEXT_CHARS:
+            continue
+        shown.append(col)
+    return shown or list(df.columns[:1])
+
+
+class ViewCache:
+    # Row orders (filter + sort) and rendered pages, keyed by dataset version and view settings. Entries keep a
+    # reference to their frame so a frame keyed only by identity can't be confused with a later one.
+    def __init__(self, max_orders=16, max_pages=64):
+        self.max_orders = max_orders
+        self.max_pages = max_pages
+        self._orders = OrderedDict()
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, items, key, df, build, limit):
+        with self._lock:
+            found = items.get(key)
+            if found is not None and found[0] is df:
+                items.move_to_end(key)
+                return found[1]
+        value = build()
+        with self._lock:
+            items[key] = (df, value)
+            while len(items) > limit:
+                items.popitem(last=False)
+        return value
+
+    def order(self, key, df, build):
+        return self._get(self._orders, key, df, build, self.max_orders)
+
+    def page(self, key, df, build):
+        return self._get(self._pages, key, df, build, self.max_pages)
+
+
+_cache = ViewCache()
+
+
+def _row_order(df, query, search_columns, sort_by, ascending):
+    # Positions of the rows matching query (case-insensitive substring in any of search_columns), sorted
+    positions = np.arange(len(df))
+    if query:
+        mask = np.zeros(len(df), dtype=bool)
+        for col in search_columns:
+            mask |= df[col].astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+        positions = positions[mask]
+    if sort_by:
+        values = df[sort_by].iloc[positions]
+        # Numbers sort as numbers, everything else as case-insensitive text; missing values go last
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.astype(str).str.casefold().where(values.notna())
+        order = values.reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last")
+        positions = positions[order.index.to_numpy()]
+    return positions
+
+
+def page_view(df, version=None, columns=None, query="", sort_by=None, ascending=True, page=1, page_size=50,
+              search_columns=None):
+    # (arrow table of one page, matching row count). Only the page's rows and the projected columns are
+    # converted, and both the row order and the converted page are cached per dataset version, so reruns that
+    # don't change the view cost two dictionary lookups. version None keys the cache by the frame's identity.
+    columns = [c for c in (columns or df.columns) if c in df.columns]
+    search_columns = [c for c in (search_columns or columns) if c in df.columns]
+    query = query.strip()
+    base = (version if version is not None else ("frame", id(df)), query, tuple(search_columns), sort_by, ascending)
+
+    def build_order():
+        with timer("view_order", rows=len(df)):
+            return _row_order(df, query, search_columns, sort_by, ascending)
+
+    positions = _cache.order(base, df, build_order)
+    pages = max(1, -(-len(positions) // page_size))
+    page = min(max(page, 1), pages)
+
+    def build_page():
+        rows = positions[(page - 1) * page_size:page * page_size]
+        sliced = df.iloc[rows][columns]
+        # Row numbers as shown in the full dataset (1-based)
+        sliced.index = pd.Index(rows + 1, name="#")
+        # Mixed-type object columns go over as text, as in the parquet export
+        text_cols = [c for c in sliced.columns if sliced[c].dtype == object]
+        if text_cols:
+            sliced[text_cols] = sliced[text_cols].astype(str).where(sliced[text_cols].notna(), None)
+        return pa.Table.from_pandas(sliced, preserve_index=True)
+
+    table = _cache.page(base + (tuple(columns), page, page_size), df, build_page)
+    return table, len(positions)
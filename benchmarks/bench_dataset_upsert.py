@@ -0,0 +1,75 @@
+"""Per-upsert cost (upsert, then read the frame) of the old copy/scan/concat path vs DatasetStore as the dataset grows.
+
+    python benchmarks/bench_dataset_upsert.py [--sizes 1000 10000 50000] [--ops 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from LLM_AND_UI.dataset import DatasetStore
+
+
+def make_rows(n, start=0):
+    return [
+        {"Title": f"Challenge {i}", "Summary": f"Summary {i}", "Fields": "GIS", "Skills": "Python", "Category": "Earth"}
+        for i in range(start, start + n)
+    ]
+
+
+def legacy_upsert(df, row):
+    # What _render_add_replace_ui used to do for every single add
+    df = df.copy()
+    df["Title"] = df["Title"].astype(str)
+    idx = df[df["Title"].str.lower() == row["Title"].lower()].index
+    if not idx.empty:
+        df.loc[idx[0]] = pd.Series(row)
+    else:
+        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+    return df
+
+
+def per_op_us(fn, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy insert':>14} {'store insert':>13} {'legacy update':>14} {'store update':>13}  (µs/op)")
+    for size in args.sizes:
+        base = pd.DataFrame(make_rows(size))
+        new_rows = make_rows(args.ops, start=size)
+        existing = [dict(row, Summary=f"{row['Summary']} (edited)") for row in make_rows(args.ops)]
+
+        legacy = {"df": base}
+        def legacy_insert(i):
+            legacy["df"] = legacy_upsert(legacy["df"], new_rows[i])
+        legacy_ins = per_op_us(legacy_insert, args.ops)
+        legacy["df"] = base
+        def legacy_update(i):
+            legacy["df"] = legacy_upsert(legacy["df"], existing[i])
+        legacy_upd = per_op_us(legacy_update, args.ops)
+
+        # The app reads the frame right after every upsert (state.upsert_dataset), so that is timed too
+        store = DatasetStore(base.copy())
+        def store_upsert(row):
+            store.upsert(row)
+            return store.frame
+        store_ins = per_op_us(lambda i: store_upsert(new_rows[i]), args.ops)
+        store_upd = per_op_us(lambda i: store_upsert(existing[i]), args.ops)
+
+        print(f"{size:>8} {legacy_ins:>14.0f} {store_ins:>13.0f} {legacy_upd:>14.0f} {store_upd:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""End-to-end stage benchmarks: scrape, analyze, parse, upsert and export on synthetic corpora.
+
+Everything runs offline: detail pages come from a local fixture server and the model is the replay backend
+with no recording, so every call gets a stub reply after a simulated latency.
+
+    python benchmarks/bench_pipeline.py [--sizes 100 1000 10000 50000] [--latency 0.01] [--concurrency 32]
+    python benchmarks/bench_pipeline.py --stages parse upsert --compare benchmarks/results/<commit>.json
+
+Results are written to benchmarks/results/<commit>.json (per stage: rows, seconds, rows/s, p50/p95/p99
+per-item latency in ms and tracemalloc peak in MB) so runs can be compared across commits.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# No request pacing and short backoffs, so the numbers measure the pipeline rather than the limiter
+os.environ.setdefault("LLM_RPM", "0")
+os.environ.setdefault("LLM_TPM", "0")
+os.environ.setdefault("LLM_BACKOFF_BASE", "0.01")
+
+import pandas as pd
+
+from corpus import FixtureServer, make_briefs, make_challenge_page, make_reply
+from LLM_AND_UI.dataset import DatasetStore
+from LLM_AND_UI.export import write_export
+from LLM_AND_UI.llm import analyze_briefs
+from LLM_AND_UI.metrics import percentile
+from LLM_AND_UI.models import ReplayModel, set_model
+from LLM_AND_UI.parser import parse_output
+from scraping_challenges_info.scraper import parse_challenge_page, scrape
+
+STAGES = ["scrape", "parse_page", "analyze", "parse", "upsert", "export"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def timed_each(items, fn):
+    # Per-item latencies in seconds
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure(name, rows, setup, memory=True):
+    # setup() returns a fresh zero-argument stage function, which returns per-item latencies (seconds) or None
+    # when only the total is meaningful. tracemalloc slows allocation-heavy code several times over, so timings
+    # come from an untraced pass and the peak from a second, traced pass.
+    fn = setup()
+    start = time.perf_counter()
+    latencies = fn()
+    seconds = time.perf_counter() - start
+    result = {"stage": name, "rows": rows, "seconds": round(seconds, 4), "rows_per_s": round(rows / seconds, 1)}
+    if latencies:
+        for q in (50, 95, 99):
+            result[f"p{q}_ms"] = round(percentile(latencies, q) * 1000, 3)
+    result["peak_mb"] = None
+    if memory:
+        fn = setup()
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def bench_size(size, args):
+    briefs = make_briefs(size, seed=args.seed)
+    results = []
+    run = lambda name, rows, setup: results.append(measure(name, rows, setup, args.memory)) or print_row(size, results[-1])
+
+    if "scrape" in args.stages:
+        pages = min(size, args.scrape_max)
+        with FixtureServer(pages, delay=args.page_delay, seed=args.seed) as server:
+            run("scrape", pages, lambda: lambda: scrape(
+                server.url, max_workers=args.scrape_workers, use_browser=False, incremental=False
+            ) and None)
+
+    if "parse_page" in args.stages:
+        pages = [(make_challenge_page(i, args.seed), f"Challenge {i}") for i in range(min(size, args.scrape_max))]
+        run("parse_page", len(pages), lambda: lambda: timed_each(pages, lambda p: parse_challenge_page(p[0], p[1], "")))
+
+    if "analyze" in args.stages:
+        def setup():
+            set_model(ReplayModel(
+                "bench", path=os.devnull, latency=args.latency, jitter=args.latency / 2,
+                error_rate=args.error_rate, seed=args.seed,
+            ))
+            return lambda: [r.latency for r in analyze_briefs(briefs, max_concurrency=args.concurrency, use_cache=False)]
+
+        run("analyze", size, setup)
+
+    if "parse" in args.stages:
+        for mode in ("json", "text"):
+            replies = [make_reply(i, mode, args.seed) for i in range(size)]
+            run(f"parse_{mode}", size, lambda: lambda: timed_each(replies, parse_output))
+
+    frame = pd.DataFrame([parse_output(make_reply(i, "json", args.seed)) for i in range(size)])
+    if "upsert" in args.stages:
+        ops = min(size, args.upsert_ops)
+        inserts = [{**frame.iloc[i % size].to_dict(), "Title": f"New challenge {i}"} for i in range(ops)]
+        updates = [{**frame.iloc[i].to_dict(), "Summary": "Updated"} for i in range(ops)]
+
+        def store_upserts(rows):
+            store = DatasetStore(frame.copy())
+
+            def upsert(row):
+                # As in state.upsert_dataset, the frame is read right after every upsert
+                store.upsert(row)
+                return store.frame
+
+            return lambda: timed_each(rows, upsert)
+
+        run("upsert_insert", ops, lambda: store_upserts(inserts))
+        run("upsert_replace", ops, lambda: store_upserts(updates))
+
+    if "export" in args.stages:
+        for fmt in args.formats:
+            run(f"export_{fmt}", size, lambda: lambda: write_export(frame, io.BytesIO(), fmt) and None)
+    return results
+
+
+def print_row(size, result):
+    pct = " ".join(f"{result.get(f'p{q}_ms', ''):>9}" for q in (50, 95, 99))
+    peak = result["peak_mb"] if result["peak_mb"] is not None else ""
+    print(f"{size:>7} {result['stage']:<15} {result['rows']:>7} {result['seconds']:>9.3f} "
+          f"{result['rows_per_s']:>11.1f} {pct} {peak:>9}", flush=True)
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, path):
+    with open(path, encoding="utf-8") as f:
+        before = {(r["size"], r["stage"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {os.path.basename(path)} (rows/s, >1 is faster now)")
+    for r in results:
+        old = before.get((r["size"], r["stage"]))
+        if old and old["rows_per_s"]:
+            print(f"{r['size']:>7} {r['stage']:<15} {r['rows_per_s'] / old['rows_per_s']:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--latency", type=float, default=0.01, help="Simulated model latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Simulated 429/503 rate")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scrape-max", type=int, default=1000, help="Cap on fixture pages per size")
+    parser.add_argument("--scrape-workers", type=int, default=8)
+    parser.add_argument("--page-delay", type=float, default=0.0, help="Simulated server time per page (s)")
+    parser.add_argument("--upsert-ops", type=int, default=1000, help="Single-row upserts per size")
+    parser.add_argument("--formats", nargs="+", default=["csv", "jsonl", "parquet", "xlsx"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="Skip the second, tracemalloc pass that measures peak memory")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare throughput against")
+    args = parser.parse_args()
+
+    print(f"{'size':>7} {'stage':<15} {'rows':>7} {'seconds':>9} {'rows/s':>11} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MB':>9}")
+    results = []
+    for size in args.sizes:
+        results += [{"size": size, **r} for r in bench_size(size, args)]
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "args": vars(args),
+            "results": results,
+        }, f, indent=2)
+    print(f"\nSaved {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
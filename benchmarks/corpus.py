@@ -0,0 +1,98 @@
+"""Synthetic challenge corpora and spaceappschallenge-style HTML fixtures for the benchmarks."""
+import json
+import random
+
+from tests import fixture_server
+
+WORDS = (
+    "satellite orbit ocean climate data model sensor mission earth lunar mars imagery vegetation wildfire "
+    "flood drought atmosphere aerosol radiation habitat crew telescope galaxy exoplanet spectrum archive "
+    "visualize predict monitor analyze map community resilience agriculture urban heat water energy"
+).split()
+FIELDS = ["GIS / Remote Sensing", "AI / Machine Learning", "Data Science / Data Analysis", "Web Development",
+          "Game Development", "3D Modeling / Animation", "Mobile App Development", "UI & UX Design"]
+SKILLS = ["Python", "Unity", "TensorFlow", "Blender", "JavaScript", "QGIS", "React", "PyTorch", "C#"]
+CATEGORIES = ["Earth", "Space", "Climate", "Oceans", "Health", "Humans"]
+SUBJECTS = ["Coding", "Data Analysis", "Earth Science", "Planets & Moons", "Software", "Art & Design"]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+
+
+def sentence(rng, words=(8, 20)):
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(*words)))
+    return text.capitalize() + "."
+
+
+def paragraph(rng, sentences=(2, 6)):
+    return " ".join(sentence(rng) for _ in range(rng.randint(*sentences)))
+
+
+def make_briefs(n, seed=0):
+    # Rows shaped like the upload sheet / scraper output, with realistic variation in section length
+    rng = random.Random(seed)
+    return [
+        {
+            "Title": f"Challenge {i}: {sentence(rng, (2, 5))[:-1]}",
+            "Brief": paragraph(rng),
+            "Objectives": paragraph(rng, (1, 4)),
+            "Background": paragraph(rng, (3, 10)),
+            "Potential Considerations": "\n".join(f"- {sentence(rng)}" for _ in range(rng.randint(0, 5))),
+            "Subjects": ", ".join(rng.sample(SUBJECTS, 2)),
+            "Difficulty": rng.choice(DIFFICULTIES),
+        }
+        for i in range(n)
+    ]
+
+
+def make_reply(i, mode="json", seed=0):
+    # A model reply for one challenge, in the JSON or labelled text output format
+    rng = random.Random(seed * 1_000_003 + i)
+    record = {
+        "title": f"Challenge {i}",
+        "summary": paragraph(rng, (2, 3)),
+        "fields": rng.sample(FIELDS, rng.randint(1, 3)),
+        "skills": rng.sample(SKILLS, rng.randint(2, 5)),
+        "workshops": [sentence(rng, (3, 6))[:-1] for _ in range(rng.randint(1, 3))],
+        "mentors": [sentence(rng, (2, 4))[:-1] for _ in range(rng.randint(1, 3))],
+        "category": rng.choice(CATEGORIES),
+    }
+    if mode == "json":
+        return json.dumps(record)
+    return "\n".join(
+        f"{key.capitalize()}: {', '.join(value) if isinstance(value, list) else value}" for key, value in record.items()
+    )
+
+
+def make_challenge_page(i, seed=0):
+    # Mirrors the detail page markup read by extract_meta_info / extract_html_sections plus the __NEXT_DATA__ blob
+    rng = random.Random(seed * 1_000_003 + i)
+    blocks = [{"title": title, "text": paragraph(rng)} for title in ("Background", "Objectives", "Potential Considerations")]
+    next_data = {"props": {"pageProps": {"challenge": {
+        "title": f"Challenge {i}",
+        "dataBlocks": blocks,
+        "challengeTheme": {"title": rng.choice(CATEGORIES)},
+        "challengeType": {"title": "Challenge"},
+        "challengeCategory": {"title": rng.choice(CATEGORIES)},
+    }}}}
+    tags = lambda values: "".join(f'<span class="challenge-info_tag__G_QQv">{v}</span>' for v in values)
+    meta = (
+        f'<div class="challenge-info_meta__gZ65p"><p class="challenge-info_label__qTNb0">Difficulty</p>'
+        f'{tags([rng.choice(DIFFICULTIES)])}</div>'
+        f'<div class="challenge-info_meta__gZ65p"><p class="challenge-info_label__qTNb0">Subjects</p>'
+        f'{tags(rng.sample(SUBJECTS, 3))}</div>'
+    )
+    content = "".join(f"<p>{sentence(rng)}</p>" for _ in range(3)) + "".join(
+        f"<h2>{b['title']}</h2><p>{b['text']}</p><ul>{''.join(f'<li>{sentence(rng)}</li>' for _ in range(3))}</ul>"
+        for b in blocks
+    )
+    return (
+        f'<html><head><script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script></head>'
+        f'<body><h1>Challenge {i}</h1>{meta}<div class="challenge-details_content__218__">{content}</div></body></html>'
+    )
+
+
+class FixtureServer(fixture_server.FixtureServer):
+    # The tests' fixture server, filled with an index and n generated detail pages
+    def __init__(self, n, delay=0.0, seed=0):
+        pages = {"/challenges": fixture_server.index_page(n)}
+        pages.update({f"/challenges/c{i}": make_challenge_page(i, seed) for i in range(n)})
+        super().__init__(pages, delay)
@@ -1,22 +1,35 @@
+import logging
+import os
+
 import streamlit as st
 from LLM_AND_UI.UI.scrape_tab import render_scrape_tab
 from LLM_AND_UI.UI.upload_tab import render_upload_tab
 from LLM_AND_UI.UI.manual_tab import render_manual_tab
+from LLM_AND_UI.UI.merge_tab import render_merge_tab
+from LLM_AND_UI.UI.search_tab import render_search_tab
+from LLM_AND_UI.UI.analytics_tab import render_analytics_tab
 from LLM_AND_UI.state import init_session_state,freeze_ui_for_others, unlock_ui
+from LLM_AND_UI.UI.sidebar import render_sidebar
+
+# Scraper progress and merge warnings go through logging; LOG_LEVEL=WARNING quiets them
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 st.set_page_config(page_title="NASA Brief Tagger", page_icon="nasa_logo.png", layout="wide")
 st.title("🚀 NASA Space Apps - Challenge Brief Analyzer")
 
 st.markdown("""
 Welcome! This tool helps you collect, analyze, and organize NASA Space Apps Challenge briefs.  
-Each section (Scrape, Upload, Manual) is separate with its own dataset and export options.
+Each section (Scrape, Upload, Manual) is separate with its own dataset and export options; the Merge tab combines them.
 """)
 
 # Init state
 init_session_state()
 
+# Sidebar
+render_sidebar()
+
 # Tabs
-tabs = st.tabs(["🌐 Scrape", "📤 Upload", "✍️ Manual Entry"])
+tabs = st.tabs(["🌐 Scrape", "📤 Upload", "✍️ Manual Entry", "🔀 Merge", "🔎 Search", "📊 Analytics"])
 
 # Render tabs
 with tabs[0]:
@@ -24,4 +37,10 @@ with tabs[0]:
 with tabs[1]:
     render_upload_tab()
 with tabs[2]:
-    render_manual_tab()
\ No newline at end of file
+    render_manual_tab()
+with tabs[3]:
+    render_merge_tab()
+with tabs[4]:
+    render_search_tab()
+with tabs[5]:
+    render_analytics_tab()
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+PAGE_STORE_PATH = os.getenv("PAGE_STORE_PATH", os.path.join(os.path.dirname(__file__), "page_store.sqlite3"))
+
+
+def content_hash(data):
+    if not isinstance(data, str):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class PageStore:
+    # Last seen validators, content hash and parsed record for each challenge URL
+    def __init__(self, path=PAGE_STORE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                record TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, record FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_hash": row[2], "record": json.loads(row[3])}
+
+    def put(self, url, record, digest, etag=None, last_modified=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, digest, json.dumps(record, ensure_ascii=False), time.time()),
+            )
+
+    def touch(self, url, etag=None, last_modified=None):
+        # Refresh validators without touching the stored record
+        with self._lock:
+            self._conn.execute(
+                """UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified),
+                   fetched_at = ? WHERE url = ?""",
+                (etag, last_modified, time.time(), url),
+            )
+
+    def close(self):
+        self._conn.close()
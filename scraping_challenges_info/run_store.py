@@ -0,0 +1,241 @@
+import importlib.util
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+RUNS_DIR = os.getenv("SCRAPER_RUNS_DIR", os.path.join(os.path.dirname(__file__), "runs"))
+# Retention: finished runs beyond the newest RUNS_KEEP, or past RUNS_MAX_MB in total, are deleted oldest first
+RUNS_KEEP = int(os.getenv("SCRAPER_RUNS_KEEP", "20"))
+RUNS_MAX_MB = float(os.getenv("SCRAPER_RUNS_MAX_MB", "200"))
+# A running run is leased to the process writing it and renewed every RUN_LEASE_TTL / 3 seconds; other processes
+# only mark it interrupted once the lease has expired
+RUN_LEASE_TTL = float(os.getenv("SCRAPER_RUN_LEASE_TTL", "60"))
+
+# Artifact file per sheet, in the order the scrape tab shows them
+SHEETS = {"Basic Info": "basic", "Challenge Details": "details"}
+
+
+def _has_parquet():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class RunStore:
+    # One directory per scrape run, <root>/<run_id>/, and a manifest (SQLite) indexed by run ID.
+    # Records are appended to <sheet>.jsonl while the run is going, so a crash keeps what was scraped; when the
+    # run finishes each sheet is compacted to Parquet (gzipped JSONL without pyarrow) and old runs are pruned.
+    # Several processes can share one runs directory: each run is leased to the store that started it, like jobs.
+    def __init__(self, root=RUNS_DIR, keep=RUNS_KEEP, max_mb=RUNS_MAX_MB, lease_ttl=RUN_LEASE_TTL):
+        self.root = root
+        self.keep = keep
+        self.max_bytes = max_mb * 2**20 if max_mb else None
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_ttl = lease_ttl
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "manifest.sqlite3"), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                url TEXT,
+                status TEXT NOT NULL,
+                rows INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                format TEXT,
+                excel_path TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                owner TEXT,
+                lease_until REAL
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                # Manifests from before leases
+                self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS runs_created ON runs(created_at)")
+
+    def _dir(self, run_id):
+        return os.path.join(self.root, run_id)
+
+    def start(self, url=None):
+        # Sortable and unique even when several scrapes start in the same second
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self._dir(run_id))
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO runs (id, url, status, created_at, owner, lease_until) VALUES (?, ?, 'running', ?, ?, ?)",
+                (run_id, url, now, self.owner, now + self.lease_ttl),
+            )
+        return run_id
+
+    def renew(self):
+        # Extends the leases of every run this store is writing
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET lease_until = ? WHERE owner = ? AND status = 'running'",
+                (time.time() + self.lease_ttl, self.owner),
+            )
+
+    def keep_alive(self):
+        # Renews this store's leases in the background and marks runs whose writer died as interrupted
+        def heartbeat():
+            while True:
+                time.sleep(self.lease_ttl / 3)
+                self.renew()
+                self.recover()
+
+        threading.Thread(target=heartbeat, daemon=True, name="run-lease").start()
+
+    def append(self, run_id, sheet, records, mode="a"):
+        # mode "w" replaces what the sheet holds so far
+        lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        with self._lock, open(os.path.join(self._dir(run_id), f"{SHEETS[sheet]}.jsonl"), mode, encoding="utf-8") as f:
+            f.write(lines)
+
+    def finish(self, run_id, status="done", error=None, excel_path=None):
+        rows, size, fmt = self.compact(run_id)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, rows = ?, bytes = ?, format = ?, excel_path = ?, error = ?, finished_at = ? "
+                "WHERE id = ?",
+                (status, rows, size, fmt, excel_path, error, time.time(), run_id),
+            )
+        self.prune()
+
+    def complete(self, run_id, sheets, excel_path=None):
+        # Replaces each sheet with its final records ({sheet name: records}, e.g. in index order rather than the
+        # order they were appended in) and finishes the run
+        for sheet, records in sheets.items():
+            self.append(run_id, sheet, records, mode="w")
+        self.finish(run_id, excel_path=excel_path)
+
+    def save(self, url, sheets, excel_path=None):
+        # Records an already scraped run in one go; returns its ID
+        run_id = self.start(url)
+        self.complete(run_id, {sheet: df.to_dict("records") for sheet, df in sheets.items()}, excel_path)
+        return run_id
+
+    def compact(self, run_id):
+        # Rewrites each sheet's JSONL as one columnar file; returns (detail rows, bytes on disk, format)
+        directory = self._dir(run_id)
+        fmt = "parquet" if _has_parquet() else "jsonl.gz"
+        rows = 0
+        for sheet, name in SHEETS.items():
+            path = os.path.join(directory, f"{name}.jsonl")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_json(path, lines=True, dtype=False) if os.path.getsize(path) else pd.DataFrame()
+            if fmt == "parquet":
+                # Mixed-type object columns are stored as text, as in the parquet export
+                text_cols = [c for c in df.columns if df[c].dtype == object]
+                df[text_cols] = df[text_cols].astype(str).where(df[text_cols].notna(), None)
+                df.to_parquet(os.path.join(directory, f"{name}.parquet"), index=False, compression="zstd")
+            else:
+                df.to_json(os.path.join(directory, f"{name}.jsonl.gz"), orient="records", lines=True,
+                           compression="gzip", force_ascii=False)
+            os.remove(path)
+            if sheet == "Challenge Details":
+                rows = len(df)
+        size = sum(entry.stat().st_size for entry in os.scandir(directory)) if os.path.isdir(directory) else 0
+        return rows, size, fmt
+
+    def get(self, run_id):
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,))
+            row = cursor.fetchone()
+            names = [d[0] for d in cursor.description]
+        return dict(zip(names, row)) if row else None
+
+    def recent(self, limit=10):
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM runs ORDER BY created_at DESC LIMIT ?", (limit,))
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def load(self, run_id):
+        # {sheet name: DataFrame} for one run, read from its own directory; a run still going reads its JSONL
+        run = self.get(run_id)
+        if run is None or run["status"] == "expired":
+            raise LookupError(f"Scrape run {run_id} not found")
+        directory = self._dir(run_id)
+        sheets = {}
+        for sheet, name in SHEETS.items():
+            path = os.path.join(directory, name)
+            if os.path.exists(f"{path}.parquet"):
+                sheets[sheet] = pd.read_parquet(f"{path}.parquet")
+            elif os.path.exists(f"{path}.jsonl.gz"):
+                sheets[sheet] = pd.read_json(f"{path}.jsonl.gz", lines=True, compression="gzip", dtype=False)
+            elif os.path.exists(f"{path}.jsonl") and os.path.getsize(f"{path}.jsonl"):
+                sheets[sheet] = pd.read_json(f"{path}.jsonl", lines=True, dtype=False)
+            else:
+                sheets[sheet] = pd.DataFrame()
+        return sheets
+
+    def prune(self):
+        # Deletes the artifacts (and Excel copies) of finished runs past the retention limits; their manifest
+        # entries stay, marked expired. Runs still going are never touched.
+        with self._lock:
+            finished = self._conn.execute(
+                "SELECT id, bytes, excel_path FROM runs WHERE status NOT IN ('running', 'expired') "
+                "ORDER BY created_at DESC"
+            ).fetchall()
+        expired = []
+        total = 0
+        for i, (run_id, size, excel_path) in enumerate(finished):
+            total += size
+            if (self.keep and i >= self.keep) or (self.max_bytes and total > self.max_bytes and i > 0):
+                expired.append((run_id, excel_path))
+        for run_id, excel_path in expired:
+            shutil.rmtree(self._dir(run_id), ignore_errors=True)
+            if excel_path and os.path.exists(excel_path):
+                os.remove(excel_path)
+        if expired:
+            with self._lock:
+                self._conn.executemany("UPDATE runs SET status = 'expired', bytes = 0 WHERE id = ?",
+                                       [(run_id,) for run_id, _ in expired])
+        return len(expired)
+
+    def recover(self):
+        # Runs left 'running' by a process that stopped renewing their lease (a crash or restart): compact what
+        # they wrote and mark them interrupted. Each one is taken over first, so two processes never both finish it.
+        now = time.time()
+        expired = "status = 'running' AND (lease_until < ? OR (lease_until IS NULL AND created_at < ?))"
+        with self._lock:
+            stale = self._conn.execute(f"SELECT id FROM runs WHERE {expired}", (now, now - self.lease_ttl)).fetchall()
+        recovered = 0
+        for (run_id,) in stale:
+            with self._lock:
+                claimed = self._conn.execute(
+                    f"UPDATE runs SET owner = ?, lease_until = ? WHERE id = ? AND {expired}",
+                    (self.owner, now + self.lease_ttl, run_id, now, now - self.lease_ttl),
+                ).rowcount
+            if claimed:
+                self.finish(run_id, status="interrupted")
+                recovered += 1
+        return recovered
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_run_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RunStore()
+            _store.recover()
+            _store.keep_alive()
+        return _store
@@ -0,0 +1,363 @@
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urljoin
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from LLM_AND_UI.config import CONTENT_HASH_COLUMN
+from LLM_AND_UI.metrics import get_metrics, in_run
+
+from .page_store import PageStore, content_hash
+from .run_store import get_run_store
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+REQUEST_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "20"))
+BROWSER_TIMEOUT = float(os.getenv("SCRAPER_BROWSER_TIMEOUT", "30"))
+DRIVER_PATH = os.path.join(os.path.dirname(__file__), '../driver/msedgedriver.exe')
+EXCEL_DIR = os.path.join(os.path.dirname(__file__), "Excel-Files")
+
+INDEX_CONTAINER = 'challenge-index_results__z_Zp5'
+DETAIL_CONTENT = '.challenge-details_content__218__'
+NEXT_DATA = 'script#__NEXT_DATA__'
+
+_NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+
+wanted_sections = ["Brief", "Background", "Objectives", "Potential Considerations"]
+
+
+# ---------- Parsing ----------
+def extract_meta_info(detail_soup):
+    result = {}
+    meta_sections = detail_soup.select('.challenge-info_meta__gZ65p')
+
+    for section in meta_sections:
+        label = section.select_one('.challenge-info_label__qTNb0')
+        if not label:
+            continue
+        label_text = label.text.strip()
+
+        tags = section.select('.challenge-info_tag__G_QQv')
+        if tags:
+            result[label_text] = [tag.text.strip() for tag in tags]
+        else:
+            span = section.select_one('span')
+            if span:
+                result[label_text] = span.text.strip()
+    return result
+
+def extract_html_sections(detail_soup):
+    content = detail_soup.select_one(DETAIL_CONTENT)
+    if not content:
+        return {}
+
+    children = content.find_all(recursive=False)
+    sections = {}
+    brief_parts = []
+    current_section = None
+
+    for el in children:
+        if el.name == 'h2':
+            current_section = el.get_text(strip=True)
+            sections[current_section] = ''
+        elif current_section:
+            if el.name == 'ul':
+                items = [f"- {li.get_text(strip=True)}" for li in el.find_all('li')]
+                sections[current_section] += '\n'.join(items) + '\n'
+            else:
+                text = el.get_text(strip=True)
+                if text:
+                    sections[current_section] += text + '\n'
+        elif el.name == 'p':
+            text = el.get_text(strip=True)
+            if text:
+                brief_parts.append(text)
+
+    if brief_parts:
+        sections["Brief"] = '\n'.join(brief_parts)
+
+    return sections
+
+def extract_challenge_links(index_html, index_url):
+    soup = BeautifulSoup(index_html, 'html.parser')
+    container = soup.find('div', class_=INDEX_CONTAINER)
+    if not container:
+        return None
+
+    links = []
+    for a in container.find_all('a', href=True):
+        if a.h2:
+            links.append((a.h2.get_text(strip=True), urljoin(index_url, a['href'])))
+    return links
+
+def parse_challenge_page(html, title, url):
+    detail_soup = BeautifulSoup(html, 'html.parser')
+    section_data = {}
+    detailed_entry = {"Title": title, "URL": url}
+
+    script_tag = detail_soup.find("script", id="__NEXT_DATA__", type="application/json")
+    if script_tag:
+        data = json.loads(script_tag.string)
+        challenge_data = data["props"]["pageProps"]["challenge"]
+        data_blocks = challenge_data.get("dataBlocks", [])
+
+        for block in data_blocks:
+            block_title = block.get("title", "").strip()
+            block_text = block.get("text", "").strip()
+            if block_title in wanted_sections:
+                section_data[block_title] = block_text
+
+        detailed_entry.update({
+            "Theme": challenge_data.get("challengeTheme", {}).get("title", ""),
+            "Type": challenge_data.get("challengeType", {}).get("title", ""),
+            "Category": challenge_data.get("challengeCategory", {}).get("title", "")
+        })
+
+    meta_info = extract_meta_info(detail_soup)
+    detailed_entry["Difficulty"] = ", ".join(meta_info.get("Difficulty", []))
+    detailed_entry["Subjects"] = ", ".join(meta_info.get("Subjects", []))
+
+    html_sections = extract_html_sections(detail_soup)
+    for sec in wanted_sections:
+        if sec not in section_data and sec in html_sections:
+            section_data[sec] = html_sections[sec]
+
+    detailed_entry.update(section_data)
+    return detailed_entry
+
+def page_digest(html):
+    # Hash only the challenge object from __NEXT_DATA__, so build ids and other page noise don't count as changes
+    match = _NEXT_DATA_RE.search(html)
+    if match:
+        try:
+            return content_hash(json.loads(match.group(1))["props"]["pageProps"]["challenge"])
+        except (ValueError, KeyError, TypeError):
+            pass
+    return content_hash(html)
+
+def is_detail_ready(html):
+    # A detail page is usable once either the Next.js data blob or the rendered content is present
+    return 'id="__NEXT_DATA__"' in html or DETAIL_CONTENT[1:] in html
+
+
+# ---------- Fetching ----------
+def make_session(pool_size=SCRAPER_CONCURRENCY):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (compatible; SpaceAppsBriefTagger/1.0)"
+    return session
+
+
+class BrowserFetcher:
+    # Headless Edge, started only when a page can't be read over plain HTTP
+    def __init__(self, timeout=BROWSER_TIMEOUT):
+        self.timeout = timeout
+        self._driver = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        from selenium import webdriver
+        from selenium.webdriver.edge.options import Options
+        from selenium.webdriver.edge.service import Service
+
+        options = Options()
+        options.add_argument('--headless')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--log-level=3')
+        return webdriver.Edge(service=Service(executable_path=DRIVER_PATH), options=options)
+
+    def get(self, url, ready_selector):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        # One browser, one page at a time
+        with self._lock:
+            if self._driver is None:
+                self._driver = self._start()
+            self._driver.get(url)
+            WebDriverWait(self._driver, self.timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+            )
+            return self._driver.page_source
+
+    def close(self):
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+def fetch_html(session, url, timeout=REQUEST_TIMEOUT):
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def fetch_detail(session, browser, url, headers=None):
+    # Returns (html, etag, last_modified); html is None when the server answered 304 Not Modified
+    try:
+        response = session.get(url, headers=headers or {}, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return None, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        response.raise_for_status()
+        if is_detail_ready(response.text):
+            return response.text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except requests.RequestException:
+        pass
+    if browser is None:
+        raise RuntimeError(f"Page not readable over HTTP: {url}")
+    get_metrics().count("pages_browser")
+    return browser.get(url, f"{NEXT_DATA}, {DETAIL_CONTENT}"), None, None
+
+
+def _entry(record, changed):
+    # The record as returned to callers: Changed is relative to the last scrape, the hash identifies the contents
+    return dict(record, Changed=changed, **{CONTENT_HASH_COLUMN: content_hash(record)})
+
+
+def scrape_detail(session, browser, store, title, url, force=False):
+    # Only new or changed pages are parsed; everything else is served from the page store
+    stored = store.get(url) if store else None
+    headers = {}
+    if stored and not force:
+        if stored["etag"]:
+            headers["If-None-Match"] = stored["etag"]
+        if stored["last_modified"]:
+            headers["If-Modified-Since"] = stored["last_modified"]
+
+    metrics = get_metrics()
+    with metrics.timer("page_fetch"):
+        html, etag, last_modified = fetch_detail(session, browser, url, headers)
+    if html is None:
+        metrics.count("pages_not_modified")
+        if not stored:
+            raise RuntimeError(f"Got 304 for a page that was never stored: {url}")
+        store.touch(url, etag, last_modified)
+        return _entry(dict(stored["record"], Title=title), stored["record"].get("Title") != title)
+
+    digest = page_digest(html)
+    if stored and not force and stored["content_hash"] == digest and stored["record"].get("Title") == title:
+        store.touch(url, etag, last_modified)
+        metrics.count("pages_unchanged")
+        return _entry(stored["record"], False)
+
+    with metrics.timer("page_parse"):
+        record = parse_challenge_page(html, title, url)
+    metrics.count("pages_parsed")
+    changed = not stored or stored["content_hash"] != digest or stored["record"] != record
+    if store:
+        store.put(url, record, digest, etag, last_modified)
+    return _entry(record, changed)
+
+
+def scrape(url, max_workers=SCRAPER_CONCURRENCY, use_browser=True, incremental=True, force=False,
+           on_record=None):
+    # Returns (basic_info, detailed_info) lists of dicts, in the order challenges appear on the index page.
+    # Detailed entries carry a "Changed" flag relative to the previous run recorded in the page store and a
+    # "Content Hash" of the record, which rows analyzed from it keep.
+    # on_record(entry, done, total) is called from the calling thread as each challenge finishes (entry is None on error);
+    # an exception raised from it stops the scrape.
+    session = make_session(max_workers)
+    browser = BrowserFetcher() if use_browser else None
+    store = PageStore() if incremental else None
+    try:
+        links = None
+        try:
+            links = extract_challenge_links(fetch_html(session, url), url)
+        except requests.RequestException:
+            pass
+        if links is None:
+            if browser is None:
+                raise RuntimeError(f"Challenge list not found at {url}")
+            links = extract_challenge_links(browser.get(url, f".{INDEX_CONTAINER} a"), url) or []
+
+        logger.info("Found %d challenges", len(links))
+        basic_info = [{"Title": title, "URL": link} for title, link in links]
+        detailed_info = [None] * len(links)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        fetch = in_run(scrape_detail)
+        try:
+            futures = {
+                pool.submit(fetch, session, browser, store, title, link, force): i
+                for i, (title, link) in enumerate(links)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                title = links[i][0]
+                try:
+                    detailed_info[i] = future.result()
+                    state = "scraped" if detailed_info[i]["Changed"] else "unchanged"
+                    logger.info("%d. %s %s", i + 1, title, state)
+                except Exception as e:
+                    get_metrics().count("page_errors")
+                    logger.warning("Error on challenge %d: %s", i + 1, e)
+                if on_record:
+                    on_record(detailed_info[i], done, len(links))
+        except BaseException:
+            # e.g. on_record cancelling the scrape: pages not fetched yet are dropped instead of waited for
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+        return basic_info, [entry for entry in detailed_info if entry is not None]
+    finally:
+        session.close()
+        if browser is not None:
+            browser.close()
+        if store is not None:
+            store.close()
+
+
+def scrape_challenges(url, on_progress=None, export_excel=False, run_id=None, **kwargs):
+    # In-process entry point: returns (df_basic, df_detailed, excel_path); excel_path is None unless export_excel.
+    # With a run_id from the run store, each record is appended to that run's artifact as it arrives and the run
+    # is finished (compacted, old runs pruned) at the end.
+    metrics = get_metrics()
+    runs = get_run_store() if run_id else None
+
+    def report(entry, done, total):
+        if done == 1:
+            metrics.expect(total)
+        metrics.count("rows")
+        if runs is not None and entry is not None:
+            runs.append(run_id, "Challenge Details", [entry])
+        if on_progress:
+            on_progress(done, total, entry["Title"] if entry else None)
+
+    try:
+        basic_info, detailed_info = scrape(url, on_record=report, **kwargs)
+        df_basic = pd.DataFrame(basic_info)
+        df_detailed = pd.DataFrame(detailed_info)
+        path = save_excel(df_basic, df_detailed, name=run_id) if export_excel else None
+    except BaseException as e:
+        if runs is not None:
+            runs.finish(run_id, status="failed", error=str(e) or type(e).__name__)
+        raise
+    if runs is not None:
+        # Records were appended in completion order; the finished run keeps the index page's order
+        runs.complete(run_id, {"Basic Info": basic_info, "Challenge Details": detailed_info}, excel_path=path)
+    return df_basic, df_detailed, path
+
+
+def save_excel(df_basic, df_detailed, excel_dir=EXCEL_DIR, name=None):
+    # name (e.g. the run ID) keeps concurrent scrapes from writing the same file
+    os.makedirs(excel_dir, exist_ok=True)
+    name = name or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    full_path = os.path.join(excel_dir, f"nasa_challenges_{name}.xlsx")
+
+    with pd.ExcelWriter(full_path) as writer:
+        df_basic.to_excel(writer, sheet_name="Basic Info", index=False)
+        df_detailed.to_excel(writer, sheet_name="Challenge Details", index=False)
+    return full_path
@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Isolated: caches, shared state and the scraper's page store and runs go to a throwaway directory. Set before any LLM_AND_UI module is imported, since config reads
+# the environment at import time. Tests that call the model replace it; anything else gets the offline stub backend.
+_tmp = tempfile.mkdtemp(prefix="challenge-tests-")
+os.environ["LLM_BACKEND"] = "stub"
+os.environ["CACHE_DIR"] = _tmp
+os.environ["LLM_RPM"] = "0"
+os.environ["PAGE_STORE_PATH"] = os.path.join(_tmp, "page_store.sqlite3")
+os.environ["SCRAPER_RUNS_DIR"] = os.path.join(_tmp, "runs")
+os.environ["SHARED_STATE"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TITLE = re.compile(r"Title:\s*\n(.+)")
+_PACKED = re.compile(r"^### RECORD (\S+)\nTitle:\n(.+)$", re.MULTILINE)
+
+
+class FakeModel:
+    # Answers with the prompt's title and records every prompt and the peak number of concurrent calls.
+    # errors maps a title to exceptions raised by its next calls, in order. Packed prompts get one block per
+    # record, except for titles in skip_packed.
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.prompts = []
+        self.configs = []  # generation_config of each call
+        self.delay = None  # optional title -> seconds
+        self.errors = {}
+        self.skip_packed = set()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        title = _TITLE.search(prompt).group(1).strip()
+        with self._lock:
+            self.prompts.append(prompt)
+            self.configs.append(kwargs.get("generation_config"))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.errors.get(title):
+                raise self.errors[title].pop(0)
+            if self.delay:
+                time.sleep(self.delay(title))
+            return SimpleNamespace(text=self.reply(prompt, title))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def reply(self, prompt, title):
+        records = _PACKED.findall(prompt)
+        if not records:
+            return f"Challenge Title: {title}"
+        return "\n\n".join(
+            f"### RECORD {record_id}\nTitle: {title}\nSummary: About {title}\n### END {record_id}"
+            for record_id, title in records if title not in self.skip_packed
+        )
+
+
+@pytest.fixture
+def model(monkeypatch):
+    from LLM_AND_UI import llm
+
+    fake = FakeModel()
+    monkeypatch.setattr(llm, "get_model", lambda task="tag": fake)
+    return fake
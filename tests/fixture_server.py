@@ -0,0 +1,103 @@
+"""A local stand-in for the spaceappschallenge site: challenge index and detail pages served from memory."""
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def index_page(count):
+    # The challenge list, linking /challenges/c0 ... /challenges/c<count-1>
+    links = "".join(f'<a href="/challenges/c{i}"><h2>Challenge {i}</h2></a>' for i in range(count))
+    return f'<html><body><div class="challenge-index_results__z_Zp5">{links}</div></body></html>'
+
+
+def challenge_page(title, brief="Map wildfires from orbit.", background="Fires are spreading.", difficulty="Beginner",
+                   subjects=("Coding", "Earth Science")):
+    # Mirrors the detail page markup read by parse_challenge_page: the __NEXT_DATA__ blob, the meta tags and the
+    # rendered content
+    next_data = {"props": {"pageProps": {"challenge": {
+        "title": title,
+        "dataBlocks": [{"title": "Background", "text": background}],
+        "challengeTheme": {"title": "Earth"},
+        "challengeType": {"title": "Challenge"},
+        "challengeCategory": {"title": "Climate"},
+    }}}}
+    tags = lambda values: "".join(f'<span class="challenge-info_tag__G_QQv">{v}</span>' for v in values)
+    meta = (
+        f'<div class="challenge-info_meta__gZ65p"><p class="challenge-info_label__qTNb0">Difficulty</p>'
+        f'{tags([difficulty])}</div>'
+        f'<div class="challenge-info_meta__gZ65p"><p class="challenge-info_label__qTNb0">Subjects</p>'
+        f'{tags(subjects)}</div>'
+    )
+    content = f"<p>{brief}</p><h2>Background</h2><p>{background}</p><h2>Objectives</h2><ul><li>Detect</li><li>Map</li></ul>"
+    return (
+        f'<html><head><script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script></head>'
+        f'<body><h1>{title}</h1>{meta}<div class="challenge-details_content__218__">{content}</div></body></html>'
+    )
+
+
+def script_only_page():
+    # A detail page whose content only appears once JavaScript runs
+    return '<html><body><div id="__next"></div><script src="/app.js"></script></body></html>'
+
+
+def challenge_site(count):
+    # path -> html for an index of count challenges and their detail pages
+    pages = {"/challenges": index_page(count)}
+    pages.update({f"/challenges/c{i}": challenge_page(f"Challenge {i}") for i in range(count)})
+    return pages
+
+
+class FixtureServer:
+    # Serves pages (path -> html) from memory on a local port, optionally with a per-request delay. Each page has an
+    # ETag, and a conditional request for an unchanged page gets a 304. pages can be edited while the server runs;
+    # requests lists the (path, headers) of every request.
+    def __init__(self, pages, delay=0.0):
+        self.pages = dict(pages)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.rstrip("/")
+                server.requests.append((path, dict(self.headers)))
+                body = server.pages.get(path)
+                if delay:
+                    threading.Event().wait(delay)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = body.encode("utf-8") if isinstance(body, str) else body
+                etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.url = f"{self.base_url}/challenges"
+
+    def paths_requested(self):
+        return [path for path, _ in self.requests]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,72 @@
+import random
+
+import pandas as pd
+
+from LLM_AND_UI import analytics
+from LLM_AND_UI.analytics import Analytics, AnalyticsCache, canonical
+
+
+def dataset():
+    return pd.DataFrame({
+        "Title": ["A", "B", "C", "D"],
+        "Mentors": ["Remote Sensing, GIS", "remote sensing (e.g. Landsat); Data Science", "Data Science", None],
+        "Skills": ["Python, QGIS", "Python", "Python & R", "Unity"],
+    })
+
+
+def test_items_are_canonicalized_and_counted_once_per_challenge():
+    assert canonical("Remote  Sensing (e.g. Landsat)") == "remote sensing"
+    assert canonical("R&D") == canonical("R and D")
+    assert canonical("N/A") == ""
+    frequencies = Analytics(dataset()).frequencies("Mentors")
+    assert frequencies.to_dict("list") == {
+        "Mentors": ["Data Science", "Remote Sensing", "GIS"],
+        "Challenges": [2, 2, 1],
+        "Share": [0.5, 0.5, 0.25],
+    }
+
+
+def test_cooccurrence_counts_challenges_sharing_both_items():
+    pairs = Analytics(dataset()).cooccurrence("Mentors", "Skills")
+    assert pairs.loc["Remote Sensing", "Python"] == 2
+    assert pairs.loc["GIS", "QGIS"] == 1
+    assert pairs.loc["Data Science", "Unity"] == 0
+
+
+def naive_cover(sets, rows, target):
+    # Reference greedy: rescan every item each step, ties to the first item
+    covered, steps = set(), []
+    while len(covered) < target * rows:
+        best = max(range(len(sets)), key=lambda i: (len(sets[i] - covered), -i))
+        if not sets[best] - covered:
+            break
+        steps.append((best, len(sets[best] - covered)))
+        covered |= sets[best]
+    return steps
+
+
+def test_coverage_matches_a_naive_greedy_cover():
+    rng = random.Random(3)
+    items = [f"Mentor {i:02d}" for i in range(25)]
+    cells = [", ".join(rng.sample(items, rng.randint(0, 4))) for _ in range(300)]
+    result = Analytics(pd.DataFrame({"Mentors": cells})).coverage("Mentors", target=0.95)
+    labels = sorted(items)
+    sets = [{row for row, cell in enumerate(cells) if label in cell.split(", ")} for label in labels]
+    assert [(labels.index(m), n) for m, n in zip(result["Mentors"], result["New challenges"])] == \
+        naive_cover(sets, len(cells), 0.95)
+
+
+def test_results_are_memoized_per_dataset_version(monkeypatch):
+    cache = AnalyticsCache()
+    df = dataset()
+    first = cache.get(df, ("store", 1))
+    assert cache.get(df, ("store", 1)) is first
+    assert first.frequencies("Skills") is first.frequencies("Skills")
+
+    split = []
+    monkeypatch.setattr(analytics, "cell_items", lambda cell: split.append(cell) or ())
+    edited = df.copy()
+    edited.loc[3, "Skills"] = "Blender"
+    assert cache.get(edited, ("store", 2)) is not first
+    # Only the edited cell is split again
+    assert split == ["Blender"]
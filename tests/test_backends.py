@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from LLM_AND_UI import models, ratelimit
+from LLM_AND_UI.models import OpenAICompatModel, RecordingModel, ReplayModel, StubModel
+
+
+def test_recorded_replies_replay_without_the_model(tmp_path):
+    path = str(tmp_path / "replay.jsonl")
+    recorder = RecordingModel(StubModel("m"), path=path)
+    text = recorder.generate_content("Title:\nMars\n").text
+    replay = ReplayModel("m", path=path, latency=0.0, jitter=0.0, missing="error")
+    assert replay.generate_content("Title:\nMars\n").text == text
+    with pytest.raises(LookupError):
+        replay.generate_content("Title:\nVenus\n")
+
+
+def test_replay_errors_are_seeded_and_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(ratelimit, "LLM_BACKOFF_BASE", 0.001)
+
+    def errors(seed):
+        replay = ReplayModel("m", path=str(tmp_path / "none.jsonl"), latency=0.0, jitter=0.0, error_rate=0.5, seed=seed)
+        codes = []
+        for _ in range(20):
+            try:
+                replay.generate_content("Title:\nMars\n")
+            except models.SimulatedError as e:
+                codes.append(e.code)
+        return codes, replay
+
+    codes, replay = errors(seed=7)
+    assert codes == errors(seed=7)[0]
+    assert 0 < len(codes) < 20 and set(codes) <= {429, 503}
+    assert all(ratelimit.is_retryable(models.SimulatedError(code)) for code in (429, 503))
+    response, attempts = ratelimit.call_with_retry(lambda: replay.generate_content("Title:\nMars\n"), max_retries=10)
+    assert "Mars" in response.text and attempts >= 1
+
+
+class _ChatServer(ThreadingHTTPServer):
+    def __init__(self, status=200):
+        self.status = status
+        self.bodies = []
+        super().__init__(("127.0.0.1", 0), _ChatHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.bodies.append((self.path, self.headers.get("Authorization"), body))
+        reply = {"choices": [{"message": {"content": "Title: Mars"}}], "usage": {"prompt_tokens": 5, "completion_tokens": 2}}
+        payload = json.dumps(reply).encode()
+        self.send_response(self.server.status)
+        self.send_header("Retry-After", "3")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_openai_backend_maps_output_modes_and_keeps_http_errors():
+    server = _ChatServer()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        client = OpenAICompatModel("local-model", base_url=base_url, api_key="secret")
+        response = client.generate_content("Title:\nMars\n", generation_config={"response_mime_type": "application/json"})
+        assert response.text == "Title: Mars"
+        assert response.usage_metadata.prompt_token_count == 5
+        path, auth, body = server.bodies[0]
+        assert (path, auth, body["model"]) == ("/v1/chat/completions", "Bearer secret", "local-model")
+        assert body["response_format"] == {"type": "json_object"}
+        client.generate_content("x", generation_config={"response_schema": {"type": "object"}})
+        assert server.bodies[1][2]["response_format"]["type"] == "json_schema"
+
+        server.status = 429
+        with pytest.raises(Exception) as error:
+            client.generate_content("x")
+        assert ratelimit.error_status(error.value) == 429
+        assert ratelimit.retry_hint(error.value) == 3
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pipeline_benchmark_runs_every_stage(tmp_path):
+    # A tiny run of the stage benchmark; the environment (cache dir, page store) is the test one from conftest
+    output = tmp_path / "results.json"
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "bench_pipeline.py"), "--sizes", "5", "--no-memory",
+         "--formats", "csv", "jsonl", "--output", str(output)],
+        check=True, capture_output=True, timeout=120,
+    )
+    results = json.loads(output.read_text())["results"]
+    stages = {r["stage"] for r in results}
+    assert {"scrape", "parse_page", "analyze", "upsert_insert", "export_csv", "export_jsonl"} <= stages
+    assert all(r["rows"] == 5 for r in results if r["stage"] != "upsert_replace")
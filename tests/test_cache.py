@@ -0,0 +1,50 @@
+import time
+
+from LLM_AND_UI import llm
+from LLM_AND_UI.cache import ResponseCache, cache_key
+
+
+def test_cache_key_depends_on_prompt_and_model():
+    assert cache_key("prompt", "model-a") == cache_key("prompt", "model-a")
+    assert cache_key("prompt", "model-a") != cache_key("prompt", "model-b")
+    assert cache_key("prompt", "model-a") != cache_key("prompt ", "model-a")
+
+
+def test_hits_misses_and_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_entries=2, max_bytes=0, max_age_days=0)
+    assert cache.get("a") is None
+    cache.set("a", "m", "reply a")
+    cache.set("b", "m", "reply b")
+    time.sleep(0.01)
+    assert cache.get("a") == "reply a"  # b is now the least recently used
+    cache.set("c", "m", "reply c")
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") == "reply a" and cache.get("c") == "reply c"
+    assert cache.stats()["entries"] == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (3, 2)
+
+
+def test_byte_budget_and_max_age(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_entries=0, max_bytes=10, max_age_days=0)
+    cache.set("old", "m", "123456")
+    time.sleep(0.01)
+    cache.set("new", "m", "123456")
+    cache.evict()
+    assert cache.get("old") is None and cache.get("new") == "123456"
+
+    cache = ResponseCache(str(tmp_path / "aged.sqlite3"), max_age_days=1e-9)
+    cache.set("a", "m", "reply")
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+
+def test_repeated_analysis_is_served_from_the_cache(model):
+    rows = [{"Title": "Cached challenge", "Brief": "Map wildfires"}]
+    first, = llm.analyze_briefs(rows)
+    second, = llm.analyze_briefs(rows)
+    assert (first.text, first.status) == ("Challenge Title: Cached challenge", "ok")
+    assert (second.text, second.status) == ("Challenge Title: Cached challenge", "cached")
+    assert len(model.prompts) == 1
+    llm.analyze_briefs(rows, use_cache=False)
+    assert len(model.prompts) == 2
@@ -0,0 +1,54 @@
+import json
+
+import pandas as pd
+
+from LLM_AND_UI import cli, llm
+
+analyze_briefs = llm.analyze_briefs
+
+
+def interrupting(analyzed, stop_after):
+    # analyze_briefs that records the titles it analyzes and is interrupted (like Ctrl+C) after stop_after rows
+    def interrupted(rows, on_result=None, **kwargs):
+        def wrapped(j, result):
+            if stop_after is not None and len(analyzed) >= stop_after:
+                raise KeyboardInterrupt
+            analyzed.append(rows[j]["Title"])
+            on_result(j, result)
+
+        return analyze_briefs(rows, on_result=wrapped, **kwargs)
+
+    return interrupted
+
+
+def test_resume_after_two_interruptions_with_torn_lines(tmp_path, monkeypatch):
+    source = tmp_path / "briefs.csv"
+    output = tmp_path / "analyzed.csv"
+    pd.DataFrame({"Title": [f"Challenge {i}" for i in range(10)], "Brief": ["Map wildfires"] * 10}).to_csv(
+        source, index=False)
+    argv = [str(source), str(output), "--chunk-rows", "2", "--no-cache", "--concurrency", "1"]
+    progress = cli.progress_path(str(output))
+    analyzed = []
+
+    for stop_after in (3, 7):
+        monkeypatch.setattr(llm, "analyze_briefs", interrupting(analyzed, stop_after))
+        assert cli.main(argv) == 130
+        # The process was killed halfway through writing the next checkpoint
+        with open(progress, "a", encoding="utf-8") as f:
+            f.write('{"i": 9, "status": "o')
+
+    done, _ = cli.load_progress(progress, json.loads(open(progress).readline())["input"])
+    assert len(done) == 7
+
+    monkeypatch.setattr(llm, "analyze_briefs", interrupting(analyzed, None))
+    assert cli.main(argv) == 0
+    # Every row went to the model exactly once across the three runs
+    assert sorted(analyzed) == sorted(f"Challenge {i}" for i in range(10))
+    result = pd.read_csv(output)
+    assert result["Title"].tolist() == [f"Challenge {i}" for i in range(10)]
+
+
+def test_torn_header_starts_over(tmp_path):
+    progress = tmp_path / "out.csv.progress.jsonl"
+    progress.write_text('{"input": "ab')
+    assert cli.load_progress(str(progress), "abc") == ({}, 0)
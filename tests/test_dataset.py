@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from LLM_AND_UI.dataset import DatasetStore
+
+
+def test_upsert_inserts_and_replaces_by_normalized_title():
+    store = DatasetStore(pd.DataFrame({"Title": ["Ocean Heat", "Lunar Dust"], "Fields": ["Oceans", "Moon"]}))
+    rows = [{"Title": "ocean  heat", "Fields": "Climate"}, {"Title": "Mars Ice", "Fields": "Mars"}]
+    assert store.upsert(rows) == (1, 1)
+    frame = store.frame
+    assert frame["Title"].tolist() == ["ocean  heat", "Lunar Dust", "Mars Ice"]
+    assert frame["Fields"].tolist() == ["Climate", "Moon", "Mars"]
+    assert store.position("MARS ICE") == 2 and len(store) == 3
+
+
+def test_replacing_a_row_clears_missing_columns_and_adds_new_ones():
+    store = DatasetStore(pd.DataFrame({"Title": ["A"], "Skills": ["Python"], "Score": [3]}))
+    store.upsert({"Title": "A", "Notes": "new"})
+    row = store.frame.iloc[0]
+    assert pd.isna(row["Skills"]) and pd.isna(row["Score"]) and row["Notes"] == "new"
+
+
+def test_values_that_dont_fit_a_column_widen_it():
+    store = DatasetStore(pd.DataFrame({"Title": ["A", "B"], "Score": [1, 2]}))
+    store.upsert({"Title": "C", "Score": 2.5})
+    assert store.frame["Score"].tolist() == [1.0, 2.0, 2.5]
+    store.upsert({"Title": "D", "Score": "n/a"})
+    assert store.frame["Score"].tolist() == [1.0, 2.0, 2.5, "n/a"]
+
+
+def test_frame_after_insert_wraps_the_rows_without_copying():
+    store = DatasetStore(pd.DataFrame({"Title": [f"t{i}" for i in range(1000)]}))
+    for i in range(100):
+        store.upsert({"Title": f"new {i}"})
+        frame = store.frame
+    assert len(frame) == 1100 and frame["Title"].iloc[-1] == "new 99"
+    assert np.shares_memory(frame["Title"].to_numpy(), store._columns["Title"])
+    # Frames read earlier keep their rows as more are inserted
+    before = store.frame
+    store.upsert([{"Title": f"more {i}"} for i in range(5000)])
+    assert len(before) == 1100 and len(store.frame) == 6100
+
+
+def test_frames_read_earlier_are_not_changed_by_replacements():
+    store = DatasetStore(pd.DataFrame({"Title": ["A", "B"], "Score": [1, 2], "Notes": ["x", "y"]}))
+    before = store.frame
+    store.upsert({"Title": "A", "Score": 5, "Notes": "x"})
+    widened = store.frame
+    # A value that doesn't fit widens the column; the held frame keeps the whole old row
+    store.upsert({"Title": "B", "Score": "n/a", "Notes": "z"})
+    assert before.to_dict("list") == {"Title": ["A", "B"], "Score": [1, 2], "Notes": ["x", "y"]}
+    assert widened.to_dict("list") == {"Title": ["A", "B"], "Score": [5, 2], "Notes": ["x", "y"]}
+    assert store.frame.to_dict("list") == {"Title": ["A", "B"], "Score": [5, "n/a"], "Notes": ["x", "z"]}
+    # Unchanged columns are still shared rather than copied
+    assert np.shares_memory(before["Notes"].to_numpy(), widened["Notes"].to_numpy())
+
+
+def test_writes_to_a_frame_do_not_reach_the_store():
+    store = DatasetStore(pd.DataFrame({"Title": ["A"], "Score": [1.0]}))
+    frame = store.frame
+    frame.loc[0, "Score"] = 9.0
+    assert store.frame["Score"].tolist() == [1.0]
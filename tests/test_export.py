@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from LLM_AND_UI import export
+from LLM_AND_UI.export import FORMATS, ExportCache, export_bytes, write_export
+
+FRAME = pd.DataFrame({
+    "Title": [f"Challenge {i}" for i in range(7)],
+    "Fields": ["GIS, AI", None, "Web", "GIS", "AI", "UX", "Data"],
+    "Score": [1.5, np.nan, 3.0, 4.0, 5.0, 6.0, 7.0],
+})
+
+
+def read_back(data, fmt):
+    buffer = io.BytesIO(data)
+    if fmt == "xlsx":
+        return pd.read_excel(buffer)
+    if fmt == "csv":
+        return pd.read_csv(buffer)
+    if fmt == "jsonl":
+        return pd.read_json(buffer, lines=True)
+    return pd.read_parquet(buffer)
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_chunked_export_round_trips(fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    out = io.BytesIO()
+    # Chunks are written one at a time, with the header only once
+    write_export((FRAME.iloc[i:i + 3] for i in range(0, len(FRAME), 3)), out, fmt, sheet_name="Scraped")
+    back = read_back(out.getvalue(), fmt)
+    assert back["Title"].tolist() == FRAME["Title"].tolist()
+    assert back["Fields"].isna().tolist() == FRAME["Fields"].isna().tolist()
+    assert back["Score"].tolist()[2:] == FRAME["Score"].tolist()[2:]
+
+
+def test_export_to_a_path_and_unknown_formats(tmp_path):
+    write_export(FRAME, str(tmp_path / "out.csv"), "csv")
+    assert pd.read_csv(tmp_path / "out.csv")["Title"].tolist() == FRAME["Title"].tolist()
+    with pytest.raises(ValueError, match="Unsupported"):
+        write_export(FRAME, io.BytesIO(), "pdf")
+
+
+def test_export_bytes_is_built_once_per_dataset_version(monkeypatch):
+    monkeypatch.setattr(export, "_cache", ExportCache())
+    built = []
+    write = export.write_export
+    monkeypatch.setattr(export, "write_export", lambda *args, **kwargs: built.append(1) or write(*args, **kwargs))
+
+    first = export_bytes(FRAME, "csv", version=("scrape", 1))
+    assert export_bytes(FRAME, "csv", version=("scrape", 1)) is first
+    export_bytes(FRAME, "jsonl", version=("scrape", 1))
+    export_bytes(FRAME, "csv", version=("scrape", 2))
+    export_bytes(FRAME, "csv")
+    assert len(built) == 4
+
+
+def test_export_cache_is_bounded_by_bytes():
+    cache = ExportCache(max_bytes=10)
+    cache.get_or_build("a", lambda: b"x" * 4)
+    cache.get_or_build("b", lambda: b"x" * 4)
+    cache.get_or_build("a", lambda: b"rebuilt")
+    cache.get_or_build("c", lambda: b"x" * 4)
+    # "b" was least recently used
+    assert list(cache._items) == ["a", "c"] and cache._bytes == 8
+    # A single file over the budget is still kept, as the only entry
+    cache.get_or_build("d", lambda: b"x" * 20)
+    assert list(cache._items) == ["d"] and cache._bytes == 20
+
+
+def test_cli_converts_between_formats(tmp_path, capsys):
+    FRAME.to_csv(tmp_path / "in.csv", index=False)
+    export.main([str(tmp_path / "in.csv"), str(tmp_path / "out.jsonl")])
+    assert pd.read_json(tmp_path / "out.jsonl", lines=True)["Title"].tolist() == FRAME["Title"].tolist()
+    assert "Wrote 7 rows" in capsys.readouterr().out
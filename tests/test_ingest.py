@@ -0,0 +1,67 @@
+import io
+
+import pandas as pd
+import pytest
+
+from LLM_AND_UI import ingest
+from LLM_AND_UI.ingest import TableCache, list_sheets, read_table
+
+FRAME = pd.DataFrame({" Title ": ["Ocean Heat", "Lunar Dust"], "Brief": ["Track heatwaves", "Model regolith"],
+                      "Notes": ["internal", "internal"]})
+COLUMNS = ["Title", "Brief"]
+
+
+def encoded(suffix, frame=FRAME):
+    buffer = io.BytesIO()
+    if suffix == ".xlsx":
+        with pd.ExcelWriter(buffer) as writer:
+            frame.to_excel(writer, sheet_name="Briefs", index=False)
+            frame.head(1).to_excel(writer, sheet_name="Extra", index=False)
+    elif suffix == ".csv":
+        frame.to_csv(buffer, index=False)
+    elif suffix == ".parquet":
+        frame.to_parquet(buffer, index=False)
+    else:
+        frame.to_json(buffer, orient="records", lines=True)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("suffix", [".xlsx", ".csv", ".parquet", ".jsonl"])
+def test_read_table_reads_only_the_wanted_columns(suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    df = read_table(encoded(suffix), f"briefs{suffix}", columns=COLUMNS)
+    assert list(df.columns) == COLUMNS
+    assert df["Title"].tolist() == ["Ocean Heat", "Lunar Dust"]
+    assert list(read_table(encoded(suffix), f"briefs{suffix}").columns) == ["Title", "Brief", "Notes"]
+
+
+def test_each_sheet_is_parsed_once(monkeypatch):
+    data = encoded(".xlsx", FRAME.assign(Brief=["Parsed once", "Parsed once"]))
+    calls = []
+    read_excel = pd.read_excel
+    monkeypatch.setattr(ingest.pd, "read_excel", lambda *args, **kwargs: calls.append(1) or read_excel(*args, **kwargs))
+
+    assert list_sheets(data, "briefs.xlsx") == ["Briefs", "Extra"]
+    first = read_table(data, "briefs.xlsx", sheet="Briefs", columns=COLUMNS)
+    assert read_table(data, "briefs.xlsx", sheet="Briefs", columns=COLUMNS) is first
+    assert len(read_table(data, "briefs.xlsx", sheet="Extra", columns=COLUMNS)) == 1
+    assert len(calls) == 2
+    assert list_sheets(b"a,b\n", "briefs.csv") == ["briefs.csv"]
+
+
+def test_unsupported_files_are_rejected():
+    with pytest.raises(ValueError, match="Unsupported"):
+        read_table(b"", "briefs.docx")
+
+
+def test_table_cache_evicts_least_recently_used_beyond_its_byte_budget():
+    frames = {name: pd.DataFrame({"x": range(1000)}) for name in "abc"}
+    size = int(frames["a"].memory_usage(deep=True).sum())
+    cache = TableCache(max_bytes=2 * size)
+    cache.put("a", frames["a"])
+    cache.put("b", frames["b"])
+    assert cache.get("a") is frames["a"]
+    cache.put("c", frames["c"])
+    assert cache.get("b") is None
+    assert cache.get("a") is frames["a"] and cache.get("c") is frames["c"]
@@ -0,0 +1,120 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from LLM_AND_UI import jobs
+from LLM_AND_UI.jobs import JobRunner, JobStore
+from scraping_challenges_info.scraper import scrape
+from tests.fixture_server import FixtureServer, challenge_site
+
+
+def wait_for(predicate, timeout=20):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    # Titles sent to the model, across every runner in the test
+    titles = []
+    lock = threading.Lock()
+    analyze_briefs = jobs.analyze_briefs
+
+    def counting(rows, **kwargs):
+        with lock:
+            titles.extend(row["Title"] for row in rows)
+        time.sleep(0.2)
+        return analyze_briefs(rows, **kwargs)
+
+    monkeypatch.setattr(jobs, "analyze_briefs", counting)
+    return titles
+
+
+def test_two_processes_resume_an_interrupted_job_once(tmp_path, analyzed):
+    path = str(tmp_path / "jobs.sqlite3")
+    rows = [{"Title": f"Challenge {i}", "Brief": "Map wildfires"} for i in range(6)]
+    job_id, _ = JobStore(path).create("analyze", {"rows": rows, "use_cache": False})
+    # Left running by a process that crashed: its lease is long expired
+    JobStore(path).update(job_id, status="running", owner="crashed", lease_until=time.time() - 1)
+
+    first = JobRunner(JobStore(path), lease_ttl=5)
+    second = JobRunner(JobStore(path), lease_ttl=5)
+    wait_for(lambda: first.get(job_id)["status"] == "done")
+    time.sleep(0.3)
+    assert sorted(analyzed) == sorted(row["Title"] for row in rows)
+    assert first.get(job_id)["owner"] in (first.owner, second.owner)
+
+
+def test_a_live_lease_is_not_taken_over(tmp_path, analyzed):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job_id, _ = store.create("analyze", {"rows": [{"Title": "A"}], "use_cache": False})
+    assert store.claim(job_id, "elsewhere", ttl=60)
+    runner = JobRunner(JobStore(path), lease_ttl=60)
+    runner._enqueue(job_id)
+    time.sleep(0.3)
+    assert analyzed == [] and runner.get(job_id)["owner"] == "elsewhere"
+    assert not store.claim(job_id, runner.owner)
+
+
+def test_create_commits_nothing_when_it_fails(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id, _ = store.create("analyze", {"rows": []})
+    # The next job gets the same ID, so its INSERT fails after the duplicate check
+    monkeypatch.setattr(jobs.uuid, "uuid4", lambda: type("UUID", (), {"hex": job_id + "0" * 20})())
+    with pytest.raises(sqlite3.IntegrityError):
+        store.create("scrape", {"url": "http://example.com"})
+    assert not store._conn.in_transaction
+    assert [job["id"] for job in store.recent()] == [job_id]
+    monkeypatch.undo()
+    assert store.create("scrape", {"url": "http://example.com"})[1]
+
+
+def test_cancelled_scrape_stops_without_fetching_the_remaining_pages():
+    class Cancelled(Exception):
+        pass
+
+    def cancel(entry, done, total):
+        raise Cancelled()
+
+    with FixtureServer(challenge_site(40), delay=0.1) as server:
+        started = time.perf_counter()
+        with pytest.raises(Cancelled):
+            scrape(server.url, max_workers=2, use_browser=False, incremental=False, on_record=cancel)
+        elapsed = time.perf_counter() - started
+    # All 40 pages would take ~2 s with 2 workers
+    assert elapsed < 1.0
+
+
+def test_cancel_reaches_a_job_another_process_is_running(tmp_path, model):
+    model.delay = lambda title: 0.05
+    path = str(tmp_path / "jobs.sqlite3")
+    running = JobRunner(JobStore(path), workers=1, lease_ttl=60)
+    rows = [{"Title": f"Challenge {i}", "Brief": "Map wildfires"} for i in range(200)]
+    job_id = running.submit_analyze(rows, use_cache=False)
+    wait_for(lambda: running.get(job_id)["done"] > 0)
+
+    # A session served by another process cancels it
+    JobRunner(JobStore(path), workers=1, lease_ttl=60).cancel(job_id)
+    wait_for(lambda: running.get(job_id)["status"] == "cancelled")
+    assert running.get(job_id)["done"] < len(rows)
+    # An identical job submitted afterwards starts afresh instead of joining the cancelled one
+    again = running.submit_analyze(rows, use_cache=False)
+    assert again != job_id
+    running.cancel(again)
+    wait_for(lambda: running.get(again)["status"] == "cancelled")
+
+
+def test_cancelling_a_queued_job_skips_it(tmp_path, analyzed):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id, _ = store.create("analyze", {"rows": [{"Title": "A"}], "use_cache": False})
+    store.request_cancel(job_id)
+    assert store.get(job_id)["status"] == "cancelled"
+    runner = JobRunner(store, lease_ttl=60)
+    runner._enqueue(job_id)
+    time.sleep(0.3)
+    assert analyzed == [] and runner.get(job_id)["status"] == "cancelled"
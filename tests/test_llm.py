@@ -0,0 +1,23 @@
+import pandas as pd
+
+from LLM_AND_UI import llm
+
+
+def test_analyze_briefs_keeps_input_order_and_bounds_concurrency(model):
+    # Earlier rows take longer, so calls finish out of order
+    model.delay = lambda title: 0.05 / (1 + int(title.split()[-1]))
+    rows = pd.DataFrame({"Title": [f"Challenge {i}" for i in range(10)], "Brief": ["Map wildfires"] * 10})
+    progress = []
+    outputs = llm.analyze_briefs(rows, max_concurrency=3, use_cache=False,
+                                 on_progress=lambda done, total: progress.append((done, total)))
+    assert [result.text for result in outputs] == [f"Challenge Title: Challenge {i}" for i in range(10)]
+    assert {result.status for result in outputs} == {"ok"}
+    assert 1 < model.peak <= 3
+    assert progress == [(done, 10) for done in range(1, 11)]
+
+
+def test_analyze_briefs_skips_rows_without_a_title(model):
+    assert llm.analyze_briefs([{"Title": " ", "Brief": "Map wildfires"}]) == [
+        llm.AnalysisResult("Missing mandatory Title field", "skipped")]
+    assert llm.analyze_briefs([]) == []
+    assert not model.prompts
@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from LLM_AND_UI.merge import match_titles, merge_datasets
+
+
+@pytest.mark.parametrize("old, new", [
+    ("Ocean Heat", "Ocean Heat!"),
+    ("Lunar Dust", "Lunar Dusts"),
+    ("Sea Level Rise", "Sea-Level Rise"),
+    ("Space Weather & Aurora", "space weather and auroras."),
+    ("Detecting Wildfires from Space", "Detecting Wildfire From Space Data"),
+])
+def test_near_duplicate_titles_match_at_the_default_threshold(old, new):
+    assert match_titles(["Mars Rover", old], [new]) == {0: 1}
+
+
+@pytest.mark.parametrize("old, new", [
+    ("Lunar Dust", "Lunar Dusk"),
+    ("Mars Rover", "Mars Rovers Navigation"),
+    ("Exoplanet Hunters", "Exoplanet Hunter Toolkit"),
+    ("Mars Ice", "Mar Ice"),
+    ("Data Analysis", "Data Analysi"),
+    ("Class Project", "Clas Project"),
+    ("Campus Map", "Campu Map"),
+])
+def test_different_titles_do_not_match(old, new):
+    assert match_titles([old], [new]) == {}
+
+
+def test_punctuation_only_title_changes_merge_without_the_model():
+    old = pd.DataFrame([{"Title": "Ocean Heat", "Summary": "Track marine heatwaves"},
+                        {"Title": "Lunar Dust", "Summary": "Model regolith"}])
+    new = pd.DataFrame([{"Title": "Ocean Heat!", "Summary": "Track marine heatwaves"},
+                        {"Title": "Lunar Dusts", "Summary": "Model regolith", "Category": "Moon"}])
+    merged, counts = merge_datasets(old, new)
+    assert merged["Title"].tolist() == ["Ocean Heat", "Lunar Dust"]
+    assert merged.loc[1, "Category"] == "Moon"
+    assert counts["identical"] == 1 and counts["filled"] == 1 and counts["added"] == 0 and counts["llm"] == 0
@@ -0,0 +1,46 @@
+import threading
+
+from LLM_AND_UI import llm
+from LLM_AND_UI.metrics import get_metrics, in_run, start_run
+
+
+def analyze_in_own_run(label, n, barrier, runs):
+    # One session or job: starts its run, then analyzes n rows on the worker pool
+    runs[label] = start_run(label)
+    barrier.wait()
+    rows = [{"Title": f"{label} {i}", "Brief": "Map wildfires"} for i in range(n)]
+    llm.analyze_briefs(rows, use_cache=False, max_concurrency=3, pack_tokens=0)
+
+
+def test_concurrent_runs_keep_their_own_counters():
+    barrier = threading.Barrier(2)
+    runs = {}
+    threads = [threading.Thread(target=analyze_in_own_run, args=(label, n, barrier, runs))
+               for label, n in (("first", 4), ("second", 9))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    # Model calls happen on worker threads, yet each lands in the run that submitted them
+    assert runs["first"].counters["rows"] == runs["first"].counters["model_calls"] == 4
+    assert runs["second"].counters["rows"] == runs["second"].counters["model_calls"] == 9
+    assert runs["first"].calls["model_call"] == 4
+    assert runs["second"].calls["model_call"] == 9
+
+
+def test_in_run_restores_the_worker_threads_run():
+    outer = start_run("outer")
+    inner = in_run(lambda: start_run("inner"))()
+    assert get_metrics() is outer  # starting a run inside in_run doesn't leak out of it
+
+    def work():
+        get_metrics().count("work")
+        return get_metrics()
+
+    seen = []
+    worker = threading.Thread(target=lambda: seen.extend([in_run(work, inner)(), get_metrics()]))
+    worker.start()
+    worker.join()
+    assert seen[0] is inner and seen[1] is not inner
+    assert inner.counters["work"] == 1 and outer.counters["work"] == 0
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from LLM_AND_UI import llm, models
+from LLM_AND_UI.parser import parse_output
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # A fresh client registry per test, with distinct models per task
+    monkeypatch.setattr(models, "_models", {})
+    monkeypatch.setattr(models, "BACKENDS", dict(models.BACKENDS))
+    monkeypatch.setattr(models, "TASK_MODELS", {"tag": "tag-model", "merge": "merge-model"})
+    return models
+
+
+def test_clients_are_built_once_per_model_on_first_use(registry, monkeypatch):
+    built = []
+    monkeypatch.setitem(registry.BACKENDS, "stub", lambda name: built.append(name) or models.StubModel(name))
+    assert not built
+    tag = registry.get_model("tag")
+    assert registry.get_model("tag") is tag
+    assert registry.get_model("merge").model_name == "stub:merge-model"
+    assert registry.get_model("unknown-task") is tag
+    assert built == ["tag-model", "merge-model"]
+
+
+def test_registered_backends_are_selected_by_llm_backend(registry, monkeypatch):
+    assert {"gemini", "stub", "record", "replay", "openai"} <= set(registry.BACKENDS)
+    registry.register_backend("custom", lambda name: models.StubModel(f"custom-{name}"))
+    monkeypatch.setattr(models, "LLM_BACKEND", "custom")
+    assert registry.get_model("merge").model_name == "stub:custom-merge-model"
+
+
+def test_set_model_overrides_one_task(registry):
+    client = object()
+    registry.set_model(client, task="merge")
+    assert registry.get_model("merge") is client
+    assert registry.get_model("tag") is not client
+
+
+def test_unknown_backend_and_missing_key_fail_the_row(registry, monkeypatch):
+    monkeypatch.setattr(models, "LLM_BACKEND", "nope")
+    with pytest.raises(ValueError, match="Unknown LLM_BACKEND"):
+        registry.get_model()
+    monkeypatch.setattr(models, "LLM_BACKEND", "gemini")
+    monkeypatch.setattr(models, "GEMINI_API_KEY", None)
+    result = llm.analyze_brief_with_status({"Title": "Mars", "Brief": "Map craters"}, use_cache=False)
+    assert result.status == "failed"
+    assert "GEMINI_API_KEY" in result.text
+
+
+def test_stub_replies_parse_like_model_output(registry):
+    stub = registry.get_model()
+    text = stub.generate_content("Title:\nMars rover\n\nBrief:\nMap craters").text
+    assert parse_output(text)["Title"] == "Mars rover"
+    record = json.loads(stub.generate_content("Title:\nMars\n", generation_config=llm.JSON_GENERATION_CONFIG).text)
+    assert record["title"] == "Mars"
+    merged = stub.generate_content('Old:\n{"a": 1}\nNew:\n{"a": 2}', {"response_mime_type": "application/json"})
+    assert json.loads(merged.text) == {"a": 2}
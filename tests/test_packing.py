@@ -0,0 +1,43 @@
+from LLM_AND_UI import llm
+from LLM_AND_UI.parser import parse_packed_output
+from LLM_AND_UI.prompt import build_content, build_packed_prompt
+
+ROWS = [{"Title": f"Challenge {i}", "Brief": "Map wildfires from orbit. " * 20} for i in range(7)]
+
+
+def test_plan_packs_fits_the_budget_and_pack_size():
+    header = llm.estimate_tokens(build_packed_prompt([]))
+    row_cost = llm.estimate_tokens(build_content(ROWS[0])) + llm.PACK_OUTPUT_TOKENS
+    rows = ROWS[:3] + [{"Title": "", "Brief": "no title"}] + ROWS[3:]
+
+    packs = llm.plan_packs(rows, header + 2 * row_cost, max_size=10)
+    assert [[i for i, _ in pack] for pack in packs] == [[0, 1], [2, 4], [5, 6], [7]]
+    packs = llm.plan_packs(rows, 10**6, max_size=3)
+    assert [len(pack) for pack in packs] == [3, 3, 1]
+
+
+def test_packed_output_round_trip_drops_malformed_records():
+    reply = """### RECORD C1
+Title: Ocean Heat
+Summary: Track marine heatwaves
+### END C1
+### RECORD C2
+Title: Missing summary
+### END C2
+### RECORD C3
+Title: Cut off"""
+    assert parse_packed_output(reply) == {"C1": "Title: Ocean Heat\nSummary: Track marine heatwaves"}
+    assert parse_packed_output(None) == {}
+
+
+def test_packed_analysis_uses_fewer_calls_and_falls_back_per_row(model):
+    model.skip_packed = {"Challenge 2"}
+    results = llm.analyze_briefs(ROWS, use_cache=False, pack_tokens=10**6)
+    packed_calls = [p for p in model.prompts if "### RECORD C0" in p]
+    assert len(packed_calls) == 1
+    # One packed call for all rows, one single-row call for the record missing from its reply
+    assert len(model.prompts) == 2
+    assert (results[0].text, results[0].status) == ("Title: Challenge 0\nSummary: About Challenge 0", "ok")
+    assert (results[2].text, results[2].status) == ("Challenge Title: Challenge 2", "ok")
+    assert [r.text.splitlines()[0] for i, r in enumerate(results) if i != 2] == [
+        f"Title: Challenge {i}" for i in range(7) if i != 2]
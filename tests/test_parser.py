@@ -0,0 +1,53 @@
+import json
+
+from LLM_AND_UI import llm
+from LLM_AND_UI.parser import ChallengeRecord, parse_output, parse_record, split_list
+
+
+def test_json_reply_becomes_a_typed_record():
+    reply = json.dumps({"Title": "Ocean Heat", "summary": "Track marine heatwaves", "fields": ["GIS", "Data Science"],
+                        "skills": "Python (NumPy, Pandas); SQL", "workshops": [], "mentors": ["Oceanographer"],
+                        "category": "Oceans", "difficulty": "Advanced"})
+    record = parse_record(f"```json\n{reply}\n```")
+    assert record == ChallengeRecord(
+        title="Ocean Heat", summary="Track marine heatwaves", fields=("GIS", "Data Science"),
+        skills=("Python (NumPy, Pandas)", "SQL"), mentors=("Oceanographer",), category="Oceans",
+        unparsed='{"difficulty": "Advanced"}',
+    )
+
+
+def test_text_reply_only_splits_on_known_labels():
+    reply = """Here is the analysis.
+**Title:** Ocean Heat
+Summary: Track marine heatwaves.
+Note: uses sea surface temperature.
+Fields:
+- GIS / Remote Sensing
+- Data Science
+Skills: Python (NumPy, Pandas), QGIS
+Title: Ocean Heat again
+Category: Oceans"""
+    record = parse_record(reply)
+    assert record.title == "Ocean Heat"
+    assert record.summary == "Track marine heatwaves.\nNote: uses sea surface temperature."
+    assert record.fields == ("GIS / Remote Sensing", "Data Science")
+    assert record.skills == ("Python (NumPy, Pandas)", "QGIS")
+    assert record.category == "Oceans"
+    assert record.unparsed == "Here is the analysis.\nTitle: Ocean Heat again"
+
+
+def test_malformed_json_falls_back_to_the_text_parser():
+    assert parse_record('{"title": "Ocean Heat",\nTitle: Ocean Heat').title == "Ocean Heat"
+
+
+def test_parse_output_columns():
+    row = parse_output('{"title": "Ocean Heat", "fields": ["GIS", "AI"]}')
+    assert list(row.index) == ["Title", "Summary", "Fields", "Skills", "Workshops", "Mentors", "Category"]
+    assert row["Fields"] == "GIS, AI"
+    assert split_list("1. GIS\n2) AI\n• UX") == ("GIS", "AI", "UX")
+
+
+def test_single_row_calls_ask_for_schema_constrained_json(model):
+    llm.analyze_briefs([{"Title": "Ocean Heat", "Brief": "Track marine heatwaves"}], use_cache=False)
+    assert model.configs == [llm.JSON_GENERATION_CONFIG]
+    assert '"title": string' in model.prompts[0]
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from LLM_AND_UI.pipeline import scrape_and_analyze
+from tests.fixture_server import FixtureServer, challenge_site
+
+
+def run_with_timeout(fn, timeout=30):
+    # Runs fn on a thread so a hung pipeline fails the test instead of blocking the suite
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "scrape_and_analyze hung"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def test_scrape_and_analyze_returns_every_record():
+    with FixtureServer(challenge_site(12)) as server:
+        basic, detailed, analyzed = run_with_timeout(lambda: scrape_and_analyze(
+            server.url, max_concurrency=3, use_cache=False, use_browser=False, incremental=False))
+    assert len(basic) == len(detailed) == len(analyzed) == 12
+    assert [record["URL"] for record, _ in analyzed] == detailed["URL"].tolist()
+    assert all(row["Status"] == "ok" for _, row in analyzed)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_consumer_error_reaches_the_caller(workers):
+    def should_analyze(record):
+        if record["Title"].endswith(" 4"):
+            raise ValueError("bad record")
+        return True
+
+    with FixtureServer(challenge_site(30)) as server:
+        with pytest.raises(ValueError, match="bad record"):
+            run_with_timeout(lambda: scrape_and_analyze(
+                server.url, max_concurrency=workers, queue_size=1, use_cache=False, should_analyze=should_analyze,
+                use_browser=False, incremental=False))
+
+
+def test_on_result_error_stops_the_scrape():
+    def on_result(record, row, done):
+        raise KeyError("caller failed")
+
+    # Slow pages, so most of them are still queued when the first result comes back
+    with FixtureServer(challenge_site(40), delay=0.05) as server:
+        with pytest.raises(KeyError, match="caller failed"):
+            run_with_timeout(lambda: scrape_and_analyze(
+                server.url, max_concurrency=2, use_cache=False, on_result=on_result, use_browser=False,
+                incremental=False, max_workers=2))
+        time.sleep(0.1)  # let a page a pool thread had just picked up arrive
+        requested = len(server.requests)
+        time.sleep(0.3)
+        assert len(server.requests) == requested < 41
+
+
+def test_records_stream_into_the_scrape_run(monkeypatch, tmp_path):
+    from LLM_AND_UI.utils import finish_scrape_run
+    from scraping_challenges_info import run_store
+
+    store = run_store.RunStore(root=str(tmp_path), keep=0, max_mb=0)
+    monkeypatch.setattr(run_store, "get_run_store", lambda: store)
+    run_id = store.start("fixture")
+    seen = []
+
+    def on_result(record, row, done):
+        # Each record is in the run before its analysis comes back
+        seen.append(len(store.load(run_id)["Challenge Details"]) >= done)
+
+    with FixtureServer(challenge_site(6)) as server:
+        basic, detailed, _ = run_with_timeout(lambda: scrape_and_analyze(
+            server.url, max_concurrency=2, use_cache=False, on_result=on_result, run_id=run_id, use_browser=False,
+            incremental=False))
+    assert seen == [True] * 6 and store.get(run_id)["status"] == "running"
+    finish_scrape_run(run_id, basic, detailed)
+    assert store.get(run_id)["status"] == "done"
+    assert store.load(run_id)["Challenge Details"]["Title"].tolist() == detailed["Title"].tolist()
+
+    failed = store.start("fixture")
+    with FixtureServer(challenge_site(6)) as server:
+        with pytest.raises(KeyError):
+            run_with_timeout(lambda: scrape_and_analyze(
+                server.url, use_cache=False, on_result=lambda *args: {}["stop"], run_id=failed, use_browser=False,
+                incremental=False))
+    assert store.get(failed)["status"] == "failed"
@@ -0,0 +1,64 @@
+from LLM_AND_UI import metrics
+from LLM_AND_UI.config import PROMPT_TOKEN_BUDGET
+from LLM_AND_UI.prompt import TRIM_MARKER, _summarize, build_content, fit_sections
+from LLM_AND_UI.ratelimit import estimate_tokens
+
+FILLER = "Unrelated filler words repeated here for length. "
+
+
+def challenge(background_sentences=60):
+    return {
+        "Title": "Wildfire smoke mapping",
+        "Brief": "Map wildfire smoke plumes from satellite imagery.",
+        "Objectives": "Detect plumes. Estimate their extent.",
+        "Background": "Smoke is a hazard. " + FILLER * background_sentences + "Wildfire smoke plumes travel far.",
+    }
+
+
+def test_sections_under_budget_are_unchanged():
+    row = challenge(background_sentences=2)
+    assert build_content(row, budget=0) == build_content(row, budget=10_000)
+    assert fit_sections({"Title": "T", "Brief": "B"}, budget=100) == ({"Title": "T", "Brief": "B"}, 0)
+
+
+def test_lowest_priority_section_is_trimmed_to_relevant_sentences():
+    row = challenge()
+    sections = dict(row)
+    total = sum(estimate_tokens(value) for value in sections.values())
+    fitted, saved = fit_sections(sections, budget=total // 2)
+    assert saved > 0
+    assert fitted["Title"] == row["Title"] and fitted["Brief"] == row["Brief"] and fitted["Objectives"] == row["Objectives"]
+    background = fitted["Background"]
+    assert background.endswith(TRIM_MARKER)
+    assert background.startswith("Smoke is a hazard.")
+    # The sentence sharing words with the title/brief outranks the filler
+    assert "Wildfire smoke plumes travel far." in background
+    assert estimate_tokens(background) < estimate_tokens(row["Background"])
+
+
+def test_trimmed_prompts_are_counted_in_the_run_metrics():
+    run = metrics.start_run("prompt test")
+    build_content(challenge(background_sentences=2), budget=200)
+    assert run.counters["prompts_trimmed"] == 0
+    build_content(challenge(), budget=200)
+    assert run.counters["prompts_trimmed"] >= 1
+    assert run.counters["prompt_tokens_saved"] > 0
+
+
+def test_first_sentence_is_kept_even_when_it_alone_is_over_budget():
+    keywords = {"smoke"}
+    long_first = "Smoke " + "drifts far across the whole continent " * 20 + "."
+    text = f"{long_first} Smoke plumes matter. Short."
+    summary = _summarize(text, 40, keywords)
+    assert summary.startswith("Smoke drifts far") and summary.endswith(TRIM_MARKER)
+    assert "Smoke plumes matter." not in summary
+    assert estimate_tokens(summary) <= 40
+    # With room to spare, the first sentence stays ahead of the best-matching one
+    assert _summarize("Intro. Filler here. Smoke plumes matter.", 12, keywords) == "Intro. Smoke plumes matter." + TRIM_MARKER
+
+
+def test_trimming_is_off_by_default():
+    assert PROMPT_TOKEN_BUDGET == 0
+    row = challenge(background_sentences=2000)
+    assert build_content(row) == build_content(row, budget=0)
+    assert TRIM_MARKER not in build_content(row)
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pytest
+
+from LLM_AND_UI import llm, ratelimit
+from LLM_AND_UI.ratelimit import RateLimiter, TokenBucket, call_with_retry, is_retryable, retry_hint
+
+
+class ApiError(Exception):
+    def __init__(self, message="", code=None, headers=None):
+        super().__init__(message)
+        self.code = code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+GEMINI_429 = """429 You exceeded your current quota, please check your plan and billing details. [violations {
+  quota_metric: "generativelanguage.googleapis.com/generate_content_free_tier_requests"
+  quota_id: "GenerateRequestsPerMinutePerProjectPerModel-FreeTier"
+}
+, links {
+  description: "Learn more about Gemini API quotas"
+  url: "https://ai.google.dev/gemini-api/docs/rate-limits"
+}
+, retry_delay {
+  seconds: 26
+}
+]"""
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(ratelimit, "LLM_BACKOFF_BASE", 0.001)
+
+
+def test_token_bucket_waits_for_the_refill():
+    bucket = TokenBucket(60)  # one per second
+    bucket.take(60)
+    assert bucket.wait_time(1, bucket.updated) == pytest.approx(1.0)
+    # A request larger than the bucket only waits for a full bucket
+    assert bucket.wait_time(600, bucket.updated) == pytest.approx(60.0)
+    assert bucket.wait_time(1, bucket.updated + 2) == 0.0
+
+
+def test_limiter_backs_off_on_throttling_and_recovers():
+    limiter = RateLimiter(rpm=60, tpm=0)
+    limiter.on_throttle()
+    assert limiter.current_rpm == pytest.approx(42)
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.current_rpm == pytest.approx(60)
+    limiter.on_throttle(retry_after=30)
+    assert limiter.paused_until > 0
+
+
+@pytest.mark.parametrize("exc, retryable", [
+    (ApiError(code=429), True),
+    (ApiError(code=503), True),
+    (ApiError(code=400), False),
+    (TimeoutError(), True),
+    (ValueError(), False),
+])
+def test_is_retryable(exc, retryable):
+    assert is_retryable(exc) is retryable
+
+
+def test_retry_hint_from_header_and_message():
+    assert retry_hint(ApiError("quota", code=429, headers={"Retry-After": "7"})) == 7.0
+    assert retry_hint(ApiError("Resource exhausted. Please retry in 12.5s.", code=429)) == 12.5
+    assert retry_hint(ApiError("429 Too Many Requests", code=429)) is None
+
+
+@pytest.mark.parametrize("message, expected", [
+    (GEMINI_429, 26.0),
+    ("429 quota exceeded [retry_delay {\n  seconds: 3\n  nanos: 500000000\n}\n]", 3.5),
+])
+def test_retry_hint_from_gemini_retry_delay(message, expected):
+    assert retry_hint(ApiError(message, code=429)) == expected
+
+
+def test_retry_hint_from_retry_info_details():
+    exceptions = pytest.importorskip("google.api_core.exceptions")
+    error_details = pytest.importorskip("google.rpc.error_details_pb2")
+    info = error_details.RetryInfo()
+    info.retry_delay.seconds = 7
+    info.retry_delay.nanos = 250000000
+    exc = exceptions.ResourceExhausted("quota exceeded", details=[info])
+    assert retry_hint(exc) == 7.25
+
+
+def failing(*errors, result="reply"):
+    # A call that raises the given errors in turn, then returns result; calls counts the attempts
+    errors = list(errors)
+
+    def call():
+        call.calls += 1
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    call.calls = 0
+    return call
+
+
+def test_call_with_retry_retries_then_gives_up(no_backoff):
+    assert call_with_retry(failing(ApiError(code=503), ApiError(code=503)), max_retries=2) == ("reply", 3)
+    with pytest.raises(ApiError):
+        call_with_retry(failing(ApiError(code=503), ApiError(code=503)), max_retries=1)
+    call = failing(ApiError(code=400))
+    with pytest.raises(ApiError):
+        call_with_retry(call, max_retries=3)
+    assert call.calls == 1
+
+
+def test_rows_report_retried_and_failed(model, no_backoff):
+    model.errors = {"Flaky": [ApiError(code=503)], "Broken": [ApiError("bad request", code=400)]}
+    rows = [{"Title": title, "Brief": "Map wildfires"} for title in ("Fine", "Flaky", "Broken")]
+    results = llm.analyze_briefs(rows, use_cache=False)
+    assert [result.status for result in results] == ["ok", "retried", "failed"]
+    assert results[2].text == "Error: bad request"
+
+
+def test_call_with_retry_waits_for_the_hinted_delay(monkeypatch):
+    slept = []
+    monkeypatch.setattr(ratelimit.time, "sleep", slept.append)
+    assert call_with_retry(failing(ApiError(GEMINI_429, code=429)), max_retries=2) == ("reply", 2)
+    assert slept == [26.0]
@@ -0,0 +1,89 @@
+import time
+
+import pandas as pd
+import pytest
+
+from scraping_challenges_info import scraper
+from scraping_challenges_info.run_store import RunStore
+from tests.fixture_server import FixtureServer, challenge_site
+
+
+def records(count, start=0):
+    return [{"Title": f"Challenge {i}", "Brief": f"Brief {i}"} for i in range(start, start + count)]
+
+
+def test_records_stream_while_running_and_compact_on_finish(tmp_path):
+    store = RunStore(root=str(tmp_path), keep=0, max_mb=0)
+    run_id = store.start("http://example.test/challenges")
+    store.append(run_id, "Challenge Details", records(2))
+    store.append(run_id, "Challenge Details", records(1, start=2))
+    assert store.get(run_id)["status"] == "running"
+    assert store.load(run_id)["Challenge Details"]["Title"].tolist() == ["Challenge 0", "Challenge 1", "Challenge 2"]
+
+    store.append(run_id, "Basic Info", [{"Title": "Challenge 0", "URL": "u"}])
+    store.finish(run_id)
+    run = store.get(run_id)
+    assert (run["status"], run["rows"], run["format"]) == ("done", 3, "parquet")
+    assert run["bytes"] > 0
+    assert not list((tmp_path / run_id).glob("*.jsonl"))
+    sheets = store.load(run_id)
+    assert sheets["Challenge Details"].equals(pd.DataFrame(records(3)))
+    assert sheets["Basic Info"]["URL"].tolist() == ["u"]
+
+
+def test_old_runs_are_pruned_and_expired(tmp_path):
+    store = RunStore(root=str(tmp_path), keep=2, max_mb=0)
+    excel = tmp_path / "old.xlsx"
+    excel.write_bytes(b"x")
+    first = store.save("u", {"Challenge Details": pd.DataFrame(records(1))}, excel_path=str(excel))
+    running = store.start("u")
+    for _ in range(2):
+        store.save("u", {"Challenge Details": pd.DataFrame(records(1))})
+    assert store.get(first)["status"] == "expired"
+    assert not (tmp_path / first).exists() and not excel.exists()
+    assert store.get(running)["status"] == "running"
+    with pytest.raises(LookupError):
+        store.load(first)
+
+
+def test_only_runs_whose_lease_expired_are_recovered(tmp_path):
+    writer = RunStore(root=str(tmp_path), keep=0, max_mb=0, lease_ttl=0.2)
+    other = RunStore(root=str(tmp_path), keep=0, max_mb=0, lease_ttl=0.2)
+    live = writer.start("u")
+    crashed = writer.start("u")
+    writer.append(crashed, "Challenge Details", records(2))
+    # Another process starting up leaves a run that is still being written alone, however old it is
+    assert other.recover() == 0
+    time.sleep(0.15)
+    writer.renew()
+    assert other.recover() == 0
+    # The writer finishes one run and dies: once the other's lease is gone, it is recovered exactly once
+    writer.finish(live)
+    time.sleep(0.25)
+    assert other.recover() == 1
+    assert writer.recover() == 0
+    run = other.get(crashed)
+    assert (run["status"], run["rows"]) == ("interrupted", 2)
+    assert other.get(live)["status"] == "done"
+
+
+def test_keep_alive_renews_leases(tmp_path):
+    writer = RunStore(root=str(tmp_path), keep=0, max_mb=0, lease_ttl=0.15)
+    other = RunStore(root=str(tmp_path), keep=0, max_mb=0, lease_ttl=0.15)
+    run_id = writer.start("u")
+    writer.keep_alive()
+    time.sleep(0.4)
+    assert other.recover() == 0
+    assert other.get(run_id)["status"] == "running"
+
+
+def test_scrape_with_a_run_id_records_the_run(monkeypatch, tmp_path):
+    store = RunStore(root=str(tmp_path), keep=0, max_mb=0)
+    monkeypatch.setattr(scraper, "get_run_store", lambda: store)
+    run_id = store.start("fixture")
+    with FixtureServer(challenge_site(5)) as server:
+        _, df_detailed, _ = scraper.scrape_challenges(server.url, run_id=run_id, use_browser=False, incremental=False)
+    assert store.get(run_id)["rows"] == 5
+    sheets = store.load(run_id)
+    assert sheets["Challenge Details"]["Title"].tolist() == df_detailed["Title"].tolist()
+    assert len(sheets["Basic Info"]) == 5
@@ -0,0 +1,139 @@
+import pandas as pd
+
+from LLM_AND_UI.llm import AnalysisResult
+from LLM_AND_UI.pipeline import analyzed_row
+from LLM_AND_UI.UI.scrape_tab import _analyzed_hashes, _needs_analysis
+from scraping_challenges_info import scraper
+from tests.fixture_server import FixtureServer, challenge_page, challenge_site, script_only_page
+
+
+class FakeBrowser:
+    # Stands in for headless Edge: "renders" a script-only page into the full markup
+    instances = []
+
+    def __init__(self):
+        self.urls = []
+        self.closed = False
+        FakeBrowser.instances.append(self)
+
+    def get(self, url, ready_selector):
+        self.urls.append(url)
+        return challenge_page(f"Rendered {url.rsplit('/', 1)[-1]}")
+
+    def close(self):
+        self.closed = True
+
+
+def quiet_scrape(server, **kwargs):
+    return scraper.scrape(server.url, use_browser=False, **kwargs)
+
+
+def test_scrape_fetches_every_challenge_in_index_order():
+    with FixtureServer(challenge_site(12)) as server:
+        basic, detailed = quiet_scrape(server, max_workers=4)
+
+    assert basic == [{"Title": f"Challenge {i}", "URL": f"{server.base_url}/challenges/c{i}"} for i in range(12)]
+    assert [entry["Title"] for entry in detailed] == [f"Challenge {i}" for i in range(12)]
+    entry = detailed[3]
+    assert entry["Brief"] == "Map wildfires from orbit."
+    assert entry["Background"] == "Fires are spreading."
+    assert entry["Objectives"] == "- Detect\n- Map\n"
+    assert (entry["Difficulty"], entry["Subjects"], entry["Category"]) == ("Beginner", "Coding, Earth Science", "Climate")
+    assert sorted(server.paths_requested()) == sorted(["/challenges"] + [f"/challenges/c{i}" for i in range(12)])
+
+
+def test_browser_only_starts_for_pages_not_readable_over_http(monkeypatch):
+    FakeBrowser.instances.clear()
+    monkeypatch.setattr(scraper, "BrowserFetcher", FakeBrowser)
+    pages = challenge_site(4)
+    pages["/challenges/c2"] = script_only_page()
+    with FixtureServer(pages) as server:
+        _, detailed = scraper.scrape(server.url, use_browser=True)
+
+    browser, = FakeBrowser.instances
+    assert browser.urls == [f"{server.base_url}/challenges/c2"]
+    assert browser.closed
+    assert [entry["Title"] for entry in detailed] == [f"Challenge {i}" for i in range(4)]
+    assert detailed[2]["Brief"] == "Map wildfires from orbit."
+
+
+def test_unreadable_pages_are_skipped_without_a_browser(caplog):
+    pages = challenge_site(3)
+    pages["/challenges/c1"] = script_only_page()
+    del pages["/challenges/c2"]
+    with FixtureServer(pages) as server:
+        basic, detailed = scraper.scrape(server.url, use_browser=False)
+    assert len(basic) == 3
+    assert [entry["Title"] for entry in detailed] == ["Challenge 0"]
+    assert sum(record.getMessage().startswith("Error on challenge") for record in caplog.records) == 2
+
+
+def test_rescrape_sends_conditional_requests_and_flags_changes():
+    with FixtureServer(challenge_site(4)) as server:
+        _, first = quiet_scrape(server)
+        server.requests.clear()
+        _, unchanged = quiet_scrape(server)
+        conditional = {path: headers.get("If-None-Match") for path, headers in server.requests}
+
+        server.pages["/challenges/c1"] = challenge_page("Challenge 1", background="Floods are rising.")
+        # Page noise outside the challenge object changes the ETag, but not the content hash
+        server.pages["/challenges/c3"] = server.pages["/challenges/c3"].replace("<body>", "<body><!-- build 2 -->")
+        _, changed = quiet_scrape(server)
+
+    assert all(entry["Changed"] for entry in first)
+    assert all(conditional[f"/challenges/c{i}"] for i in range(4)) and conditional["/challenges"] is None
+    assert [entry["Changed"] for entry in unchanged] == [False] * 4
+    assert [{k: v for k, v in entry.items() if k != "Changed"} for entry in unchanged] == [
+        {k: v for k, v in entry.items() if k != "Changed"} for entry in first]
+    assert [entry["Changed"] for entry in changed] == [False, True, False, False]
+    assert changed[1]["Background"] == "Floods are rising."
+
+
+def test_change_stays_visible_until_the_page_is_reanalyzed():
+    with FixtureServer(challenge_site(4)) as server:
+        _, first = quiet_scrape(server)
+        analysis = pd.DataFrame([analyzed_row(record["Title"], AnalysisResult("{}", "ok"), record)
+                                 for record in first])
+        server.pages["/challenges/c2"] = challenge_page("Challenge 2", background="Floods are rising.")
+        # Another session scrapes first: it sees the change, but doesn't re-analyze
+        _, second = quiet_scrape(server)
+        _, third = quiet_scrape(server)
+
+    assert [record["Changed"] for record in second] == [False, False, True, False]
+    assert [record["Changed"] for record in third] == [False] * 4
+    analyzed_from = _analyzed_hashes(analysis)
+    assert [_needs_analysis(record, analyzed_from) for record in third] == [False, False, True, False]
+
+
+def test_full_scrape_skips_the_page_store():
+    with FixtureServer(challenge_site(2)) as server:
+        quiet_scrape(server)
+        server.requests.clear()
+        _, forced = quiet_scrape(server, force=True)
+        assert not any("If-None-Match" in headers for _, headers in server.requests)
+        server.requests.clear()
+        _, stateless = quiet_scrape(server, incremental=False)
+        assert not any("If-None-Match" in headers for _, headers in server.requests)
+    assert [entry["Changed"] for entry in forced] == [False, False]
+    assert [entry["Changed"] for entry in stateless] == [True, True]
+
+
+def test_scrape_challenges_returns_frames_and_reports_progress(tmp_path):
+    pages = challenge_site(5)
+    del pages["/challenges/c4"]
+    progress = []
+    with FixtureServer(pages) as server:
+        df_basic, df_detailed, path = scraper.scrape_challenges(
+            server.url, on_progress=lambda done, total, title: progress.append((done, total, title)),
+            use_browser=False)
+
+    assert path is None
+    assert df_basic["Title"].tolist() == [f"Challenge {i}" for i in range(5)]
+    assert df_detailed["Title"].tolist() == [f"Challenge {i}" for i in range(4)]
+    assert [done for done, _, _ in progress] == [1, 2, 3, 4, 5]
+    assert {total for _, total, _ in progress} == {5}
+    assert sorted(title or "" for _, _, title in progress) == ["", *(f"Challenge {i}" for i in range(4))]
+
+    saved = pd.read_excel(scraper.save_excel(df_basic, df_detailed, excel_dir=str(tmp_path)), sheet_name=None)
+    assert list(saved) == ["Basic Info", "Challenge Details"]
+    assert saved["Challenge Details"]["Title"].tolist() == df_detailed["Title"].tolist()
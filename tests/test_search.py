@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from LLM_AND_UI.search import SearchIndex
+
+
+def make_frame(n):
+    topics = ["wildfire satellite imagery", "ocean heat buoys", "lunar dust rover", "mars ice radar"]
+    return pd.DataFrame({
+        "Title": [f"Challenge {i} {topics[i % 4]}" for i in range(n)],
+        "Summary": [f"Study {topics[i % 4]} with data set {i}" for i in range(n)],
+        "Fields": [["Earth", "Oceans", "Moon", "Mars"][i % 4] for i in range(n)],
+    })
+
+
+def test_update_reweights_only_the_changed_rows():
+    index = SearchIndex.from_frame(make_frame(400), dim=256)
+    matrix = index._matrix()
+    before = matrix.copy()
+    index.update([(5, {"Title": "Volcano ash plumes", "Summary": "Track volcano ash plumes", "Fields": "Earth"})])
+    after = index._matrix()
+    assert np.shares_memory(after, matrix)
+    changed = np.flatnonzero(np.any(after != before, axis=1))
+    assert changed.tolist() == [5]
+    assert index.search("volcano ash", k=1)[0][0] == 5
+    assert index.filter({"Fields": ["earth"]}).tolist().count(5) == 1
+
+
+def test_appended_rows_are_searchable_and_idf_is_refreshed_eventually():
+    index = SearchIndex.from_frame(make_frame(100), dim=256)
+    index._matrix()
+    for i in range(10):
+        index.update([(100 + i, {"Title": f"Aurora camera {i}", "Summary": "aurora camera network"})])
+        assert index.search("aurora camera", k=1)[0][0] >= 100
+    assert not np.allclose(index._idf_used, index._idf())
+    # Once more rows changed than REWEIGHT_FRACTION allows, every row is weighted with a fresh IDF again
+    index.update([(110 + i, {"Title": f"Aurora lidar {i}"}) for i in range(20)])
+    matrix = index._matrix()
+    np.testing.assert_allclose(index._idf_used, index._idf())
+    np.testing.assert_allclose(matrix, index._weigh(index._tf[:len(index)], index._idf()), atol=1e-6)
+
+
+def test_near_duplicates_are_kept_until_rows_change():
+    frame = make_frame(40)
+    frame.loc[39] = frame.loc[3]
+    index = SearchIndex.from_frame(frame, dim=256)
+    assert index.cached_near_duplicates(0.99) is None
+    pairs = index.near_duplicates(0.99)
+    assert (3, 39) in [(i, j) for i, j, _ in pairs]
+    assert index.cached_near_duplicates(0.99) is pairs
+    index.update([(39, {"Title": "Something else entirely"})])
+    assert index.cached_near_duplicates(0.99) is None
+
+
+def test_find_titles_matches_substrings_case_insensitively():
+    index = SearchIndex.from_frame(make_frame(20), dim=64)
+    assert index.find_titles("LUNAR DUST", limit=3) == [2, 6, 10]
+    assert index.find_titles("  ") == []
@@ -0,0 +1,66 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from LLM_AND_UI import shared
+
+
+@pytest.fixture
+def shared_store(tmp_path, monkeypatch):
+    # Section locks go through a real shared store, as on a multi-session deployment
+    monkeypatch.setattr(shared, "SHARED_STATE", True)
+    monkeypatch.setattr(shared, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(shared, "_store", None)
+    yield
+    shared._store = None
+
+
+def manual_app():
+    from LLM_AND_UI.state import init_session_state
+    from LLM_AND_UI.UI import common
+    from LLM_AND_UI.UI.manual_tab import render_manual_tab
+
+    def failing_model(row, use_cache=True):
+        raise RuntimeError("model unavailable")
+
+    common.analyze_brief_with_status = failing_model
+    init_session_state()
+    render_manual_tab()
+
+
+def scrape_app():
+    import pandas as pd
+    import streamlit as st
+
+    from LLM_AND_UI.state import init_session_state
+    from LLM_AND_UI.UI import scrape_tab
+
+    def failing_analysis(rows, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    scrape_tab.analyze_briefs = failing_analysis
+    init_session_state()
+    if "scraped_sheets" not in st.session_state:
+        details = pd.DataFrame({"Title": ["Ocean Heat", "Lunar Dust"], "Brief": ["Buoys", "Regolith"]})
+        st.session_state.scraped_sheets = {"Challenge Details": details}
+    scrape_tab.render_scrape_tab()
+
+
+def test_manual_entry_unlocks_after_an_analysis_error(shared_store):
+    at = AppTest.from_function(manual_app).run()
+    at.text_input(key="manual_title_input").input("Ocean Heat")
+    at.text_area(key="manual_brief_input").input("Measure ocean heat content")
+    at.button[0].click().run()
+    assert "model unavailable" in at.exception[0].message
+    assert at.session_state.active_section is None
+    assert shared.get_shared().holder("Manual") is None
+
+
+def test_scrape_analysis_unlocks_after_an_analysis_error(shared_store):
+    at = AppTest.from_function(scrape_app).run()
+    at.checkbox(key="scrape_background").uncheck().run()
+    next(b for b in at.button if b.label.startswith("🤖 Analyze")).click().run()
+    assert any("model unavailable" in e.value for e in at.error)
+    assert at.session_state.active_section is None
+    assert shared.get_shared().holder("Scrape") is None
+    # Other tabs aren't frozen and the section can be claimed again
+    assert shared.get_shared().acquire("Scrape", "another-session") is None
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from LLM_AND_UI import views
+from LLM_AND_UI.views import ViewCache, default_columns, page_view
+
+
+def frame():
+    return pd.DataFrame({
+        "Title": ["beta", "Alpha", "gamma", "Delta", None],
+        "Score": [3, 1, 2, 5, 4],
+        "Brief": ["Maps fires", "Ocean data", "Fire spread", "Lunar maps", "Fires again"],
+        "Notes": ["x" * 300] * 5,
+    })
+
+
+def test_long_text_columns_are_hidden_by_default():
+    assert default_columns(frame()) == ["Title", "Score"]
+
+
+def test_filter_sort_and_page():
+    df = frame()
+    table, total = page_view(df, columns=["Title", "Score"], query="FIRE", search_columns=["Brief"], sort_by="Title")
+    assert total == 3
+    page = table.to_pandas()
+    # Case-insensitive text sort with missing values last; the index is the 1-based row in the full frame
+    assert page["Title"].tolist()[:2] == ["beta", "gamma"] and page["Title"].isna().iloc[2]
+    assert page.index.tolist() == [1, 3, 5]
+    assert table.column_names == ["Title", "Score", "#"]
+
+    table, total = page_view(df, sort_by="Score", ascending=False, page=9, page_size=2)
+    assert total == 5
+    # Out-of-range pages clamp to the last one
+    assert table.to_pandas()["Score"].tolist() == [1]
+
+
+def test_orders_and_pages_are_cached_per_version(monkeypatch):
+    monkeypatch.setattr(views, "_cache", ViewCache())
+    orders = []
+    row_order = views._row_order
+    monkeypatch.setattr(views, "_row_order", lambda *args: orders.append(args) or row_order(*args))
+    df = frame()
+    first, _ = page_view(df, version=("store", 1), sort_by="Score")
+    assert page_view(df, version=("store", 1), sort_by="Score")[0] is first
+    page_view(df, version=("store", 1), sort_by="Score", page=2, page_size=2)
+    assert len(orders) == 1
+    page_view(df, version=("store", 2), sort_by="Score")
+    # A different frame under the same key is never served from the cache
+    page_view(frame(), version=("store", 2), sort_by="Score")
+    assert len(orders) == 3